@@ -0,0 +1,275 @@
+"""
+Runs the pycollect benchmark suite and writes its results as JSON.
+
+Usage::
+
+    python -m benchmarks.run --files 100000 --output results.json
+    python -m benchmarks.run --compare baseline.json results.json
+
+Trees are generated in a temporary directory, unless ``--tree-dir`` is given, in
+which case they are kept and reused by later runs with the same number of files.
+
+The suite runs against whichever pycollect is importable, down to the 0.2.3 release:
+the scenarios the installed version does not support are skipped.
+"""
+
+import argparse
+import inspect
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set
+
+import pycollect
+from pycollect import PythonFileCollector, find_module_name
+
+from benchmarks.tree_generator import generate_tree, list_shapes
+
+try:
+    from pycollect.deduplication import SymlinkLoopWarning
+except ImportError:  # released versions following symbolic link loops
+    SymlinkLoopWarning = None
+
+ModuleNameResolver = getattr(pycollect, "ModuleNameResolver", None)
+
+#: Maximum number of files whose module name is resolved one by one with
+#: :func:`find_module_name`, which would otherwise dominate the run time.
+MODULE_NAME_SAMPLE = 10_000
+
+
+class Benchmark(NamedTuple):
+    name: str
+    shape: str
+    params: Dict[str, Any]
+    run: Callable[[str], int]
+
+
+def _collect(**kwargs: Any) -> Callable[[str], int]:
+    use_regex_patterns = kwargs.pop("use_regex_patterns", False)
+
+    def run(root: str) -> int:
+        collector = PythonFileCollector(use_regex_patterns=use_regex_patterns)
+        return len(collector.collect(root, **kwargs))
+
+    return run
+
+
+def _module_names(resolver: bool) -> Callable[[str], int]:
+    files = {}  # type: Dict[str, List[str]]
+
+    def run(root: str) -> int:
+        if root not in files:
+            collected = PythonFileCollector().collect(root)
+            paths = sorted(file.path for file in collected)
+            files[root] = paths if resolver else paths[:MODULE_NAME_SAMPLE]
+        sys.path.insert(0, root)
+        try:
+            if resolver:
+                names = ModuleNameResolver().find_module_names(files[root])
+            else:
+                names = [find_module_name(path) for path in files[root]]
+        finally:
+            sys.path.remove(root)
+        return len(names)
+
+    return run
+
+
+def _collect_parameters() -> Set[str]:
+    return set(inspect.signature(PythonFileCollector.__init__).parameters).union(
+        inspect.signature(PythonFileCollector.collect).parameters
+    )
+
+
+def _unsupported(name: str, shape: str, params: Dict[str, Any]) -> Optional[str]:
+    """
+    Tells why a benchmark cannot run against the installed pycollect, if it cannot.
+    """
+    if name == "ModuleNameResolver" and ModuleNameResolver is None:
+        return "ModuleNameResolver is not available"
+    missing = set(params).difference(_collect_parameters())
+    if missing:
+        return "collect() does not support {}".format(", ".join(sorted(missing)))
+    if (
+        shape == "symlinks"
+        and SymlinkLoopWarning is None
+        and params.get("follow_symlinks", True)
+        and params.get("recursion_limit") is None
+    ):
+        # module name benchmarks collect the tree with the default parameters
+        return "symbolic link loops are followed endlessly"
+    return None
+
+
+def benchmarks(shapes: List[str]) -> List[Benchmark]:
+    suite = []  # type: List[Benchmark]
+    for shape in shapes:
+        candidates = [
+            Benchmark("collect", shape, params, _collect(**params))
+            for params in (
+                {},
+                {"use_regex_patterns": True},
+                {"recursion_limit": 2},
+                {"follow_symlinks": False},
+                {"workers": 4},
+                {"use_dir_fds": True},
+            )
+        ]  # type: List[Benchmark]
+        candidates.append(
+            Benchmark("find_module_name", shape, {}, _module_names(False))
+        )
+        candidates.append(
+            Benchmark("ModuleNameResolver", shape, {}, _module_names(True))
+        )
+        for benchmark in candidates:
+            reason = _unsupported(benchmark.name, shape, benchmark.params)
+            if reason is None:
+                suite.append(benchmark)
+            else:
+                print(
+                    "skipping {} {} {}: {}".format(
+                        benchmark.name, shape, json.dumps(benchmark.params), reason
+                    ),
+                    file=sys.stderr,
+                )
+    return suite
+
+
+def _time(benchmark: Benchmark, root: str, repeat: int) -> Dict[str, Any]:
+    timings = []  # type: List[float]
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = benchmark.run(root)
+        timings.append(time.perf_counter() - start)
+    return {
+        "name": benchmark.name,
+        "shape": benchmark.shape,
+        "params": benchmark.params,
+        "count": count,
+        "timings": timings,
+        "min": min(timings),
+        "median": statistics.median(timings),
+    }
+
+
+def run(
+    files: int, shapes: List[str], repeat: int, tree_dir: Optional[str]
+) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as temporary_dir:
+        base = tree_dir or temporary_dir
+        roots = {}  # type: Dict[str, str]
+        generated = {}  # type: Dict[str, int]
+        for shape in shapes:
+            root = os.path.join(base, "{}-{}".format(shape, files))
+            if os.path.isdir(root):
+                generated[shape] = -1
+            else:
+                print(
+                    "generating {} tree of {} files".format(shape, files),
+                    file=sys.stderr,
+                )
+                generated[shape] = generate_tree(root, shape, files)
+            roots[shape] = root
+
+        results = []
+        for benchmark in benchmarks(shapes):
+            result = _time(benchmark, roots[benchmark.shape], repeat)
+            print(
+                "{:<20} {:<9} {:<32} {:>10.4f}s {:>9} files".format(
+                    result["name"],
+                    result["shape"],
+                    json.dumps(result["params"]),
+                    result["min"],
+                    result["count"],
+                ),
+                file=sys.stderr,
+            )
+            results.append(result)
+
+    return {
+        "pycollect_version": pycollect.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "date": datetime.now(timezone.utc).isoformat(),
+        "files": files,
+        "repeat": repeat,
+        "generated": generated,
+        "results": results,
+    }
+
+
+def _key(result: Dict[str, Any]) -> str:
+    return "{} {} {}".format(
+        result["name"], result["shape"], json.dumps(result["params"], sort_keys=True)
+    )
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> None:
+    """
+    Prints, for every benchmark present in both results, the ratio of the current
+    best time to the baseline best time.
+    """
+    baseline_results = {_key(result): result for result in baseline["results"]}
+    print(
+        "{} ({}) -> {} ({})".format(
+            baseline["pycollect_version"],
+            baseline["date"],
+            current["pycollect_version"],
+            current["date"],
+        )
+    )
+    for result in current["results"]:
+        key = _key(result)
+        if key in baseline_results:
+            ratio = result["min"] / baseline_results[key]["min"]
+            print("{:<64} {:>7.2f}x".format(key, ratio))
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as results:
+        return json.load(results)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=10_000)
+    parser.add_argument(
+        "--shape", action="append", choices=list_shapes(), dest="shapes"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tree-dir", help="directory to generate and keep trees in")
+    parser.add_argument("--output", help="file to write the JSON results to")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BASELINE", "CURRENT"),
+        help="compare two JSON results instead of running benchmarks",
+    )
+    args = parser.parse_args(argv)
+    if SymlinkLoopWarning is not None:
+        # symbolic link loops are part of the symlinks tree on purpose
+        warnings.simplefilter("ignore", SymlinkLoopWarning)
+
+    if args.compare:
+        baseline, current = map(_load, args.compare)
+        compare(baseline, current)
+        return
+
+    results = run(args.files, args.shapes or list_shapes(), args.repeat, args.tree_dir)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Generates synthetic source trees to benchmark collections on.
+
+Every tree is generated deterministically from its shape and its number of files, so
+results obtained on different machines or releases can be compared.
+"""
+
+import math
+import os
+from typing import Callable, Dict, List
+
+#: Names given to the files of each generated package, cycled through. Roughly a
+#: third of them are excluded by the default file exclusion patterns.
+FILE_NAMES = (
+    "__init__.py",
+    "module_{}.py",
+    "module_{}.pyc",
+    "README_{}.txt",
+    ".hidden_{}.py",
+    "test_{}.py",
+)
+#: Names of directories excluded by the default directory exclusion patterns.
+EXCLUDED_DIR_NAMES = ("__pycache__", ".git", "build", "venv", "dist", "htmlcov")
+
+FILES_PER_DIR = 20
+
+
+def _touch_files(path: str, count: int) -> int:
+    os.makedirs(path, exist_ok=True)
+    for index in range(count):
+        name = FILE_NAMES[index % len(FILE_NAMES)].format(index)
+        with open(os.path.join(path, name), "w"):
+            pass
+    return count
+
+
+def _package_path(root: str, index: int, fanout: int) -> str:
+    parts = []
+    while True:
+        index, remainder = divmod(index, fanout)
+        parts.append("pkg_{}".format(remainder))
+        if not index:
+            break
+        index -= 1
+    return os.path.join(root, *reversed(parts))
+
+
+def generate_wide(root: str, files: int) -> int:
+    """
+    Generates a shallow tree, packages holding :data:`FILES_PER_DIR` files each and
+    directories fanning out to as many packages as needed in a couple of levels.
+    """
+    packages = max(1, files // FILES_PER_DIR)
+    fanout = max(2, math.ceil(math.sqrt(packages)))
+    created = 0
+    for index in range(packages):
+        created += _touch_files(_package_path(root, index, fanout), FILES_PER_DIR)
+    return created
+
+
+def generate_deep(root: str, files: int) -> int:
+    """
+    Generates chains of nested packages, 100 levels deep, holding a few files each.
+    """
+    depth = 100
+    files_per_dir = 5
+    created = 0
+    chain = 0
+    while created < files:
+        path = os.path.join(root, "chain_{}".format(chain))
+        for level in range(depth):
+            path = os.path.join(path, "level_{}".format(level))
+            created += _touch_files(path, files_per_dir)
+            if created >= files:
+                break
+        chain += 1
+    return created
+
+
+def generate_symlinks(root: str, files: int) -> int:
+    """
+    Generates a wide tree in which every package also holds symbolic links to a
+    sibling package and to one of its own files, plus a link back to the tree root.
+    """
+    created = generate_wide(os.path.join(root, "real"), files)
+    real = os.path.join(root, "real")
+    packages = sorted(name for name in os.listdir(real))
+    for index, name in enumerate(packages):
+        package = os.path.join(real, name)
+        sibling = packages[(index + 1) % len(packages)]
+        os.symlink(os.path.join(real, sibling), os.path.join(package, "link_dir"))
+        os.symlink(
+            os.path.join(package, "module_1.py"), os.path.join(package, "link_file.py")
+        )
+    os.symlink(root, os.path.join(real, "loop"))
+    return created
+
+
+def generate_excluded(root: str, files: int) -> int:
+    """
+    Generates a wide tree in which half of the files live in directories excluded by
+    the default directory exclusion patterns.
+    """
+    created = generate_wide(os.path.join(root, "src"), files // 2)
+    remaining = files - created
+    index = 0
+    while remaining > 0:
+        name = EXCLUDED_DIR_NAMES[index % len(EXCLUDED_DIR_NAMES)]
+        path = os.path.join(root, "src", "pkg_{}".format(index), name)
+        count = min(remaining, FILES_PER_DIR * 10)
+        created += _touch_files(path, count)
+        remaining -= count
+        index += 1
+    return created
+
+
+SHAPES = {
+    "wide": generate_wide,
+    "deep": generate_deep,
+    "symlinks": generate_symlinks,
+    "excluded": generate_excluded,
+}  # type: Dict[str, Callable[[str, int], int]]
+
+
+def generate_tree(root: str, shape: str, files: int) -> int:
+    """
+    Generates a tree of the given shape holding about ``files`` files under ``root``.
+
+    :param root:
+        The directory to generate the tree in. It is created if it does not exist.
+    :param shape:
+        One of :data:`SHAPES`.
+    :param files:
+        The approximate number of files to generate.
+    :return:
+        The number of files actually generated, symbolic links excluded.
+    """
+    os.makedirs(root, exist_ok=True)
+    return SHAPES[shape](root, files)
+
+
+def list_shapes() -> List[str]:
+    return sorted(SHAPES)
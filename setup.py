@@ -73,4 +73,5 @@ setup(
         #   ':python_version=="2.6"': ['argparse'],
     },
     setup_requires=[],
+    entry_points={"console_scripts": ["pycollect = pycollect.cli:main"]},
 )
@@ -1,6 +1,57 @@
-from pycollect.python_file_collector import PythonFileCollector
-from pycollect.module_finder import find_module_name
+import sys
+from importlib import import_module
 
 __version__ = "0.2.3"
 
-__all__ = ["PythonFileCollector", "find_module_name"]
+__all__ = [
+    "PythonFileCollector",
+    "find_module_name",
+    "ModuleNameResolver",
+    "CollectionCache",
+    "CollectionStats",
+    "FileEntry",
+    "CompactCollection",
+    "ContentFilter",
+    "ImportIndex",
+    "MultiCollector",
+    "Snapshot",
+    "ArchiveEntry",
+    "ModuleIndex",
+]
+
+# Public names are imported from their modules when first accessed, so that importing
+# the package, e.g. to run its command line interface, only imports what is used.
+_MODULES = {
+    "PythonFileCollector": "pycollect.python_file_collector",
+    "find_module_name": "pycollect.module_finder",
+    "ModuleNameResolver": "pycollect.module_finder",
+    "CollectionCache": "pycollect.collection_cache",
+    "CollectionStats": "pycollect.collection_stats",
+    "FileEntry": "pycollect.file_entry",
+    "CompactCollection": "pycollect.compact_collection",
+    "ContentFilter": "pycollect.content_filter",
+    "ImportIndex": "pycollect.import_index",
+    "MultiCollector": "pycollect.multi_collector",
+    "Snapshot": "pycollect.snapshot",
+    "ArchiveEntry": "pycollect.archive_collection",
+    "ModuleIndex": "pycollect.module_index",
+}
+
+
+def __getattr__(name: str):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()).union(__all__))
+
+
+if sys.version_info < (3, 7):  # pragma: no cover
+    # module level __getattr__ is only supported as of Python 3.7
+    for _name in __all__:
+        __getattr__(_name)
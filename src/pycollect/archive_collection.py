@@ -0,0 +1,154 @@
+import os
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, Optional, Tuple, Union
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pycollect.glob_matcher import GlobMatcher
+
+#: Suffixes of the archives read as zip files, e.g. wheels, rather than as tar files.
+ZIP_SUFFIXES = (".zip", ".whl", ".egg", ".pyz", ".jar")
+
+
+class ArchiveEntry:
+    """
+    ArchiveEntry is a lightweight entry referring to a file within an archive, as
+    collected by
+    :meth:`~pycollect.python_file_collector.PythonFileCollector.collect_archive`.
+
+    Its ``path`` joins the archive path and the member path, as the ``__file__`` of
+    modules imported by :mod:`zipimport` does, but it refers to nothing on the file
+    system: use :meth:`read` to get the file content.
+
+    :param archive:
+        The path of the archive.
+    :param member:
+        The path of the file within the archive, using forward slashes.
+    :param size:
+        (default: 0) the uncompressed size of the file, in bytes.
+    """
+
+    __slots__ = ("archive", "member", "size", "name", "path")
+
+    def __init__(self, archive: str, member: str, size: int = 0):
+        self.archive = archive
+        self.member = member
+        self.size = size
+        self.name = member.rpartition("/")[2]
+        self.path = os.path.join(archive, member.replace("/", os.sep))
+
+    def __repr__(self) -> str:
+        return "<ArchiveEntry {!r} in {!r}>".format(self.member, self.archive)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ArchiveEntry):
+            return (self.archive, self.member) == (other.archive, other.member)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((self.archive, self.member))
+
+    def is_file(self, *, follow_symlinks: bool = True) -> bool:
+        return True
+
+    def is_dir(self, *, follow_symlinks: bool = True) -> bool:
+        return False
+
+    def is_symlink(self) -> bool:
+        return False
+
+    def read(self) -> bytes:
+        """
+        Reads the file content from the archive.
+        """
+        if is_zip_archive(self.archive):
+            from zipfile import ZipFile
+
+            with ZipFile(self.archive) as archive:
+                return archive.read(self.member)
+
+        import tarfile
+
+        with tarfile.open(self.archive) as archive:
+            file = archive.extractfile(self.member)
+            if file is None:
+                raise KeyError("{!r} is not a file".format(self.member))
+            return file.read()
+
+
+def is_zip_archive(path: Union[str, os.PathLike]) -> bool:
+    """
+    Tells whether an archive is read as a zip file, from its suffix.
+    """
+    return os.fspath(path).lower().endswith(ZIP_SUFFIXES)
+
+
+def _members(archive_path: str) -> Iterator[Tuple[str, int]]:
+    # only the zip central directory is read; tar headers are read one after another,
+    # file contents being skipped rather than read when the archive is uncompressed
+    if is_zip_archive(archive_path):
+        from zipfile import ZipFile
+
+        with ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir():
+                    yield info.filename, info.file_size
+        return
+
+    import tarfile
+
+    with tarfile.open(archive_path) as archive:
+        for info in archive:
+            if info.isfile():
+                yield info.name, info.size
+
+
+def scan_archive(
+    archive_path: str,
+    recursion_limit: Optional[int],
+    exclude_file: Callable[[str], bool],
+    exclude_dir: Callable[[str], bool],
+    path_matcher: "Optional[GlobMatcher]" = None,
+) -> Iterator[ArchiveEntry]:
+    """
+    Lists the files of an archive that pass exclusion patterns, as if the archive
+    were a directory being traversed.
+
+    :param archive_path:
+        The path of the archive.
+    :param recursion_limit:
+        Directory recursion limit, the archive root being level 0.
+    :param exclude_file:
+        Function telling whether a file name is excluded.
+    :param exclude_dir:
+        Function telling whether a directory name is excluded.
+    :param path_matcher:
+        (default: None) path exclusion patterns, matched against member paths.
+    """
+    # directory member path -> whether it is excluded, along with its ancestors
+    excluded_dirs = {"": False}  # type: Dict[str, bool]
+
+    def is_excluded_dir(directory: str) -> bool:
+        excluded = excluded_dirs.get(directory)
+        if excluded is None:
+            parent, _, name = directory.rpartition("/")
+            excluded = (
+                is_excluded_dir(parent)
+                or exclude_dir(name)
+                or (path_matcher is not None and path_matcher.excludes(directory, True))
+            )
+            excluded_dirs[directory] = excluded
+        return excluded
+
+    for member, size in _members(archive_path):
+        member = member.lstrip("/")
+        if member.startswith("./"):
+            member = member[2:]
+        directory, _, name = member.rpartition("/")
+        if recursion_limit is not None and member.count("/") > recursion_limit:
+            continue
+        if (
+            exclude_file(name)
+            or is_excluded_dir(directory)
+            or (path_matcher is not None and path_matcher.excludes(member, False))
+        ):
+            continue
+        yield ArchiveEntry(archive_path, member, size)
@@ -0,0 +1,189 @@
+"""
+Collects Python files and writes their paths to the standard output as they are found.
+
+Usage::
+
+    pycollect src tests
+    pycollect -0 src | xargs -0 -P 8 -n 64 python -m py_compile
+    pycollect --json --module-names src
+
+Paths are written one per line by default, separated by NUL characters with ``-0``,
+or as JSON lines, optionally along with their module names, with ``--json``. Only
+the modules needed by the requested options are imported, to keep the start up time
+of each call minimal.
+"""
+
+import argparse
+import os
+import sys
+from typing import Iterator, List, Optional, Tuple
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="pycollect", description=__doc__.strip().splitlines()[0]
+    )
+    parser.add_argument(
+        "search_paths",
+        nargs="*",
+        default=["."],
+        metavar="PATH",
+        help="directory to collect files from (default: the working directory)",
+    )
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument(
+        "-0",
+        "--null",
+        action="store_true",
+        help="separate paths with NUL characters, e.g. for xargs -0",
+    )
+    output.add_argument(
+        "--json", action="store_true", help="write a JSON object per collected file"
+    )
+    parser.add_argument(
+        "--module-names",
+        action="store_true",
+        help="add the module name of each file to the JSON objects",
+    )
+    parser.add_argument(
+        "--innermost",
+        action="store_true",
+        help="use innermost rather than outermost module names",
+    )
+    parser.add_argument(
+        "--packages-only",
+        action="store_true",
+        help="skip the directories that are neither packages nor sys.path entries",
+    )
+    parser.add_argument(
+        "--exclude-file",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="additional file name exclusion pattern",
+    )
+    parser.add_argument(
+        "--exclude-dir",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="additional directory name exclusion pattern",
+    )
+    parser.add_argument(
+        "--exclude-path",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="path exclusion pattern, in the syntax of .gitignore files",
+    )
+    parser.add_argument(
+        "--regex",
+        action="store_true",
+        help="interpret name exclusion patterns as regular expressions",
+    )
+    parser.add_argument(
+        "--ignore-files",
+        action="store_true",
+        help="honor .gitignore and .ignore files",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        metavar="N",
+        help="directory recursion limit, the search path being level 0",
+    )
+    parser.add_argument(
+        "--no-follow-symlinks",
+        action="store_false",
+        dest="follow_symlinks",
+        help="do not follow symbolic links",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        metavar="N",
+        help="number of threads scanning directories",
+    )
+    parser.add_argument(
+        "--shard",
+        type=int,
+        metavar="I",
+        help="only collect shard I, from 0, of the files (requires --num-shards)",
+    )
+    parser.add_argument(
+        "--num-shards",
+        type=int,
+        default=1,
+        metavar="N",
+        help="number of shards the files are split into",
+    )
+    return parser
+
+
+def _collect(args: argparse.Namespace) -> Iterator[Tuple[str, Optional[str]]]:
+    from pycollect.python_file_collector import PythonFileCollector
+
+    collector = PythonFileCollector(
+        use_regex_patterns=args.regex,
+        additional_file_exclusion_patterns=args.exclude_file,
+        additional_dir_exclusion_patterns=args.exclude_dir,
+        path_exclusion_patterns=args.exclude_path,
+        use_ignore_files=args.ignore_files,
+    )
+    options = dict(
+        recursion_limit=args.max_depth,
+        follow_symlinks=args.follow_symlinks,
+        workers=args.workers,
+        shard=args.shard,
+        num_shards=args.num_shards,
+    )
+    for search_path in args.search_paths:
+        if args.module_names or args.packages_only:
+            yield from (
+                (entry.path, module_name)
+                for entry, module_name in collector.collect_modules(
+                    search_path,
+                    innermost=args.innermost,
+                    packages_only=args.packages_only,
+                    **options
+                )
+            )
+        else:
+            yield from (
+                (entry.path, None)
+                for entry in collector.iter_collect(search_path, **options)
+            )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if args.module_names and not args.json:
+        parser.error("--module-names requires --json")
+    if args.shard is not None and not 0 <= args.shard < args.num_shards:
+        parser.error("--shard must be within [0, --num-shards)")
+
+    output = sys.stdout.buffer
+    try:
+        if args.json:
+            import json
+
+            for path, module_name in _collect(args):
+                record = {"path": path}
+                if args.module_names:
+                    record["module"] = module_name
+                output.write(json.dumps(record).encode("ascii") + b"\n")
+        else:
+            separator = b"\0" if args.null else b"\n"
+            for path, _ in _collect(args):
+                output.write(os.fsencode(path) + separator)
+        output.flush()
+    except BrokenPipeError:
+        # the reader went away, e.g. head: silence the error flushing stdout on exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except OSError as error:
+        output.flush()
+        print("pycollect: error: {}".format(error), file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,263 @@
+import os
+import stat
+import threading
+import time
+from hashlib import sha1
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from pycollect.file_entry import FileEntry
+from pycollect.timestamps import RACY_WINDOW_NS
+
+if TYPE_CHECKING:  # pragma: no cover
+    # imported by caches only, as every scanning function imports this module
+    import sqlite3
+
+#: A directory scan result: the collected file entries and the paths of the
+#: subdirectories to descend into.
+ScanResult = Tuple[List[Union[os.DirEntry, FileEntry]], List[str]]
+
+
+class CollectionCache:
+    """
+    CollectionCache persists, for every directory traversed by
+    :meth:`~pycollect.python_file_collector.PythonFileCollector.collect`, the
+    directory modification time along with the names of the files and subdirectories
+    that passed the exclusion patterns. Later collections of the same tree with the
+    same configuration only scan again the directories whose modification time
+    changed, every other directory costs a single :func:`os.stat` call.
+
+    Cached data is stored in a SQLite database and is kept apart per search path and
+    per collector configuration (exclusion patterns, pattern syntax and symbolic links
+    handling), so changing any of them never reuses stale results.
+
+    .. note::
+        A directory's modification time only changes when entries are added to,
+        removed from or renamed within it. Retargeting a symbolic link to a file or to
+        a directory is not noticed until its parent directory is modified.
+
+    :param path:
+        Path of the cache database file. It is created if it does not exist and
+        recreated if it is not a valid cache database.
+    """
+
+    _SCHEMA_VERSION = 1
+    _SEPARATOR = "\0"
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        import sqlite3
+
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+        try:
+            self._connection = self._connect()
+        except sqlite3.DatabaseError:
+            os.remove(self.path)
+            self._connection = self._connect()
+
+    def _connect(self) -> "sqlite3.Connection":
+        import sqlite3
+
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        try:
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version != self._SCHEMA_VERSION:
+                connection.executescript(
+                    """
+                    DROP TABLE IF EXISTS directories;
+                    DROP TABLE IF EXISTS collections;
+                    CREATE TABLE collections (
+                        id INTEGER PRIMARY KEY,
+                        root TEXT NOT NULL,
+                        config TEXT NOT NULL,
+                        UNIQUE (root, config)
+                    );
+                    CREATE TABLE directories (
+                        collection_id INTEGER NOT NULL REFERENCES collections(id),
+                        path TEXT NOT NULL,
+                        mtime_ns INTEGER NOT NULL,
+                        files TEXT NOT NULL,
+                        subdirs TEXT NOT NULL,
+                        PRIMARY KEY (collection_id, path)
+                    ) WITHOUT ROWID;
+                    """
+                )
+                connection.execute(
+                    "PRAGMA user_version = {:d}".format(self._SCHEMA_VERSION)
+                )
+                connection.commit()
+        except sqlite3.DatabaseError:
+            connection.close()
+            raise
+        return connection
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> "CollectionCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def clear(self) -> None:
+        """
+        Removes every cached collection.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM directories")
+            self._connection.execute("DELETE FROM collections")
+
+    def session(self, search_path: str, config: str) -> "CacheSession":
+        """
+        Starts a cached traversal of ``search_path``.
+
+        :param search_path:
+            The search path as given to the collector.
+        :param config:
+            A string uniquely describing the collector configuration.
+        :return:
+            A :class:`CacheSession` whose results must be saved with
+            :meth:`CacheSession.save` once the traversal is over.
+        """
+        root = os.path.abspath(search_path)
+        config_key = sha1(config.encode("utf-8")).hexdigest()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR IGNORE INTO collections (root, config) VALUES (?, ?)",
+                (root, config_key),
+            )
+            (collection_id,) = self._connection.execute(
+                "SELECT id FROM collections WHERE root = ? AND config = ?",
+                (root, config_key),
+            ).fetchone()
+            records = {
+                path: (mtime_ns, files, subdirs)
+                for path, mtime_ns, files, subdirs in self._connection.execute(
+                    "SELECT path, mtime_ns, files, subdirs FROM directories "
+                    "WHERE collection_id = ?",
+                    (collection_id,),
+                )
+            }
+        return CacheSession(self, collection_id, search_path, records)
+
+    def _save(
+        self,
+        collection_id: int,
+        updates: List[Tuple[str, int, str, str]],
+        visited: Optional[Set[str]],
+    ) -> None:
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO directories "
+                "(collection_id, path, mtime_ns, files, subdirs) VALUES (?, ?, ?, ?, ?)",
+                ((collection_id,) + update for update in updates),
+            )
+            if visited is not None:
+                stale = [
+                    (collection_id, path)
+                    for (path,) in self._connection.execute(
+                        "SELECT path FROM directories WHERE collection_id = ?",
+                        (collection_id,),
+                    )
+                    if path not in visited
+                ]
+                self._connection.executemany(
+                    "DELETE FROM directories WHERE collection_id = ? AND path = ?",
+                    stale,
+                )
+
+
+class CacheSession:
+    """
+    CacheSession holds the cached records of a single traversal. Its :meth:`wrap`
+    method turns a directory scanning function into one that reuses cached results
+    for unmodified directories. The wrapped function may be called from several
+    threads at once.
+    """
+
+    def __init__(
+        self,
+        cache: CollectionCache,
+        collection_id: int,
+        search_path: str,
+        records: Dict[str, Tuple[int, str, str]],
+    ):
+        self._cache = cache
+        self._collection_id = collection_id
+        self._prefix_length = len(search_path)
+        self._records = records
+        self._updates = []  # type: List[Tuple[str, int, str, str]]
+        self._visited = set()  # type: Set[str]
+        # directory path -> its status, got before the directory is scanned
+        self._statuses = {}  # type: Dict[str, os.stat_result]
+        self._started_ns = int(time.time() * 1e9)
+
+    def _relative_path(self, path: str) -> str:
+        prefix_length = self._prefix_length
+        return path[prefix_length:].lstrip(os.sep)
+
+    def stat(self, path: str, follow_symlinks: bool = True) -> os.stat_result:
+        """
+        Gets the status of a directory as :func:`os.stat` does, keeping it for the
+        scan of the directory, e.g. when a
+        :class:`~pycollect.deduplication.InodeDeduplicator` gets it first, so that
+        each directory is only stat'ed once.
+        """
+        status = os.stat(path, follow_symlinks=follow_symlinks)
+        if follow_symlinks or not stat.S_ISLNK(status.st_mode):
+            self._statuses[path] = status
+        return status
+
+    def wrap(self, scan: Callable[[str], ScanResult]) -> Callable[[str], ScanResult]:
+        separator = CollectionCache._SEPARATOR
+        join = os.path.join
+
+        def cached_scan(path: str) -> ScanResult:
+            relative_path = self._relative_path(path)
+            self._visited.add(relative_path)
+            status = self._statuses.pop(path, None)
+            if status is None:
+                status = os.stat(path)
+            mtime_ns = status.st_mtime_ns
+            record = self._records.get(relative_path)
+            if record is not None and record[0] == mtime_ns:
+                _, file_names, subdir_names = record
+                return (
+                    [
+                        FileEntry(join(path, name))
+                        for name in file_names.split(separator)
+                        if name
+                    ],
+                    [
+                        join(path, name)
+                        for name in subdir_names.split(separator)
+                        if name
+                    ],
+                )
+            files, subdirs = scan(path)
+            if mtime_ns > self._started_ns - RACY_WINDOW_NS:
+                mtime_ns = -1
+            self._updates.append(
+                (
+                    relative_path,
+                    mtime_ns,
+                    separator.join(file.name for file in files),
+                    separator.join(os.path.basename(subdir) for subdir in subdirs),
+                )
+            )
+            return files, subdirs
+
+        return cached_scan
+
+    def save(self, complete: bool) -> None:
+        """
+        Saves the records of the directories scanned during the traversal.
+
+        :param complete:
+            Whether the whole tree was traversed, in which case records of
+            directories that were not visited are removed as they no longer exist.
+        """
+        self._cache._save(
+            self._collection_id, self._updates, self._visited if complete else None
+        )
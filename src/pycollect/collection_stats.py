@@ -0,0 +1,181 @@
+import os
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pycollect.collection_cache import ScanResult
+from pycollect.pattern_matcher import PatternMatcher
+
+
+class CollectionStats:
+    """
+    CollectionStats records how a collection went: how many directories were scanned
+    and entries examined, which exclusion patterns excluded what, and how long
+    scanning each directory took. It is filled in by passing it as the ``stats``
+    argument of :meth:`~pycollect.python_file_collector.PythonFileCollector.collect`,
+    :meth:`~pycollect.python_file_collector.PythonFileCollector.iter_collect` or
+    :meth:`~pycollect.python_file_collector.PythonFileCollector.acollect`, and may be
+    reused to accumulate several collections.
+
+    Directories are then scanned by an instrumented scanning function; collections
+    made without a ``stats`` argument do not pay for any of it. Directories whose
+    scan is skipped, e.g. because it was retrieved from a
+    :class:`~pycollect.collection_cache.CollectionCache`, are not accounted for, nor
+    are path exclusion patterns, which are applied to the result of each scan.
+
+    When collecting with ``workers``, the callbacks are called from the worker
+    threads.
+
+    :param on_directory:
+        (default: None) callback called, after each directory is scanned, with its
+        path and the number of seconds scanning it took.
+    :param on_entry:
+        (default: None) callback called with each scanned
+        :class:`os.DirEntry` and a boolean telling whether it was collected, for
+        files, or descended into, for directories.
+    :param keep_excluded:
+        (default: True) whether to keep the paths of the excluded files and
+        directories in :attr:`excluded_files` and :attr:`excluded_dirs`.
+    """
+
+    def __init__(
+        self,
+        on_directory: Optional[Callable[[str, float], None]] = None,
+        on_entry: Optional[Callable[[os.DirEntry, bool], None]] = None,
+        keep_excluded: bool = True,
+    ):
+        self.on_directory = on_directory
+        self.on_entry = on_entry
+        self.keep_excluded = keep_excluded
+        #: Number of directories scanned.
+        self.dirs_visited = 0
+        #: Number of directory entries examined.
+        self.entries_scanned = 0
+        #: Number of entries that were symbolic links to resolve with a ``stat``
+        #: call. Other entries are typed from the directory listing itself.
+        self.stat_calls = 0
+        #: Number of files that passed the file exclusion patterns.
+        self.files_collected = 0
+        #: Number of files excluded by each file exclusion pattern.
+        self.file_pattern_hits = Counter()  # type: Counter
+        #: Number of directories excluded by each directory exclusion pattern.
+        self.dir_pattern_hits = Counter()  # type: Counter
+        #: Paths of the excluded files.
+        self.excluded_files = []  # type: List[str]
+        #: Paths of the excluded directories, whose content was not scanned.
+        self.excluded_dirs = []  # type: List[str]
+        #: Number of seconds spent scanning each directory, subdirectories excluded.
+        self.dir_times = {}  # type: Dict[str, float]
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            "<CollectionStats: {} files collected from {} directories, "
+            "{} entries scanned in {:.3f}s>".format(
+                self.files_collected,
+                self.dirs_visited,
+                self.entries_scanned,
+                self.total_time,
+            )
+        )
+
+    @property
+    def total_time(self) -> float:
+        """
+        Number of seconds spent scanning directories.
+        """
+        return sum(self.dir_times.values())
+
+    def slowest_dirs(self, count: int = 10) -> List[Tuple[str, float]]:
+        """
+        Lists the directories that took the longest to scan, subdirectories excluded.
+
+        :param count:
+            (default: 10) maximum number of directories to list.
+        :return:
+            A list of ``(path, seconds)`` tuples, slowest first.
+        """
+        return sorted(self.dir_times.items(), key=lambda item: -item[1])[:count]
+
+    def slowest_subtrees(self, count: int = 10) -> List[Tuple[str, float]]:
+        """
+        Lists the directories whose whole scanned subtree took the longest to scan.
+
+        :param count:
+            (default: 10) maximum number of directories to list.
+        :return:
+            A list of ``(path, seconds)`` tuples, slowest first.
+        """
+        subtree_times = dict.fromkeys(self.dir_times, 0.0)
+        for path, seconds in self.dir_times.items():
+            while path in subtree_times:
+                subtree_times[path] += seconds
+                parent = os.path.dirname(path)
+                if parent == path:
+                    break
+                path = parent
+        return sorted(subtree_times.items(), key=lambda item: -item[1])[:count]
+
+    def scan(
+        self,
+        path: str,
+        follow_symlinks: bool,
+        file_matcher: PatternMatcher,
+        dir_matcher: PatternMatcher,
+    ) -> ScanResult:
+        """
+        Instrumented counterpart of the collector's directory scanning function.
+        """
+        files = []  # type: List[os.DirEntry]
+        subdirs = []  # type: List[str]
+        excluded_files = []  # type: List[os.DirEntry]
+        excluded_dirs = []  # type: List[os.DirEntry]
+        scanned = []  # type: List[Tuple[os.DirEntry, bool]]
+        stat_calls = 0
+        start = time.perf_counter()
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if follow_symlinks and entry.is_symlink():
+                    stat_calls += 1
+                if entry.is_file(follow_symlinks=follow_symlinks):
+                    excluded = file_matcher.matches(entry.name)
+                    (excluded_files if excluded else files).append(entry)
+                elif entry.is_dir(follow_symlinks=follow_symlinks):
+                    excluded = dir_matcher.matches(entry.name)
+                    if excluded:
+                        excluded_dirs.append(entry)
+                    else:
+                        subdirs.append(entry.path)
+                else:
+                    excluded = True
+                scanned.append((entry, not excluded))
+        seconds = time.perf_counter() - start
+
+        file_hits = self._pattern_hits(file_matcher, excluded_files)
+        dir_hits = self._pattern_hits(dir_matcher, excluded_dirs)
+        with self._lock:
+            self.dirs_visited += 1
+            self.entries_scanned += len(scanned)
+            self.stat_calls += stat_calls
+            self.files_collected += len(files)
+            self.file_pattern_hits.update(file_hits)
+            self.dir_pattern_hits.update(dir_hits)
+            if self.keep_excluded:
+                self.excluded_files.extend(entry.path for entry in excluded_files)
+                self.excluded_dirs.extend(entry.path for entry in excluded_dirs)
+            self.dir_times[path] = self.dir_times.get(path, 0.0) + seconds
+
+        if self.on_entry is not None:
+            for entry, included in scanned:
+                self.on_entry(entry, included)
+        if self.on_directory is not None:
+            self.on_directory(path, seconds)
+        return files, subdirs
+
+    @staticmethod
+    def _pattern_hits(matcher: PatternMatcher, entries: List[os.DirEntry]) -> Counter:
+        hits = Counter()  # type: Counter
+        for entry in entries:
+            hits.update(matcher.matching_patterns(entry.name))
+        return hits
@@ -0,0 +1,144 @@
+import os
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+from pycollect.file_entry import FileEntry
+
+
+class CompactCollection:
+    """
+    CompactCollection is a memory efficient, immutable set of file paths meant for
+    collections of millions of files.
+
+    Instead of one :class:`os.DirEntry` and one full path string per file, each
+    distinct directory path is stored once, all file names are concatenated into a
+    single string and files are located by integer offsets kept in arrays. Files are
+    kept sorted by directory and then by name, so membership tests are a dictionary
+    lookup followed by a binary search, and iteration is deterministic.
+
+    Instances can be pickled, e.g. to be sent to worker processes, at the cost of
+    roughly the size of the file names.
+
+    >>> collection = CompactCollection(["pkg/b.py", "pkg/a.py", "main.py"])
+    >>> list(collection)
+    ['main.py', 'pkg/a.py', 'pkg/b.py']
+    >>> "pkg/b.py" in collection
+    True
+
+    :param files:
+        The paths of the files, as path strings, PathLike objects or entries such as
+        :class:`os.DirEntry`.
+    """
+
+    __slots__ = ("_dirs", "_dir_index", "_dir_offsets", "_names", "_name_offsets")
+
+    def __init__(self, files: Iterable[Union[str, os.PathLike]] = ()):
+        grouped = {}  # type: Dict[str, List[str]]
+        for file in files:
+            directory, name = os.path.split(os.fspath(file))
+            grouped.setdefault(directory, []).append(name)
+
+        dirs = sorted(grouped)
+        dir_offsets = array("Q", [0])
+        names = []  # type: List[str]
+        for directory in dirs:
+            dir_names = sorted(set(grouped.pop(directory)))
+            names.extend(dir_names)
+            dir_offsets.append(len(names))
+        name_offsets = array("Q", [0])
+        offset = 0
+        for name in names:
+            offset += len(name)
+            name_offsets.append(offset)
+        self._set_state((dirs, dir_offsets, "".join(names), name_offsets))
+
+    def _set_state(self, state: Tuple[List[str], array, str, array]) -> None:
+        dirs, self._dir_offsets, self._names, self._name_offsets = state
+        self._dirs = [sys.intern(directory) for directory in dirs]
+        self._dir_index = {
+            directory: index for index, directory in enumerate(self._dirs)
+        }
+
+    def __getstate__(self) -> Tuple[List[str], array, str, array]:
+        return self._dirs, self._dir_offsets, self._names, self._name_offsets
+
+    def __setstate__(self, state: Tuple[List[str], array, str, array]) -> None:
+        self._set_state(state)
+
+    def __len__(self) -> int:
+        return len(self._name_offsets) - 1
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CompactCollection):
+            return self.__getstate__() == other.__getstate__()
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return "<CompactCollection of {} files in {} directories>".format(
+            len(self), len(self._dirs)
+        )
+
+    def _name(self, index: int) -> str:
+        start = self._name_offsets[index]
+        stop = self._name_offsets[index + 1]
+        return self._names[start:stop]
+
+    def __contains__(self, file: object) -> bool:
+        try:
+            directory, name = os.path.split(os.fspath(file))
+        except TypeError:
+            return False
+        dir_index = self._dir_index.get(directory)
+        if dir_index is None:
+            return False
+        low = self._dir_offsets[dir_index]
+        high = self._dir_offsets[dir_index + 1]
+        while low < high:
+            middle = (low + high) // 2
+            if self._name(middle) < name:
+                low = middle + 1
+            else:
+                high = middle
+        return low < self._dir_offsets[dir_index + 1] and self._name(low) == name
+
+    def __iter__(self) -> Iterator[str]:
+        join = os.path.join
+        names = self._names
+        name_offsets = self._name_offsets
+        dir_offsets = self._dir_offsets
+        for dir_index, directory in enumerate(self._dirs):
+            for index in range(dir_offsets[dir_index], dir_offsets[dir_index + 1]):
+                start = name_offsets[index]
+                stop = name_offsets[index + 1]
+                yield join(directory, names[start:stop])
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("CompactCollection index out of range")
+        # the last directory whose first file is at or before the index
+        low, high = 0, len(self._dirs)
+        while low < high:
+            middle = (low + high) // 2
+            if self._dir_offsets[middle + 1] <= index:
+                low = middle + 1
+            else:
+                high = middle
+        return os.path.join(self._dirs[low], self._name(index))
+
+    def entries(self) -> Iterator[FileEntry]:
+        """
+        Iterates over the files as lazily created
+        :class:`~pycollect.file_entry.FileEntry` instances.
+        """
+        return map(FileEntry, self)
+
+    def directories(self) -> List[str]:
+        """
+        Lists the distinct directories containing the files, sorted.
+        """
+        return list(self._dirs)
@@ -0,0 +1,92 @@
+import mmap
+import os
+from typing import Callable, Optional, Pattern, Union
+
+from pycollect.collection_cache import ScanResult
+
+
+class ContentFilter:
+    """
+    ContentFilter keeps only the files whose content contains a byte string or
+    matches a regular expression over bytes.
+
+    Contents are never decoded: small files are read in a single call and larger
+    ones are memory mapped, so they are searched without being copied into Python
+    objects.
+
+    >>> ContentFilter(b"__main__")
+    <ContentFilter b'__main__'>
+
+    :param pattern:
+        The byte string to look for, or a compiled regular expression over bytes to
+        search for, e.g. ``re.compile(rb"^@register\\b", re.MULTILINE)``.
+    :param max_size:
+        (default: None) size, in bytes, above which files are left out without being
+        read.
+    :param head:
+        (default: None) when given, only the first ``head`` bytes of each file are
+        searched.
+    """
+
+    #: Files up to this size, in bytes, are read rather than memory mapped.
+    MMAP_THRESHOLD = 64 * 1024
+
+    def __init__(
+        self,
+        pattern: Union[bytes, Pattern[bytes]],
+        max_size: Optional[int] = None,
+        head: Optional[int] = None,
+    ):
+        if isinstance(pattern, (bytes, bytearray)):
+            needle = bytes(pattern)
+            self._search = lambda data: data.find(needle) >= 0
+        elif hasattr(pattern, "search") and isinstance(pattern.pattern, bytes):
+            self._search = lambda data: pattern.search(data) is not None
+        else:
+            raise TypeError(
+                "content patterns must be bytes or compiled bytes regular expressions,"
+                " not {!r}".format(pattern)
+            )
+        self.pattern = pattern
+        self.max_size = max_size
+        self.head = head
+
+    def __repr__(self) -> str:
+        return "<ContentFilter {!r}>".format(self.pattern)
+
+    def matches(self, path: Union[str, os.PathLike]) -> bool:
+        """
+        Checks whether a file's content matches. Files that cannot be read do not.
+
+        :param path:
+            The path of the file.
+        :return:
+            ``True`` if the pattern is found in the file.
+        """
+        try:
+            with open(path, "rb") as file:
+                size = os.fstat(file.fileno()).st_size
+                if self.max_size is not None and size > self.max_size:
+                    return False
+                if self.head is not None and self.head < size:
+                    return self._search(file.read(self.head))
+                if size <= self.MMAP_THRESHOLD:
+                    return self._search(file.read())
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return self._search(mapped)
+        except (OSError, ValueError):
+            # ValueError: the file was truncated to zero bytes before being mapped
+            return False
+
+    def wrap(self, scan: Callable[[str], ScanResult]) -> Callable[[str], ScanResult]:
+        """
+        Turns a directory scanning function into one also leaving out the files
+        whose content does not match.
+        """
+        matches = self.matches
+
+        def filtered_scan(path: str) -> ScanResult:
+            files, subdirs = scan(path)
+            return [file for file in files if matches(file.path)], subdirs
+
+        return filtered_scan
@@ -0,0 +1,276 @@
+import os
+import stat
+import threading
+import warnings
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pycollect.collection_cache import ScanResult
+
+T = TypeVar("T")
+
+
+class SymlinkLoopWarning(UserWarning):
+    """
+    Warning issued when a symbolic link leading to one of its own ancestor
+    directories is found, and therefore not followed, during a collection.
+    """
+
+
+class InodeDeduplicator:
+    """
+    InodeDeduplicator identifies directories, and optionally files, by their device
+    and inode numbers so that each physical directory is scanned, and each physical
+    file is collected, at most once during a traversal, whatever the number of
+    symbolic links leading to them.
+
+    When a directory is reached again through a path within the first path it was
+    reached through, a symbolic link loop was found: a :class:`SymlinkLoopWarning` is
+    issued instead of following it.
+
+    :param unique_dirs:
+        Whether to scan each physical directory only once.
+    :param unique_files:
+        Whether to collect each physical file only once.
+    :param follow_symlinks:
+        Whether symbolic links to files are followed, in which case files are
+        identified by the file they point to.
+    :param stat_dir:
+        (default: None) function getting the status of a directory from its path,
+        accepting a ``follow_symlinks`` keyword argument. By default :func:`os.stat`
+        is used.
+    :param defer_symlinks:
+        (default: False) whether to leave the directories whose path is a symbolic
+        link unscanned until the rest of the tree was traversed, so that the real
+        path of a directory is the one kept whatever the order directories are
+        scanned in. The traversal must then be run with :meth:`walk` or
+        :meth:`awalk`.
+    """
+
+    def __init__(
+        self,
+        unique_dirs: bool,
+        unique_files: bool,
+        follow_symlinks: bool,
+        stat_dir: Optional[Callable[..., os.stat_result]] = None,
+        defer_symlinks: bool = False,
+    ):
+        self.unique_dirs = unique_dirs
+        self.unique_files = unique_files
+        self.follow_symlinks = follow_symlinks
+        self.stat_dir = os.stat if stat_dir is None else stat_dir
+        self.defer_symlinks = defer_symlinks
+        #: Paths that were not scanned, mapped to the path of the same directory that
+        #: was scanned instead.
+        self.revisited_dirs = {}  # type: Dict[str, str]
+        self._dirs = {}  # type: Dict[Tuple[int, ...], str]
+        # scanned directory path -> its device and inode numbers
+        self._keys = {}  # type: Dict[str, Tuple[int, ...]]
+        self._files = set()  # type: Set[Tuple[int, int]]
+        # the symbolic links left unscanned, and the ones to scan nonetheless
+        self._deferred = []  # type: List[str]
+        self._roots = set()  # type: Set[str]
+        self._lock = threading.Lock()
+
+    def wrap(
+        self, scan: Callable[[str], "ScanResult"]
+    ) -> Callable[[str], "ScanResult"]:
+        def deduplicated_scan(path: str) -> "ScanResult":
+            if self.unique_dirs and not self._first_visit(path):
+                return [], []
+            files, subdirs = scan(path)
+            if self.unique_files:
+                files = [file for file in files if self._first_file(file)]
+            return files, subdirs
+
+        return deduplicated_scan
+
+    def _first_visit(self, path: str) -> bool:
+        key = self.directory_key(path)
+        return key is not None and self.claim(key, path)
+
+    def directory_key(self, path: str) -> Optional[Tuple[int, ...]]:
+        """
+        Gets the device and inode numbers identifying a directory.
+
+        :return:
+            The numbers, or None when the directory is left unscanned for now
+            because its path is a symbolic link.
+        """
+        if self.defer_symlinks and path not in self._roots:
+            # a directory has the same status whether followed or not
+            status = self.stat_dir(path, follow_symlinks=False)
+            if stat.S_ISLNK(status.st_mode):
+                with self._lock:
+                    self._deferred.append(path)
+                return None
+        else:
+            status = self.stat_dir(path)
+        return status.st_dev, status.st_ino
+
+    def claim(self, key: Tuple[int, ...], path: str) -> bool:
+        """
+        Records a directory as scanned through a path, unless it already was
+        through another path, e.g. the key of a directory along with a profile
+        number to scan each directory once per profile.
+
+        :return:
+            Whether the directory is to be scanned through this path.
+        """
+        with self._lock:
+            first_path = self._dirs.setdefault(key, path)
+            if first_path == path:
+                self._keys[path] = key
+                return True
+            self.revisited_dirs[path] = first_path
+        if path.startswith(os.path.join(first_path, "")):
+            warnings.warn(
+                "Not following symbolic link loop {!r} back to {!r}".format(
+                    path, first_path
+                ),
+                SymlinkLoopWarning,
+            )
+        return False
+
+    def walk(
+        self,
+        walk_from: Callable[[str, Optional[int]], Iterator[T]],
+        search_path: str,
+        recursion_limit: Optional[int],
+        keep: Optional[Callable[[str], bool]] = None,
+    ) -> Iterator[T]:
+        """
+        Runs a traversal from ``search_path``, then from each directory left
+        unscanned because its path is a symbolic link, in rounds, each round
+        traversing the ones found by the previous round in sorted order.
+
+        :param walk_from:
+            function traversing a tree from a directory, down to a recursion limit.
+        :param keep:
+            (default: None) function telling whether to traverse a directory left
+            unscanned. By default, all of them are.
+        """
+        self.add_root(search_path)
+        yield from walk_from(search_path, recursion_limit)
+        yield from self.walk_deferred(walk_from, search_path, recursion_limit, keep)
+
+    def walk_deferred(
+        self,
+        walk_from: Callable[[str, Optional[int]], Iterator[T]],
+        search_path: str,
+        recursion_limit: Optional[int],
+        keep: Optional[Callable[[str], bool]] = None,
+    ) -> Iterator[T]:
+        """
+        Runs the rounds of :meth:`walk` following the traversal from
+        ``search_path``, once that traversal is over, e.g. when it was split across
+        processes whose deduplicators were merged with :meth:`merge`.
+        """
+        for root, limit in self._deferred_roots(search_path, recursion_limit):
+            if keep is None or keep(root):
+                yield from walk_from(root, limit)
+
+    async def awalk(
+        self,
+        walk_from: Callable[[str, Optional[int]], AsyncIterator[T]],
+        search_path: str,
+        recursion_limit: Optional[int],
+    ) -> AsyncIterator[T]:
+        """
+        Asynchronous counterpart of :meth:`walk`.
+        """
+        self.add_root(search_path)
+        async for item in walk_from(search_path, recursion_limit):
+            yield item
+        for root, limit in self._deferred_roots(search_path, recursion_limit):
+            async for item in walk_from(root, limit):
+                yield item
+
+    def add_root(self, path: str) -> None:
+        """
+        Lets a directory be scanned even if its path is a symbolic link, e.g. the
+        search path.
+        """
+        self._roots.add(path)
+
+    def merge(self, other: "InodeDeduplicator") -> None:
+        """
+        Merges the directories and files seen by another deduplicator, e.g. one that
+        ran in another process over part of the same tree, along with the
+        directories it left unscanned.
+        """
+        with self._lock:
+            for key, path in other._dirs.items():
+                first_path = self._dirs.setdefault(key, path)
+                if first_path == path:
+                    self._keys[path] = key
+                else:
+                    self.revisited_dirs[path] = first_path
+            self.revisited_dirs.update(other.revisited_dirs)
+            self._files.update(other._files)
+            self._deferred.extend(other._deferred)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _deferred_roots(
+        self, search_path: str, recursion_limit: Optional[int]
+    ) -> Iterator[Tuple[str, Optional[int]]]:
+        while self._deferred:
+            with self._lock:
+                roots, self._deferred = sorted(self._deferred), []
+            for root in roots:
+                self._roots.add(root)
+                depth = len(os.path.relpath(root, search_path).split(os.sep))
+                yield root, None if recursion_limit is None else recursion_limit - depth
+
+    def forget(self, path: str) -> List[str]:
+        """
+        Forgets a directory that is gone, e.g. because it was deleted or renamed,
+        so that the next directory visited with the same device and inode numbers,
+        such as the same directory under its new name, is scanned.
+
+        :return:
+            The paths that were not scanned because they led to the forgotten
+            directory, and that should be visited again.
+        """
+        with self._lock:
+            self.revisited_dirs.pop(path, None)
+            key = self._keys.pop(path, None)
+            if key is None:
+                return []
+            del self._dirs[key]
+            revisited = sorted(
+                revisited_path
+                for revisited_path, first_path in self.revisited_dirs.items()
+                if first_path == path
+            )
+            for revisited_path in revisited:
+                del self.revisited_dirs[revisited_path]
+        return revisited
+
+    def _first_file(self, file: os.DirEntry) -> bool:
+        stat = file.stat(follow_symlinks=self.follow_symlinks)
+        key = (stat.st_dev, stat.st_ino)
+        with self._lock:
+            if key in self._files:
+                return False
+            self._files.add(key)
+            return True
@@ -0,0 +1,125 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, List
+
+from pycollect.collection_cache import ScanResult
+from pycollect.file_entry import FileEntry
+
+
+class DirFdScanner:
+    """
+    DirFdScanner scans directories through file descriptors, as :func:`os.fwalk`
+    does, rather than through their paths.
+
+    Each directory is opened once, relative to the file descriptor of its parent
+    directory when it is still open, so the kernel does not resolve the whole path
+    of every directory again. Its entries are listed from the file descriptor, their
+    types being taken from the directory listing, and only the symbolic links to
+    follow are stat'ed, relative to the same file descriptor. Paths are only built
+    for the collected files, returned as :class:`~pycollect.file_entry.FileEntry`
+    instances, and for the subdirectories to descend into.
+
+    The file descriptors of the last scanned directories having subdirectories are
+    kept open, up to :attr:`MAX_OPEN_DIRS`, until :meth:`close` is called.
+
+    :param follow_symlinks:
+        Whether to follow symbolic links.
+    :param exclude_file:
+        Function telling whether a file name is excluded.
+    :param exclude_dir:
+        Function telling whether a directory name is excluded.
+    """
+
+    #: Maximum number of directory file descriptors kept open to scan their
+    #: subdirectories relative to them.
+    MAX_OPEN_DIRS = 64
+    _FLAGS = os.O_RDONLY | getattr(os, "O_DIRECTORY", 0) | getattr(os, "O_CLOEXEC", 0)
+
+    def __init__(
+        self,
+        follow_symlinks: bool,
+        exclude_file: Callable[[str], bool],
+        exclude_dir: Callable[[str], bool],
+    ):
+        self.follow_symlinks = follow_symlinks
+        self.exclude_file = exclude_file
+        self.exclude_dir = exclude_dir
+        # directory path -> file descriptor, least recently used first
+        self._open_dirs = OrderedDict()  # type: OrderedDict
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_available() -> bool:
+        """
+        Checks whether directories can be opened relative to a file descriptor and
+        listed from one on this platform.
+        """
+        return os.open in os.supports_dir_fd and os.scandir in os.supports_fd
+
+    def scan(self, path: str) -> ScanResult:
+        """
+        Scans a single directory and splits its entries into the files to collect and
+        the paths of the subdirectories to descend into.
+        """
+        fd = self._open(path)
+        files = []  # type: List[FileEntry]
+        subdirs = []  # type: List[str]
+        prefix = os.path.join(path, "")
+        follow_symlinks = self.follow_symlinks
+        try:
+            with os.scandir(fd) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=follow_symlinks):
+                        if not self.exclude_file(entry.name):
+                            files.append(FileEntry(prefix + entry.name, entry.name))
+                    elif entry.is_dir(follow_symlinks=follow_symlinks):
+                        if not self.exclude_dir(entry.name):
+                            subdirs.append(prefix + entry.name)
+        except BaseException:
+            os.close(fd)
+            raise
+        if subdirs:
+            self._keep_open(path, fd)
+        else:
+            os.close(fd)
+        return files, subdirs
+
+    def _open(self, path: str) -> int:
+        parent, _, name = path.rpartition(os.sep)
+        with self._lock:
+            parent_fd = self._open_dirs.get(parent)
+            if parent_fd is not None and name:
+                self._open_dirs.move_to_end(parent)
+                # opened while holding the lock, so parent_fd can not be closed
+                return os.open(name, self._FLAGS, dir_fd=parent_fd)
+        return os.open(path, self._FLAGS)
+
+    def stat(self, path: str, follow_symlinks: bool = True) -> os.stat_result:
+        """
+        Gets the status of a directory, relative to its parent's file descriptor when
+        still open.
+        """
+        parent, _, name = path.rpartition(os.sep)
+        with self._lock:
+            parent_fd = self._open_dirs.get(parent)
+            if parent_fd is not None and name:
+                return os.stat(name, dir_fd=parent_fd, follow_symlinks=follow_symlinks)
+        return os.stat(path, follow_symlinks=follow_symlinks)
+
+    def _keep_open(self, path: str, fd: int) -> None:
+        with self._lock:
+            previous_fd = self._open_dirs.pop(path, None)
+            self._open_dirs[path] = fd
+            if previous_fd is not None:
+                os.close(previous_fd)
+            while len(self._open_dirs) > self.MAX_OPEN_DIRS:
+                os.close(self._open_dirs.popitem(last=False)[1])
+
+    def close(self) -> None:
+        """
+        Closes the directory file descriptors kept open.
+        """
+        with self._lock:
+            while self._open_dirs:
+                os.close(self._open_dirs.popitem()[1])
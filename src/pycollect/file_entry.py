@@ -0,0 +1,76 @@
+import os
+from typing import Callable, Optional
+
+
+class FileEntry:
+    """
+    FileEntry is a lightweight, picklable stand-in for :class:`os.DirEntry` used when
+    a collected file was not obtained from a fresh :func:`os.scandir` call, e.g. when
+    it comes from a :class:`~pycollect.collection_cache.CollectionCache`.
+
+    It provides the same ``name`` and ``path`` attributes and the same methods as
+    :class:`os.DirEntry`, but file system information is only queried, and cached,
+    when first requested. Unlike :class:`os.DirEntry`, two instances referring to the
+    same path are equal.
+
+    :param path:
+        The path of the file, built the same way :class:`os.DirEntry` does, i.e.
+        joining the scanned directory path and the file name.
+    :param name:
+        (default: None) the name of the file when already known. By default it is
+        taken from the path.
+    """
+
+    __slots__ = ("name", "path", "_stat", "_lstat")
+
+    def __init__(self, path: str, name: Optional[str] = None):
+        self.path = path
+        self.name = os.path.basename(path) if name is None else name
+        self._stat = None  # type: Optional[os.stat_result]
+        self._lstat = None  # type: Optional[os.stat_result]
+
+    def __fspath__(self) -> str:
+        return self.path
+
+    def __repr__(self) -> str:
+        return "<FileEntry {!r}>".format(self.name)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, FileEntry):
+            return self.path == other.path
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.path)
+
+    def __getstate__(self) -> str:
+        return self.path
+
+    def __setstate__(self, state: str) -> None:
+        self.__init__(state)
+
+    def stat(self, *, follow_symlinks: bool = True) -> os.stat_result:
+        if follow_symlinks:
+            if self._stat is None:
+                self._stat = os.stat(self.path)
+            return self._stat
+        if self._lstat is None:
+            self._lstat = os.lstat(self.path)
+        return self._lstat
+
+    def inode(self) -> int:
+        return self.stat(follow_symlinks=False).st_ino
+
+    def is_symlink(self) -> bool:
+        return os.path.islink(self.path)
+
+    def is_file(self, *, follow_symlinks: bool = True) -> bool:
+        return self._is_type(os.path.isfile, follow_symlinks)
+
+    def is_dir(self, *, follow_symlinks: bool = True) -> bool:
+        return self._is_type(os.path.isdir, follow_symlinks)
+
+    def _is_type(self, check: Callable[[str], bool], follow_symlinks: bool) -> bool:
+        if not follow_symlinks and self.is_symlink():
+            return False
+        return check(self.path)
@@ -0,0 +1,215 @@
+import os
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Pattern, Tuple
+
+from pycollect.collection_cache import ScanResult
+
+
+class GlobMatcher:
+    """
+    GlobMatcher compiles path glob patterns, matched against paths relative to the
+    search path, into a single regular expression per entry type.
+
+    The syntax is the one of ``.gitignore`` files:
+
+    * ``*`` matches anything but a slash, ``?`` matches any single character but a
+      slash and ``[...]`` matches one character of a set, ``[!...]`` one character
+      out of it;
+    * ``**`` matches any number of directories: ``**/foo`` matches ``foo`` at any
+      depth, ``foo/**`` everything within ``foo`` and ``a/**/b`` matches ``a/b``,
+      ``a/x/b``, ``a/x/y/b`` and so on;
+    * a pattern containing a slash, other than a trailing one, is anchored to the
+      search path; otherwise it matches names at any depth, like ``**/pattern``;
+    * a trailing slash only matches directories;
+    * a leading ``!`` negates the pattern, including again what previous patterns
+      excluded. The last pattern matching a path decides whether it is excluded;
+    * a backslash escapes the next character.
+
+    Excluded directories are pruned from the traversal. As in git, files within an
+    excluded directory cannot be included again by a negated pattern. A directory
+    whose whole content is excluded by a ``dir/**`` pattern is pruned as well,
+    unless a later negated pattern could include something back.
+
+    >>> matcher = GlobMatcher(["*.py[cod]", "!keep.pyc", "tests/fixtures/**"])
+    >>> matcher.excludes("tests/fixtures", is_dir=True)
+    True
+    >>> matcher.excludes("tests", is_dir=True)
+    False
+    >>> matcher.excludes("pkg/keep.pyc", is_dir=False)
+    False
+
+    :param patterns:
+        The glob patterns, in order of precedence: later patterns override earlier
+        ones.
+    """
+
+    _NEGATION = "!"
+    _SEPARATOR = "/"
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = tuple(patterns)
+        self._negated = {}  # type: Dict[int, bool]
+        file_alternatives = []  # type: List[str]
+        dir_alternatives = []  # type: List[str]
+        later_negation = False
+        # patterns are tried last first, so that the first alternative matching is
+        # the one of the pattern taking precedence
+        for index in reversed(range(len(self.patterns))):
+            pattern = self.patterns[index]
+            if pattern.startswith("#") or not pattern.strip("!/ "):
+                continue
+            negated, dir_only, regex, subtree_regex = self.translate(pattern)
+            self._negated[index] = negated
+            if not dir_only:
+                file_alternatives.append("(?P<r{}>{})".format(index, regex))
+            if subtree_regex is not None and not later_negation:
+                dir_alternatives.append("(?P<s{}>{})".format(index, subtree_regex))
+            dir_alternatives.append("(?P<r{}>{})".format(index, regex))
+            later_negation = later_negation or negated
+        self._file_regex = self._combine(file_alternatives)
+        self._dir_regex = self._combine(dir_alternatives)
+
+    @staticmethod
+    def _combine(alternatives: List[str]) -> Optional[Pattern]:
+        if not alternatives:
+            return None
+        return re.compile("|".join(alternatives), re.DOTALL)
+
+    @classmethod
+    def translate(cls, pattern: str) -> Tuple[bool, bool, str, Optional[str]]:
+        """
+        Translates a glob pattern into a regular expression matching whole relative
+        paths.
+
+        >>> GlobMatcher.translate("!docs/**/*.py")
+        (True, False, 'docs/(?:.*/)?[^/]*\\\\.py', None)
+
+        :param pattern:
+            The glob pattern.
+        :return:
+            Whether the pattern is negated, whether it only matches directories, the
+            regular expression, and the regular expression matching the directories
+            whose whole content the pattern matches, if any.
+        """
+        negated = pattern.startswith(cls._NEGATION)
+        if negated:
+            pattern = pattern[1:]
+        # trailing spaces are ignored unless escaped
+        if not pattern.endswith("\\ "):
+            pattern = pattern.rstrip(" ")
+        dir_only = pattern.endswith(cls._SEPARATOR)
+        pattern = pattern.rstrip(cls._SEPARATOR)
+        if cls._SEPARATOR not in pattern:
+            pattern = "**/" + pattern
+        segments = pattern.lstrip(cls._SEPARATOR).split(cls._SEPARATOR)
+
+        regex = ""
+        subtree_regex = None
+        for position, segment in enumerate(segments):
+            last = position == len(segments) - 1
+            if segment == "**":
+                if last:
+                    if position and segments[position - 1] != "**":
+                        subtree_regex = regex[: -len(cls._SEPARATOR)]
+                    regex += ".*"
+                else:
+                    regex += "(?:.*/)?"
+            else:
+                regex += cls._translate_segment(segment)
+                if not last:
+                    regex += cls._SEPARATOR
+        return negated, dir_only, regex, subtree_regex
+
+    @staticmethod
+    def _translate_segment(segment: str) -> str:
+        regex = ""
+        index = 0
+        while index < len(segment):
+            char = segment[index]
+            index += 1
+            if char == "*":
+                while index < len(segment) and segment[index] == "*":
+                    index += 1
+                regex += "[^/]*"
+            elif char == "?":
+                regex += "[^/]"
+            elif char == "\\" and index < len(segment):
+                regex += re.escape(segment[index])
+                index += 1
+            elif char == "[":
+                end = index
+                if end < len(segment) and segment[end] in "!^":
+                    end += 1
+                if end < len(segment) and segment[end] == "]":
+                    end += 1
+                end = segment.find("]", end)
+                if end < 0:
+                    regex += re.escape(char)
+                    continue
+                chars = segment[index:end]
+                index = end + 1
+                negated = chars[:1] in ("!", "^")
+                if negated:
+                    chars = chars[1:]
+                regex += "[{}{}]".format(
+                    "^/" if negated else "",
+                    "".join(c if c == "-" else re.escape(c) for c in chars),
+                )
+            else:
+                regex += re.escape(char)
+        return regex
+
+    def match(self, relative_path: str, is_dir: bool) -> Optional[bool]:
+        """
+        Finds out whether the patterns exclude a path.
+
+        :param relative_path:
+            The path relative to the search path, using forward slashes.
+        :param is_dir:
+            Whether the path is a directory.
+        :return:
+            ``True`` if the path is excluded, ``False`` if a negated pattern
+            includes it, and ``None`` if no pattern matches it.
+        """
+        regex = self._dir_regex if is_dir else self._file_regex
+        if regex is None:
+            return None
+        match = regex.fullmatch(relative_path)
+        if match is None:
+            return None
+        kind, index = match.lastgroup[0], int(match.lastgroup[1:])
+        return kind == "s" or not self._negated[index]
+
+    def excludes(self, relative_path: str, is_dir: bool) -> bool:
+        """
+        Checks whether a path is excluded. See :meth:`match`.
+        """
+        return self.match(relative_path, is_dir) is True
+
+    def wrap(
+        self, scan: Callable[[str], ScanResult], search_path: str
+    ) -> Callable[[str], ScanResult]:
+        """
+        Turns a directory scanning function into one also excluding the paths
+        matched by the patterns, relative to ``search_path``.
+        """
+        prefix_length = len(search_path)
+        excludes = self.excludes
+        basename = os.path.basename
+
+        def filtered_scan(path: str) -> ScanResult:
+            files, subdirs = scan(path)
+            relative_path = path[prefix_length:].lstrip(os.sep)
+            if os.sep != self._SEPARATOR:
+                relative_path = relative_path.replace(os.sep, self._SEPARATOR)
+            prefix = relative_path + self._SEPARATOR if relative_path else ""
+            return (
+                [file for file in files if not excludes(prefix + file.name, False)],
+                [
+                    subdir
+                    for subdir in subdirs
+                    if not excludes(prefix + basename(subdir), True)
+                ],
+            )
+
+        return filtered_scan
@@ -0,0 +1,182 @@
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from pycollect.collection_cache import ScanResult
+from pycollect.glob_matcher import GlobMatcher
+
+
+class _IgnoreRules(NamedTuple):
+    #: The rules of the ancestor directories, which this directory's rules override.
+    parent: Optional["_IgnoreRules"]
+    matcher: GlobMatcher
+    #: What to strip from, and then prepend to, a path relative to the search path to
+    #: make it relative to the directory the rules were read in.
+    strip: str
+    prepend: str
+
+
+class IgnoreFileMatcher:
+    """
+    IgnoreFileMatcher excludes the files and directories ignored by the
+    ``.gitignore`` and ``.ignore`` files found while traversing a tree.
+
+    Ignore files use the syntax described in
+    :class:`~pycollect.glob_matcher.GlobMatcher`, their patterns being relative to
+    the directory containing them. As in git, the rules of a directory stack over
+    the rules of its ancestors: the ignore files of deeper directories take
+    precedence, and within a directory the last matching pattern wins. Ignored
+    directories are pruned, their content cannot be included again.
+
+    The ignore files of each directory are read and compiled once, the first time
+    one of its entries is matched. When the search path is within a git repository,
+    the ignore files of the directories between the repository root and the search
+    path, along with ``.git/info/exclude``, apply as well.
+
+    :param search_path:
+        The search path the traversal starts from.
+    :param file_names:
+        The names of the ignore files to read, in increasing order of precedence.
+    """
+
+    def __init__(self, search_path: str, file_names: Iterable[str]):
+        self.search_path = search_path
+        self.file_names = tuple(file_names)
+        self._prefix_length = len(search_path)
+        # relative directory path -> rules applying to its entries
+        self._rules = {}  # type: Dict[str, Optional[_IgnoreRules]]
+        self._lock = threading.Lock()
+        self._ancestor_rules = self._read_ancestors()
+
+    def _read_ancestors(self) -> Optional[_IgnoreRules]:
+        search_path = os.path.abspath(self.search_path)
+        directory = search_path
+        ancestors = []  # type: List[str]
+        while not os.path.exists(os.path.join(directory, ".git")):
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                # not within a git repository: only the tree's own files apply
+                return None
+            directory = parent
+            ancestors.append(directory)
+
+        def prepend(directory: str) -> str:
+            if directory == search_path:
+                return ""
+            return self._slashed(os.path.relpath(search_path, directory)) + "/"
+
+        rules = self._read(
+            None,
+            [os.path.join(directory, ".git", "info", "exclude")],
+            "",
+            prepend(directory),
+        )
+        for ancestor in reversed(ancestors):
+            rules = self._read(
+                rules,
+                [os.path.join(ancestor, name) for name in self.file_names],
+                "",
+                prepend(ancestor),
+            )
+        return rules
+
+    @staticmethod
+    def _slashed(path: str) -> str:
+        return path.replace(os.sep, "/") if os.sep != "/" else path
+
+    @staticmethod
+    def _read(
+        parent: Optional[_IgnoreRules], paths: List[str], strip: str, prepend: str
+    ) -> Optional[_IgnoreRules]:
+        patterns = []  # type: List[str]
+        for path in paths:
+            try:
+                with open(path, encoding="utf-8", errors="replace") as ignore_file:
+                    patterns.extend(
+                        line.rstrip("\r\n")
+                        for line in ignore_file
+                        if line.strip() and not line.startswith("#")
+                    )
+            except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+                continue
+        if not patterns:
+            return parent
+        return _IgnoreRules(parent, GlobMatcher(patterns), strip, prepend)
+
+    def _rules_for(self, relative_dir: str) -> Optional[_IgnoreRules]:
+        # read the ignore files of the directory and of its ancestors not read yet
+        missing = []  # type: List[str]
+        directory = relative_dir
+        while directory not in self._rules:
+            missing.append(directory)
+            if not directory:
+                rules = self._ancestor_rules
+                break
+            directory = directory.rpartition("/")[0]
+        else:
+            rules = self._rules[directory]
+        for directory in reversed(missing):
+            rules = self._read(
+                rules,
+                [
+                    os.path.join(self.search_path, directory, name)
+                    for name in self.file_names
+                ],
+                directory + "/" if directory else "",
+                "",
+            )
+            with self._lock:
+                rules = self._rules.setdefault(directory, rules)
+        return rules
+
+    def excludes(self, relative_path: str, is_dir: bool) -> bool:
+        """
+        Checks whether a path, relative to the search path and using forward
+        slashes, is ignored.
+        """
+        return self._excludes(
+            self._rules_for(relative_path.rpartition("/")[0]), relative_path, is_dir
+        )
+
+    @staticmethod
+    def _excludes(
+        rules: Optional[_IgnoreRules], relative_path: str, is_dir: bool
+    ) -> bool:
+        while rules is not None:
+            start = len(rules.strip)
+            matched = rules.matcher.match(rules.prepend + relative_path[start:], is_dir)
+            if matched is not None:
+                return matched
+            rules = rules.parent
+        return False
+
+    def wrap(self, scan: Callable[[str], ScanResult]) -> Callable[[str], ScanResult]:
+        """
+        Turns a directory scanning function into one also excluding ignored files
+        and directories.
+        """
+        basename = os.path.basename
+        prefix_length = self._prefix_length
+
+        def filtered_scan(path: str) -> ScanResult:
+            files, subdirs = scan(path)
+            relative_path = self._slashed(path[prefix_length:].lstrip(os.sep))
+            prefix = relative_path + "/" if relative_path else ""
+            rules = self._rules_for(relative_path)
+            if rules is None:
+                return files, subdirs
+            excludes = self._excludes
+            return (
+                [
+                    file
+                    for file in files
+                    if not excludes(rules, prefix + file.name, False)
+                ],
+                [
+                    subdir
+                    for subdir in subdirs
+                    if not excludes(rules, prefix + basename(subdir), True)
+                ],
+            )
+
+        return filtered_scan
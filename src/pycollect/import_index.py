@@ -0,0 +1,558 @@
+import ast
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import sha1
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from pycollect.module_finder import ModuleNameResolver
+from pycollect.timestamps import RACY_WINDOW_NS
+
+#: An import statement as found in a file: its relative import level, the module
+#: it imports from and, for ``from`` imports, the imported names.
+RawImport = Tuple[int, str, Tuple[str, ...]]
+#: A class or function defined at the top level of a file: its name, the dotted
+#: names of its base classes and of its decorators, as written.
+RawSymbol = Tuple[str, Tuple[str, ...], Tuple[str, ...]]
+
+
+class ParsedFile(NamedTuple):
+    """
+    What is extracted from a single file, independently of its module name.
+    """
+
+    #: The SHA-1 digest of the file content.
+    digest: str
+    #: The import statements of the file, wherever they are.
+    imports: Tuple[RawImport, ...]
+    #: The names defined at the top level of the file.
+    definitions: Tuple[str, ...]
+    #: The syntax error message if the file could not be parsed.
+    error: Optional[str] = None
+    #: The classes and functions defined at the top level of the file.
+    symbols: Tuple[RawSymbol, ...] = ()
+
+
+class ModuleInfo(NamedTuple):
+    """
+    A module of an :class:`ImportIndex`.
+    """
+
+    #: The module name.
+    name: str
+    #: The path of the module's file.
+    path: str
+    #: Whether the module is a package, i.e. an ``__init__.py`` file.
+    is_package: bool
+    #: The names of the modules it imports, relative imports being resolved.
+    imports: FrozenSet[str]
+    #: The names defined at its top level.
+    definitions: Tuple[str, ...]
+    #: The syntax error message if its file could not be parsed.
+    error: Optional[str]
+    #: The classes and functions defined at its top level, with their base classes
+    #: and decorators.
+    symbols: Tuple[RawSymbol, ...] = ()
+
+
+def parse_file(path: str) -> ParsedFile:
+    """
+    Extracts the import statements and the top level definitions of a Python file,
+    along with the base classes and decorators of its top level classes and
+    functions.
+    """
+    with open(path, "rb") as file:
+        source = file.read()
+    digest = sha1(source).hexdigest()
+    try:
+        tree = ast.parse(source, path)
+    except (SyntaxError, ValueError) as error:
+        return ParsedFile(digest, (), (), str(error))
+
+    imports = []  # type: List[RawImport]
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.extend((0, alias.name, ()) for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            names = tuple(alias.name for alias in node.names)
+            imports.append((node.level, node.module or "", names))
+
+    definitions = []  # type: List[str]
+    symbols = []  # type: List[RawSymbol]
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            definitions.append(node.name)
+            bases = node.bases if isinstance(node, ast.ClassDef) else []
+            symbols.append(
+                (
+                    node.name,
+                    _dotted_names(bases),
+                    _dotted_names(
+                        decorator.func if isinstance(decorator, ast.Call) else decorator
+                        for decorator in node.decorator_list
+                    ),
+                )
+            )
+        elif isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                definitions.extend(
+                    name.id for name in ast.walk(target) if isinstance(name, ast.Name)
+                )
+    return ParsedFile(
+        digest, tuple(imports), tuple(dict.fromkeys(definitions)), None, tuple(symbols)
+    )
+
+
+def _dotted_names(nodes: Iterable[ast.expr]) -> Tuple[str, ...]:
+    names = []  # type: List[str]
+    for node in nodes:
+        if isinstance(node, ast.Subscript):
+            # generic bases, e.g. Plugin[T]
+            node = node.value
+        parts = []  # type: List[str]
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        if isinstance(node, ast.Name):
+            parts.append(node.id)
+            names.append(".".join(reversed(parts)))
+    return tuple(names)
+
+
+def _parse_files(paths: List[str]) -> List[Tuple[str, Optional[ParsedFile]]]:
+    parsed = []  # type: List[Tuple[str, Optional[ParsedFile]]]
+    for path in paths:
+        try:
+            parsed.append((path, parse_file(path)))
+        except OSError:
+            parsed.append((path, None))
+    return parsed
+
+
+class ImportIndex:
+    """
+    ImportIndex is an import graph of collected Python files.
+
+    Each file is parsed with :mod:`ast` to extract its import statements and its top
+    level definitions, and named with a
+    :class:`~pycollect.module_finder.ModuleNameResolver`, which allows resolving
+    relative imports. Parsing results are kept per file along with the file's
+    modification time, size and content digest, so updating the index only parses
+    again the files that changed. When given a path, results are persisted in a
+    SQLite database and reused by later processes.
+
+    Queries are answered from in memory forward and reverse adjacency maps, and from
+    maps of the top level names, base classes and decorators found in the sources,
+    allowing to discover plugins without importing any module:
+
+    .. code-block:: python
+
+        index = ImportIndex(".import-index.sqlite")
+        changed = index.update(PythonFileCollector().collect("src"))
+        affected = index.affected_by(changed)
+
+    :param path:
+        (default: None) path of the database to persist parsing results in. By
+        default, results are only kept in memory.
+    :param processes:
+        (default: None) number of worker processes parsing files. By default, files
+        are parsed in the current process.
+    :param innermost:
+        (default: False) whether to name modules after their innermost rather than
+        outermost possible module name. See
+        :func:`~pycollect.module_finder.find_module_name`.
+    """
+
+    _SCHEMA_VERSION = 2
+    #: Number of files sent to a worker process at once.
+    _CHUNK_SIZE = 64
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike, None] = None,
+        processes: Optional[int] = None,
+        innermost: bool = False,
+    ):
+        self.path = None if path is None else os.fspath(path)
+        self.processes = processes
+        self.innermost = innermost
+        self._resolver = ModuleNameResolver()
+        self._lock = threading.Lock()
+        # file path -> (mtime_ns, size, parsed file)
+        self._files = {}  # type: Dict[str, Tuple[int, int, ParsedFile]]
+        self._modules = {}  # type: Dict[str, ModuleInfo]
+        self._module_names = {}  # type: Dict[str, str]
+        self._importers = {}  # type: Dict[str, Set[str]]
+        # top level name -> names of the modules defining it
+        self._definers = {}  # type: Dict[str, Set[str]]
+        # last component of a base class or decorator name -> (module name, symbol
+        # name, dotted name as written)
+        self._subclasses = {}  # type: Dict[str, List[Tuple[str, str, str]]]
+        self._decorated = {}  # type: Dict[str, List[Tuple[str, str, str]]]
+        self._connection = None  # type: Optional[sqlite3.Connection]
+        if self.path is not None:
+            try:
+                self._connection = self._connect()
+            except sqlite3.DatabaseError:
+                os.remove(self.path)
+                self._connection = self._connect()
+            self._load()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        try:
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version != self._SCHEMA_VERSION:
+                connection.executescript(
+                    """
+                    DROP TABLE IF EXISTS files;
+                    CREATE TABLE files (
+                        path TEXT PRIMARY KEY,
+                        mtime_ns INTEGER NOT NULL,
+                        size INTEGER NOT NULL,
+                        data TEXT NOT NULL
+                    ) WITHOUT ROWID;
+                    """
+                )
+                connection.execute(
+                    "PRAGMA user_version = {:d}".format(self._SCHEMA_VERSION)
+                )
+                connection.commit()
+        except sqlite3.DatabaseError:
+            connection.close()
+            raise
+        return connection
+
+    def _load(self) -> None:
+        for path, mtime_ns, size, data in self._connection.execute(
+            "SELECT path, mtime_ns, size, data FROM files"
+        ):
+            digest, imports, definitions, error, symbols = json.loads(data)
+            parsed = ParsedFile(
+                digest,
+                tuple(
+                    (level, module, tuple(names)) for level, module, names in imports
+                ),
+                tuple(definitions),
+                error,
+                tuple(
+                    (name, tuple(bases), tuple(decorators))
+                    for name, bases, decorators in symbols
+                ),
+            )
+            self._files[path] = (mtime_ns, size, parsed)
+        self._build()
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __enter__(self) -> "ImportIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._modules)
+
+    def __contains__(self, module: object) -> bool:
+        return module in self._modules
+
+    def update(self, files: Iterable[Union[os.DirEntry, str, os.PathLike]]) -> Set[str]:
+        """
+        Updates the index so that it holds exactly the given files, parsing only the
+        ones that are new or changed since they were last indexed.
+
+        A file whose modification time changed but whose size did not is only parsed
+        again if its content digest changed.
+
+        :param files:
+            The Python files to index, e.g. as returned by
+            :meth:`~pycollect.python_file_collector.PythonFileCollector.collect`.
+        :return:
+            The names of the modules that were added, changed or removed.
+        """
+        paths = sorted({os.path.abspath(os.fspath(file)) for file in files})
+        racy_ns = int(time.time() * 1e9) - RACY_WINDOW_NS
+        stats = {}  # type: Dict[str, Tuple[int, int]]
+        to_parse = []  # type: List[str]
+        updates = []  # type: List[Tuple[str, int, int, ParsedFile]]
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            mtime_ns = stat.st_mtime_ns if stat.st_mtime_ns <= racy_ns else -1
+            stats[path] = (mtime_ns, stat.st_size)
+            record = self._files.get(path)
+            if record is None or record[1] != stat.st_size:
+                to_parse.append(path)
+            elif record[0] != stat.st_mtime_ns:
+                if self._digest(path) == record[2].digest:
+                    updates.append((path,) + stats[path] + (record[2],))
+                else:
+                    to_parse.append(path)
+
+        changed_paths = set()  # type: Set[str]
+        for path, parsed in self._parse(to_parse):
+            if parsed is None:
+                del stats[path]
+                continue
+            record = self._files.get(path)
+            if record is None or record[2] != parsed:
+                changed_paths.add(path)
+            updates.append((path,) + stats[path] + (parsed,))
+
+        removed = set(self._files).difference(stats)
+        for path in removed:
+            del self._files[path]
+        for path, mtime_ns, size, parsed in updates:
+            self._files[path] = (mtime_ns, size, parsed)
+        self._save(updates, removed)
+
+        old_names = self._module_names
+        self._build()
+        new_names = self._module_names
+        changed = {old_names[path] for path in removed if path in old_names}
+        changed.update(new_names[path] for path in changed_paths if path in new_names)
+        # modules renamed, e.g. because sys.path changed
+        for path in set(old_names).union(new_names):
+            if old_names.get(path) != new_names.get(path):
+                changed.update(
+                    name
+                    for name in (old_names.get(path), new_names.get(path))
+                    if name is not None
+                )
+        return changed
+
+    @staticmethod
+    def _digest(path: str) -> Optional[str]:
+        try:
+            with open(path, "rb") as file:
+                return sha1(file.read()).hexdigest()
+        except OSError:
+            return None
+
+    def _parse(self, paths: List[str]) -> Iterable[Tuple[str, Optional[ParsedFile]]]:
+        if not paths:
+            return []
+        if self.processes is None or self.processes <= 1:
+            return _parse_files(paths)
+        chunks = []  # type: List[List[str]]
+        for start in range(0, len(paths), self._CHUNK_SIZE):
+            stop = start + self._CHUNK_SIZE
+            chunks.append(paths[start:stop])
+        parsed = []  # type: List[Tuple[str, Optional[ParsedFile]]]
+        with ProcessPoolExecutor(max_workers=self.processes) as executor:
+            for chunk in executor.map(_parse_files, chunks):
+                parsed.extend(chunk)
+        return parsed
+
+    def _save(
+        self, updates: List[Tuple[str, int, int, ParsedFile]], removed: Set[str]
+    ) -> None:
+        if self._connection is None:
+            return
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO files (path, mtime_ns, size, data) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    (path, mtime_ns, size, json.dumps(list(parsed)))
+                    for path, mtime_ns, size, parsed in updates
+                ),
+            )
+            self._connection.executemany(
+                "DELETE FROM files WHERE path = ?", ((path,) for path in removed)
+            )
+
+    def _build(self) -> None:
+        paths = sorted(self._files)
+        names = self._resolver.find_module_names(paths, self.innermost)
+        modules = {}  # type: Dict[str, Tuple[str, bool]]
+        self._module_names = {}
+        for path, name in zip(paths, names):
+            if name is None:
+                continue
+            is_package = os.path.splitext(os.path.basename(path))[0] == "__init__"
+            if is_package:
+                name = name.rpartition(".")[0]
+                if not name:
+                    continue
+            self._module_names[path] = name
+            modules.setdefault(name, (path, is_package))
+
+        self._modules = {}
+        self._importers = {}
+        self._definers = {}
+        self._subclasses = {}
+        self._decorated = {}
+        for name, (path, is_package) in modules.items():
+            parsed = self._files[path][2]
+            package = name if is_package else name.rpartition(".")[0]
+            imports = frozenset(self._imported_modules(parsed, package, modules))
+            imports -= {name}
+            self._modules[name] = ModuleInfo(
+                name,
+                path,
+                is_package,
+                imports,
+                parsed.definitions,
+                parsed.error,
+                parsed.symbols,
+            )
+            for imported in imports:
+                self._importers.setdefault(imported, set()).add(name)
+            for definition in parsed.definitions:
+                self._definers.setdefault(definition, set()).add(name)
+            for symbol, bases, decorators in parsed.symbols:
+                for base in bases:
+                    self._subclasses.setdefault(base.rpartition(".")[2], []).append(
+                        (name, symbol, base)
+                    )
+                for decorator in decorators:
+                    self._decorated.setdefault(decorator.rpartition(".")[2], []).append(
+                        (name, symbol, decorator)
+                    )
+
+    @staticmethod
+    def _imported_modules(
+        parsed: ParsedFile, package: str, modules: Dict[str, Tuple[str, bool]]
+    ) -> Iterator[str]:
+        for level, module, names in parsed.imports:
+            if level:
+                # relative imports are resolved against the importing package
+                parts = package.split(".") if package else []
+                if level > len(parts):
+                    continue
+                base = parts[: len(parts) - level + 1]
+                module = ".".join(base + [module] if module else base)
+            if module:
+                yield module
+            for name in names:
+                # "from package import name" imports a submodule when there is one
+                submodule = "{}.{}".format(module, name) if module else name
+                if submodule in modules:
+                    yield submodule
+
+    def module(self, name: str) -> ModuleInfo:
+        """
+        Gets an indexed module by name.
+
+        :raises KeyError: if the module is not indexed.
+        """
+        return self._modules[name]
+
+    def module_name(self, path: Union[os.DirEntry, str, os.PathLike]) -> Optional[str]:
+        """
+        Gets the module name of an indexed file.
+        """
+        return self._module_names.get(os.path.abspath(os.fspath(path)))
+
+    def modules(self) -> List[str]:
+        """
+        Lists the names of the indexed modules, sorted.
+        """
+        return sorted(self._modules)
+
+    def imports_of(self, name: str) -> FrozenSet[str]:
+        """
+        Gets the names of the modules a module imports, indexed or not.
+        """
+        return self._modules[name].imports
+
+    def importers_of(self, name: str) -> Set[str]:
+        """
+        Gets the names of the indexed modules importing a module, i.e. its reverse
+        dependencies.
+        """
+        return set(self._importers.get(name, ()))
+
+    def affected_by(self, names: Iterable[str]) -> Set[str]:
+        """
+        Gets the names of the indexed modules that directly or transitively import
+        any of the given modules, the given indexed modules included: the modules
+        affected by a change to the given ones.
+
+        :param names:
+            The names of the changed modules, e.g. as returned by :meth:`update`.
+        """
+        names = set(names)
+        affected = {name for name in names if name in self._modules}
+        queue = deque(names)
+        while queue:
+            for importer in self._importers.get(queue.popleft(), ()):
+                if importer not in affected:
+                    affected.add(importer)
+                    queue.append(importer)
+        return affected
+
+    def definers_of(self, name: str) -> Set[str]:
+        """
+        Gets the names of the indexed modules defining a name at their top level,
+        whether as a class, a function or a variable.
+        """
+        return set(self._definers.get(name, ()))
+
+    def subclasses_of(self, base: str) -> List[Tuple[str, str]]:
+        """
+        Finds the top level classes directly deriving from a base class.
+
+        Base classes are matched by name, as written in the class statements,
+        without importing anything nor resolving imports: ``"Plugin"`` matches
+        ``class A(Plugin)`` and ``class B(plugins.Plugin)``, while
+        ``"pkg.plugins.Plugin"`` matches both as well but not
+        ``class C(other.Plugin)``. Matching modules may then be imported to check
+        the results.
+
+        :param base:
+            The name of the base class, optionally qualified.
+        :return:
+            A sorted list of ``(module name, class name)`` tuples.
+        """
+        return self._find(self._subclasses, base)
+
+    def decorated_by(self, decorator: str) -> List[Tuple[str, str]]:
+        """
+        Finds the top level classes and functions decorated by a decorator, called
+        or not, e.g. ``@register`` or ``@registry.register("name")``. Decorators are
+        matched by name as base classes are in :meth:`subclasses_of`.
+
+        :param decorator:
+            The name of the decorator, optionally qualified.
+        :return:
+            A sorted list of ``(module name, symbol name)`` tuples.
+        """
+        return self._find(self._decorated, decorator)
+
+    @staticmethod
+    def _find(
+        symbols: Dict[str, List[Tuple[str, str, str]]], query: str
+    ) -> List[Tuple[str, str]]:
+        return sorted(
+            {
+                (module, symbol)
+                for module, symbol, written in symbols.get(query.rpartition(".")[2], ())
+                if written == query
+                or written.endswith("." + query)
+                or query.endswith("." + written)
+            }
+        )
@@ -1,8 +1,24 @@
 import sys
-from os import DirEntry, PathLike
-from os.path import basename, dirname, splitext, normcase
+from os import DirEntry, PathLike, fspath
+from os.path import abspath, basename, dirname, isfile, join, splitext, normcase
 from pathlib import Path
-from typing import Optional, Union
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from pycollect.archive_collection import ArchiveEntry
+from pycollect.collection_cache import ScanResult
+
+#: The result of scanning a directory while naming modules: the collected files
+#: along with their module names, and the paths of the subdirectories to descend into.
+NamedScanResult = Tuple[List[Tuple[DirEntry, Optional[str]]], List[str]]
 
 
 def path_is_in_pythonpath(path):
@@ -11,13 +27,21 @@ def path_is_in_pythonpath(path):
 
 
 def find_module_name(
-    filepath: Union[DirEntry, str, PathLike], innermost: bool = False
+    filepath: Union[DirEntry, ArchiveEntry, str, PathLike], innermost: bool = False
 ) -> Optional[str]:
     """
     Utility function to find the Python module name of a python file.
 
+    Files within archives, such as the ones
+    :meth:`~pycollect.python_file_collector.PythonFileCollector.collect_archive`
+    collects, are named as :mod:`zipimport` would name them: the archive root is an
+    import root, and so are the ``sys.path`` entries within the archive, e.g.
+    ``"dist.zip/lib"``. Paths within archives, e.g. ``"dist.zip/pkg/mod.py"``, are
+    named relative to the ``sys.path`` entries they start with, as any other path.
+
     :param filepath:
-        The absolute filepath as a DirEntry object, path string or PathLike object.
+        The absolute filepath as a DirEntry object, ArchiveEntry object, path string
+        or PathLike object.
     :param innermost:
         (default: False) By default the outermost possible module name is returned.
         When this flag is set to True, the first found, innermost possible module name
@@ -26,6 +50,9 @@ def find_module_name(
         The module name string or None if no module was found for the specified
         filepath.
     """
+    if isinstance(filepath, ArchiveEntry):
+        pythonpath = frozenset(normcase(sp) for sp in sys.path)
+        return _archive_module_name(filepath, innermost, pythonpath)
     if isinstance(filepath, DirEntry):
         filepath = filepath.path
 
@@ -43,3 +70,201 @@ def find_module_name(
         at_root = full_path.parent == full_path.parent.parent
         full_path = Path(full_path.parent)
     return valid_module_name
+
+
+def _archive_module_name(
+    entry: ArchiveEntry, innermost: bool, pythonpath: FrozenSet[str]
+) -> str:
+    parts = entry.member.split("/")
+    parts[-1] = splitext(parts[-1])[0]
+    if innermost:
+        for index in range(len(parts) - 1, 0, -1):
+            if normcase(join(entry.archive, *parts[:index])) in pythonpath:
+                return ".".join(parts[index:])
+    return ".".join(parts)
+
+
+class ModuleNameResolver:
+    """
+    ModuleNameResolver resolves module names exactly as :func:`find_module_name` does,
+    but is meant for resolving many files.
+
+    The normalized ``sys.path`` is computed once and computed again only when
+    ``sys.path`` changes. The module name prefix of each directory, relative to the
+    outermost and to the innermost ``sys.path`` entry containing it, is memoized, so
+    files sharing ancestor directories share the work of resolving them.
+
+    >>> resolver = ModuleNameResolver()
+    >>> resolver.find_module_names(["/nonexistent/path/script.py"])
+    [None]
+    """
+
+    def __init__(self):
+        self._sys_path = None  # type: Optional[List]
+        self._pythonpath = frozenset()  # type: FrozenSet[str]
+        # directory -> (innermost prefix, outermost prefix)
+        self._prefixes = {}  # type: Dict[str, Tuple[Optional[str], Optional[str]]]
+
+    def _refresh(self) -> None:
+        if self._sys_path != sys.path:
+            self._sys_path = list(sys.path)
+            self._pythonpath = frozenset(normcase(sp) for sp in self._sys_path)
+            self._prefixes.clear()
+
+    def find_module_name(
+        self,
+        filepath: Union[DirEntry, ArchiveEntry, str, PathLike],
+        innermost: bool = False,
+    ) -> Optional[str]:
+        """
+        Finds the Python module name of a python file. See :func:`find_module_name`.
+        """
+        self._refresh()
+        return self._find_module_name(filepath, innermost)
+
+    def find_module_names(
+        self,
+        filepaths: Iterable[Union[DirEntry, ArchiveEntry, str, PathLike]],
+        innermost: bool = False,
+    ) -> List[Optional[str]]:
+        """
+        Finds the Python module names of many python files at once.
+
+        :param filepaths:
+            The absolute filepaths as DirEntry objects, ArchiveEntry objects, path
+            strings or PathLike objects.
+        :param innermost:
+            (default: False) whether to find the innermost rather than the outermost
+            module names. See :func:`find_module_name`.
+        :return:
+            The module names, or None for files no module was found for, in the same
+            order as the given filepaths.
+        """
+        self._refresh()
+        return [self._find_module_name(filepath, innermost) for filepath in filepaths]
+
+    def _find_module_name(
+        self, filepath: Union[DirEntry, ArchiveEntry, str, PathLike], innermost: bool
+    ) -> Optional[str]:
+        if isinstance(filepath, ArchiveEntry):
+            return _archive_module_name(filepath, innermost, self._pythonpath)
+        filepath = fspath(filepath)
+        module_name = splitext(basename(filepath))[0]
+        prefixes = self._prefixes_of(dirname(filepath))
+        prefix = prefixes[0] if innermost else prefixes[1]
+        if prefix is None:
+            return None
+        return f"{prefix}.{module_name}" if prefix else module_name
+
+    def _prefixes_of(self, directory: str) -> Tuple[Optional[str], Optional[str]]:
+        prefixes = self._prefixes.get(directory)
+        if prefixes is None:
+            full_path = Path(directory)
+            if full_path == full_path.parent:
+                # the root directory is only ever checked when the file is within it
+                prefix = "" if self._in_pythonpath(full_path) else None
+                prefixes = (prefix, prefix)
+            else:
+                prefixes = self._directory_prefixes(full_path)
+            self._prefixes[directory] = prefixes
+        return prefixes
+
+    def _in_pythonpath(self, path: Path) -> bool:
+        return normcase(path) in self._pythonpath
+
+    def _directory_prefixes(
+        self, full_path: Path
+    ) -> Tuple[Optional[str], Optional[str]]:
+        # Walk up until a directory whose prefixes are known, or until the root, which
+        # is never checked as an ancestor, then resolve the prefixes downwards.
+        unresolved = []  # type: List[Path]
+        parent_prefixes = (None, None)  # type: Tuple[Optional[str], Optional[str]]
+        while full_path != full_path.parent:
+            key = str(full_path)
+            if key in self._prefixes:
+                parent_prefixes = self._prefixes[key]
+                break
+            unresolved.append(full_path)
+            full_path = full_path.parent
+
+        for full_path in reversed(unresolved):
+            parent_prefixes = self._child_prefixes(
+                parent_prefixes, basename(full_path), self._in_pythonpath(full_path)
+            )
+            self._prefixes[str(full_path)] = parent_prefixes
+        return parent_prefixes
+
+    @staticmethod
+    def _child_prefixes(
+        parent_prefixes: Tuple[Optional[str], Optional[str]],
+        name: str,
+        in_pythonpath: bool,
+    ) -> Tuple[Optional[str], Optional[str]]:
+        innermost, outermost = parent_prefixes
+        if in_pythonpath:
+            innermost = ""
+        elif innermost is not None:
+            innermost = f"{innermost}.{name}" if innermost else name
+        if outermost is not None:
+            outermost = f"{outermost}.{name}" if outermost else name
+        elif in_pythonpath:
+            outermost = ""
+        return innermost, outermost
+
+    def wrap(
+        self,
+        scan: Callable[[str], ScanResult],
+        search_path: str,
+        innermost: bool = False,
+        packages_only: bool = False,
+    ) -> Callable[[str], NamedScanResult]:
+        """
+        Turns a directory scanning function into one naming the files it collects, as
+        :meth:`find_module_name` does, while a tree is traversed from
+        ``search_path``, which is expected to be absolute.
+
+        The module name prefixes of the search path are resolved once; those of every
+        subdirectory are then derived from its parent's when the parent is scanned,
+        so naming a file costs a single string concatenation.
+
+        :param packages_only:
+            (default: False) whether to skip the directories below the search path
+            that are neither packages, i.e. have no ``__init__.py`` file, nor
+            ``sys.path`` entries, along with their whole subtree.
+        """
+        self._refresh()
+        pythonpath = self._pythonpath
+        prefixes = {search_path: self._prefixes_of(abspath(search_path))}
+        child_prefixes = self._child_prefixes
+        index = 0 if innermost else 1
+
+        def named_scan(path: str) -> NamedScanResult:
+            if (
+                packages_only
+                and path != search_path
+                and normcase(path) not in pythonpath
+                # checked before scanning, so that data directories are not listed
+                and not isfile(join(path, "__init__.py"))
+            ):
+                prefixes.pop(path, None)
+                return [], []
+            files, subdirs = scan(path)
+            path_prefixes = prefixes.pop(path, None)
+            if path_prefixes is None:
+                # a directory whose scan was put off after its parent's, e.g. one
+                # reached through a symbolic link
+                path_prefixes = self._prefixes_of(abspath(path))
+            for subdir in subdirs:
+                prefixes[subdir] = child_prefixes(
+                    path_prefixes, basename(subdir), normcase(subdir) in pythonpath
+                )
+            prefix = path_prefixes[index]
+            if prefix is None:
+                return [(file, None) for file in files], subdirs
+            prefix = prefix + "." if prefix else ""
+            return (
+                [(file, prefix + splitext(file.name)[0]) for file in files],
+                subdirs,
+            )
+
+        return named_scan
@@ -0,0 +1,336 @@
+import json
+import os
+import sys
+import zlib
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from pycollect.module_finder import ModuleNameResolver
+
+
+class ModuleIndex:
+    """
+    ModuleIndex maps module names to the collected files defining them, the reverse
+    of :func:`~pycollect.module_finder.find_module_name`, without importing any
+    package as :func:`importlib.util.find_spec` does:
+
+    .. code-block:: python
+
+        index = ModuleIndex()
+        index.update(PythonFileCollector().collect("src"))
+        index.find_module_file("pkg.sub.module")
+        index.submodules("pkg.sub")
+
+    Files are named with a :class:`~pycollect.module_finder.ModuleNameResolver`,
+    ``__init__.py`` files naming their package. Name lookups are dictionary lookups,
+    and prefix queries bisect the sorted module names. Directories holding modules
+    but no ``__init__.py`` file are namespace packages, whose portions are found from
+    the modules below them.
+
+    Updating the index only names the files that are new, and files can be added and
+    removed one by one, e.g. from the callbacks of
+    :meth:`~pycollect.python_file_collector.PythonFileCollector.watch`. When several
+    files have the same module name, e.g. because they are found in different
+    ``sys.path`` entries, the one an import would find is returned: the one in the
+    first ``sys.path`` entry, a package taking precedence over a module of the same
+    name in the same directory.
+
+    :param innermost:
+        (default: False) whether to name modules after their innermost rather than
+        outermost possible module name. See
+        :func:`~pycollect.module_finder.find_module_name`.
+    """
+
+    _MAGIC = b"pycollect-module-index\0"
+    _VERSION = 1
+
+    def __init__(self, innermost: bool = False):
+        self.innermost = innermost
+        self._resolver = ModuleNameResolver()
+        # the sys.path files were named against, and the index of each entry
+        self._sys_path = []  # type: List[str]
+        self._entries = {}  # type: Dict[str, int]
+        self._set_sys_path(sys.path)
+        # file path -> module name, None for files outside of sys.path
+        self._names = {}  # type: Dict[str, Optional[str]]
+        # module name -> paths of the files named after it, in import precedence
+        self._paths = {}  # type: Dict[str, List[str]]
+        # module names sorted for prefix queries, sorted when first queried
+        self._sorted = None  # type: Optional[List[str]]
+
+    def __repr__(self) -> str:
+        return "<ModuleIndex of {} modules>".format(len(self._paths))
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._paths
+
+    def update(self, files: Iterable[Union[os.DirEntry, str, os.PathLike]]) -> Set[str]:
+        """
+        Updates the index so that it holds exactly the given files, naming only the
+        ones that are new. All files are named again when ``sys.path`` changed since
+        they were named.
+
+        :param files:
+            The Python files to index, e.g. as returned by
+            :meth:`~pycollect.python_file_collector.PythonFileCollector.collect`.
+        :return:
+            The names of the modules that were added or removed.
+        """
+        paths = {os.path.abspath(os.fspath(file)) for file in files}
+        if self._sys_path != sys.path:
+            old_names = set(self._paths)
+            self._rename(paths)
+            return old_names.symmetric_difference(self._paths)
+        changed = set()  # type: Set[str]
+        for path in set(self._names).difference(paths):
+            changed.update(self._remove(path))
+        changed.update(self._name(sorted(paths.difference(self._names))))
+        return changed
+
+    def _set_sys_path(self, sys_path: List[str]) -> None:
+        self._sys_path = list(sys_path)
+        self._entries = {}
+        for index, entry in enumerate(self._sys_path):
+            self._entries.setdefault(os.path.normcase(os.path.abspath(entry)), index)
+
+    def _rename(self, paths: Iterable[str]) -> None:
+        # names every file again, against the current sys.path
+        self._set_sys_path(sys.path)
+        self._names, self._paths, self._sorted = {}, {}, None
+        self._name(sorted(paths))
+
+    def _name(self, paths: List[str]) -> Set[str]:
+        names = self._resolver.find_module_names(paths, self.innermost)
+        changed = set()  # type: Set[str]
+        for path, name in zip(paths, names):
+            changed.update(self._add(path, self._package_name(path, name)))
+        return changed
+
+    def add(
+        self,
+        file: Union[os.DirEntry, str, os.PathLike],
+        module_name: Optional[str] = None,
+    ) -> None:
+        """
+        Adds a file to the index, replacing any previous record of it.
+
+        :param file:
+            The Python file to add.
+        :param module_name:
+            (default: None) the module name of the file, e.g. as yielded by
+            :meth:`~pycollect.python_file_collector.PythonFileCollector.collect_modules`.
+            By default, the file is named when added.
+        """
+        path = os.path.abspath(os.fspath(file))
+        if self._sys_path != sys.path:
+            self._rename(set(self._names).difference([path]))
+        if module_name is None:
+            module_name = self._resolver.find_module_name(path, self.innermost)
+        self._remove(path)
+        self._add(path, self._package_name(path, module_name))
+
+    def remove(self, file: Union[os.DirEntry, str, os.PathLike]) -> None:
+        """
+        Removes a file from the index, if indexed.
+        """
+        self._remove(os.path.abspath(os.fspath(file)))
+
+    @staticmethod
+    def _package_name(path: str, name: Optional[str]) -> Optional[str]:
+        if name is not None and os.path.basename(path) == "__init__.py":
+            # a package is named after its directory, a sys.path entry being none
+            return name.rpartition(".")[0] or None
+        return name
+
+    def _add(self, path: str, name: Optional[str]) -> Set[str]:
+        self._names[path] = name
+        if name is None:
+            return set()
+        paths = self._paths.get(name)
+        if paths is None:
+            self._paths[name] = [path]
+            if self._sorted is not None:
+                insort(self._sorted, name)
+            return {name}
+        paths.append(path)
+        paths.sort(key=lambda path: self._precedence(path, name))
+        return set()
+
+    def _precedence(self, path: str, name: str) -> Tuple[int, bool, str]:
+        # imports search sys.path entries in order, and a package before a module of
+        # the same name in each of them
+        is_package = os.path.basename(path) == "__init__.py"
+        directory = os.path.dirname(path) if is_package else path
+        return self._entry_index(directory, name.count(".") + 1), not is_package, path
+
+    def _entry_index(self, path: str, levels: int) -> int:
+        # the index of the sys.path entry the given number of levels above a path
+        for _ in range(levels):
+            path = os.path.dirname(path)
+        return self._entries.get(os.path.normcase(path), len(self._entries))
+
+    def _remove(self, path: str) -> Set[str]:
+        if path not in self._names:
+            return set()
+        name = self._names.pop(path)
+        if name is None:
+            return set()
+        paths = self._paths[name]
+        paths.remove(path)
+        if paths:
+            return set()
+        del self._paths[name]
+        if self._sorted is not None:
+            del self._sorted[bisect_left(self._sorted, name)]
+        return {name}
+
+    def find_module_file(self, name: str) -> Optional[str]:
+        """
+        Finds the file of a module, the ``__init__.py`` file of a regular package.
+
+        :return:
+            The file path, or None if the module is not indexed or is a namespace
+            package.
+        """
+        paths = self._paths.get(name)
+        return None if paths is None else paths[0]
+
+    def module_name(self, path: Union[os.DirEntry, str, os.PathLike]) -> Optional[str]:
+        """
+        Gets the module name of an indexed file.
+        """
+        return self._names.get(os.path.abspath(os.fspath(path)))
+
+    def modules(self) -> List[str]:
+        """
+        Lists the names of the indexed modules, sorted.
+        """
+        return list(self._sorted_names())
+
+    def _sorted_names(self) -> List[str]:
+        if self._sorted is None:
+            self._sorted = sorted(self._paths)
+        return self._sorted
+
+    def _under(self, prefix: str) -> List[str]:
+        # "." sorts right before "/": the names starting with "prefix." come first
+        names = self._sorted_names()
+        start = bisect_left(names, prefix + ".")
+        stop = bisect_left(names, prefix + "/", start)
+        return names[start:stop]
+
+    def submodules(self, prefix: str, recursive: bool = True) -> List[str]:
+        """
+        Lists the modules under a package, e.g. every module under ``"pkg.sub"``.
+
+        :param prefix:
+            The package name.
+        :param recursive:
+            (default: True) whether to list every indexed module below the package
+            rather than its direct children only. Direct children include the
+            namespace packages holding indexed modules.
+        :return:
+            The module names, sorted.
+        """
+        names = self._under(prefix)
+        if recursive:
+            return names
+        depth = prefix.count(".") + 1
+        children = set()  # type: Set[str]
+        for name in names:
+            children.add(".".join(name.split(".", depth + 1)[: depth + 1]))
+        return sorted(children)
+
+    def is_package(self, name: str) -> bool:
+        """
+        Tells whether a name is a regular or a namespace package.
+        """
+        paths = self._paths.get(name)
+        if paths is not None:
+            return os.path.basename(paths[0]) == "__init__.py"
+        return bool(self._under(name))
+
+    def is_namespace_package(self, name: str) -> bool:
+        """
+        Tells whether a name is a namespace package: a package without an
+        ``__init__.py`` file, holding indexed modules.
+        """
+        return name not in self._paths and bool(self._under(name))
+
+    def package_paths(self, name: str) -> List[str]:
+        """
+        Finds the directories of a package, i.e. its ``__path__``: the directory of
+        its ``__init__.py`` file for a regular package, or every portion of a
+        namespace package holding indexed modules.
+
+        :return:
+            The directory paths, in ``sys.path`` order, or an empty list if the name
+            is not a package.
+        """
+        paths = self._paths.get(name)
+        if paths is not None:
+            if os.path.basename(paths[0]) != "__init__.py":
+                return []
+            return [os.path.dirname(paths[0])]
+        depth = name.count(".")
+        portions = set()  # type: Set[str]
+        for module in self._under(name):
+            path = self._paths[module][0]
+            # the directory of the file matches the module's parent, or the module
+            # itself for a package
+            levels = module.count(".") - depth
+            if os.path.basename(path) != "__init__.py":
+                levels -= 1
+            directory = os.path.dirname(path)
+            for _ in range(levels):
+                directory = os.path.dirname(directory)
+            portions.add(directory)
+        return sorted(
+            portions,
+            key=lambda portion: (self._entry_index(portion, depth + 1), portion),
+        )
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """
+        Saves the index to a file, along with the ``sys.path`` its files were named
+        against, so that a loaded index names its files again if ``sys.path``
+        changed meanwhile.
+        """
+        payload = json.dumps(
+            {
+                "innermost": self.innermost,
+                "sys_path": self._sys_path,
+                "files": self._names,
+            }
+        ).encode("utf-8", "surrogateescape")
+        with open(path, "wb") as file:
+            file.write(self._MAGIC + bytes([self._VERSION]))
+            file.write(zlib.compress(payload))
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike]) -> "ModuleIndex":
+        """
+        Loads an index saved with :meth:`save`.
+
+        :raises ValueError: if the file is not a module index.
+        """
+        with open(path, "rb") as file:
+            data = file.read()
+        header = cls._MAGIC + bytes([cls._VERSION])
+        if not data.startswith(header):
+            raise ValueError("{!r} is not a pycollect module index".format(path))
+        start = len(header)
+        try:
+            payload = json.loads(
+                zlib.decompress(data[start:]).decode("utf-8", "surrogateescape")
+            )
+        except (zlib.error, ValueError) as error:
+            raise ValueError("{!r} is not a valid module index: {}".format(path, error))
+        index = cls(payload["innermost"])
+        index._set_sys_path(payload["sys_path"])
+        for file_path, name in sorted(payload["files"].items()):
+            index._add(file_path, name)
+        return index
@@ -0,0 +1,297 @@
+import os
+from functools import partial
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from pycollect.deduplication import InodeDeduplicator
+from pycollect.ignore_files import IgnoreFileMatcher
+from pycollect.python_file_collector import PythonFileCollector
+
+#: A check shared by the profiles whose bits are set in the mask: a function telling
+#: whether a name, or a relative path, is excluded.
+_Check = Tuple[Callable[..., bool], int]
+
+
+class MultiCollector:
+    """
+    MultiCollector evaluates several
+    :class:`~pycollect.python_file_collector.PythonFileCollector` configurations,
+    called profiles, in a single traversal of a tree.
+
+    Each directory is tagged with a bit mask of the profiles it is collected for. A
+    file is collected for the profiles of its directory whose patterns do not
+    exclude it, and a subdirectory is only descended into when one of its
+    directory's profiles at least does not exclude it. Profiles sharing the same
+    exclusion patterns share their evaluation, so collecting for several profiles
+    costs about as much as collecting for one of them. Directories reached through
+    several paths are deduplicated for each profile on its own, so each profile
+    collects the same files as its collector.
+
+    .. code-block:: python
+
+        collector = MultiCollector(
+            {
+                "sources": PythonFileCollector(
+                    additional_dir_exclusion_patterns=["tests"]
+                ),
+                "tests": PythonFileCollector(
+                    path_exclusion_patterns=["*.py", "!test_*.py"]
+                ),
+                "all": PythonFileCollector(),
+            }
+        )
+        files = collector.collect("src")
+        files["tests"]
+
+    :param profiles:
+        (default: None) the collectors to evaluate, by profile name.
+    """
+
+    def __init__(self, profiles: Optional[Mapping[str, PythonFileCollector]] = None):
+        self.profiles = dict(profiles or {})  # type: Dict[str, PythonFileCollector]
+
+    def add(self, name: str, collector: PythonFileCollector) -> None:
+        """
+        Registers a profile, replacing any profile of the same name.
+        """
+        self.profiles[name] = collector
+
+    def collect(
+        self,
+        search_path: Optional[str] = None,
+        recursion_limit: Optional[int] = None,
+        follow_symlinks: bool = True,
+        workers: Optional[int] = None,
+        unique_dirs: Optional[bool] = None,
+    ) -> Dict[str, Set[os.DirEntry]]:
+        """
+        Collects Python files for every profile in a single traversal.
+
+        Parameters are the same as in
+        :meth:`~pycollect.python_file_collector.PythonFileCollector.collect`.
+
+        :return:
+            A set of DirEntry instances referring to each collected file, by profile
+            name.
+        """
+        if search_path is None:
+            search_path = PythonFileCollector._get_caller_path()
+        collected = {
+            name: set() for name in self.profiles
+        }  # type: Dict[str, Set[os.DirEntry]]
+        for entry, names in self._walk(
+            search_path, recursion_limit, follow_symlinks, workers, unique_dirs
+        ):
+            for name in names:
+                collected[name].add(entry)
+        return collected
+
+    def iter_collect(
+        self,
+        search_path: Optional[str] = None,
+        recursion_limit: Optional[int] = None,
+        follow_symlinks: bool = True,
+        workers: Optional[int] = None,
+        unique_dirs: Optional[bool] = None,
+    ) -> Iterator[Tuple[os.DirEntry, Tuple[str, ...]]]:
+        """
+        Streaming counterpart of :meth:`collect`.
+
+        :return:
+            An iterator of ``(DirEntry, profile names)`` tuples, each file being
+            yielded once along with the names of the profiles it is collected for.
+        """
+        if search_path is None:
+            search_path = PythonFileCollector._get_caller_path()
+        return self._walk(
+            search_path, recursion_limit, follow_symlinks, workers, unique_dirs
+        )
+
+    def _walk(
+        self,
+        search_path: str,
+        recursion_limit: Optional[int],
+        follow_symlinks: bool,
+        workers: Optional[int],
+        unique_dirs: Optional[bool],
+    ) -> Iterator[Tuple[os.DirEntry, Tuple[str, ...]]]:
+        names = list(self.profiles)
+        if not names:
+            return iter(())
+        # directory path -> bit mask of the profiles it is collected for
+        masks = {search_path: (1 << len(names)) - 1}
+        scan = self._scanner(search_path, follow_symlinks, masks)
+        deduplicator = PythonFileCollector._deduplicator(
+            follow_symlinks, unique_dirs, False, defer_symlinks=True
+        )
+        if deduplicator is not None:
+            scan = self._deduplicated(scan, masks, deduplicator)
+
+        def walk_from(path: str, limit: Optional[int]) -> Iterator:
+            if workers is not None and workers > 1:
+                return PythonFileCollector._walk_parallel(path, limit, scan, workers)
+            return PythonFileCollector._walk_sequential(path, limit, scan)
+
+        if deduplicator is not None and deduplicator.defer_symlinks:
+            walk = deduplicator.walk(walk_from, search_path, recursion_limit)
+        else:
+            walk = walk_from(search_path, recursion_limit)
+        return self._named(walk, names)
+
+    @staticmethod
+    def _named(
+        walk: Iterator[Tuple[os.DirEntry, int]], names: List[str]
+    ) -> Iterator[Tuple[os.DirEntry, Tuple[str, ...]]]:
+        # profile bit mask -> profile names
+        mask_names = {}  # type: Dict[int, Tuple[str, ...]]
+        for entry, mask in walk:
+            profile_names = mask_names.get(mask)
+            if profile_names is None:
+                profile_names = mask_names[mask] = tuple(
+                    name for bit, name in enumerate(names) if mask >> bit & 1
+                )
+            yield entry, profile_names
+
+    @staticmethod
+    def _deduplicated(
+        scan: Callable[[str], Tuple[List[Tuple[os.DirEntry, int]], List[str]]],
+        masks: Dict[str, int],
+        deduplicator: InodeDeduplicator,
+    ) -> Callable[[str], Tuple[List[Tuple[os.DirEntry, int]], List[str]]]:
+        # each profile scans each directory once, as its own collector would, rather
+        # than profiles sharing the path a directory is first reached through
+        def deduplicated_scan(
+            path: str,
+        ) -> Tuple[List[Tuple[os.DirEntry, int]], List[str]]:
+            key = deduplicator.directory_key(path)
+            if key is None:
+                # scanned later on, with the same profiles
+                return [], []
+            mask = masks[path]
+            for bit in range(mask.bit_length()):
+                if mask >> bit & 1 and not deduplicator.claim(key + (bit,), path):
+                    mask &= ~(1 << bit)
+            if not mask:
+                del masks[path]
+                return [], []
+            masks[path] = mask
+            return scan(path)
+
+        return deduplicated_scan
+
+    def _scanner(
+        self, search_path: str, follow_symlinks: bool, masks: Dict[str, int]
+    ) -> Callable[[str], Tuple[List[Tuple[os.DirEntry, int]], List[str]]]:
+        collectors = list(self.profiles.values())
+        file_checks = self._shared(
+            (
+                bit,
+                (collector.file_matcher.patterns, collector.enable_regex_patterns),
+                collector.file_matcher.matches,
+            )
+            for bit, collector in enumerate(collectors)
+        )
+        dir_checks = self._shared(
+            (
+                bit,
+                (collector.dir_matcher.patterns, collector.enable_regex_patterns),
+                collector.dir_matcher.matches,
+            )
+            for bit, collector in enumerate(collectors)
+        )
+        path_checks = self._shared(
+            (bit, collector.path_matcher.patterns, collector.path_matcher.excludes)
+            for bit, collector in enumerate(collectors)
+            if collector.path_matcher is not None
+        )
+        ignore_matchers = {}  # type: Dict[Tuple[str, ...], IgnoreFileMatcher]
+        for collector in collectors:
+            file_names = collector.ignore_file_names
+            if file_names and file_names not in ignore_matchers:
+                ignore_matchers[file_names] = IgnoreFileMatcher(search_path, file_names)
+        path_checks.extend(
+            self._shared(
+                (
+                    bit,
+                    collector.ignore_file_names,
+                    ignore_matchers[collector.ignore_file_names].excludes,
+                )
+                for bit, collector in enumerate(collectors)
+                if collector.ignore_file_names
+            )
+        )
+
+        return partial(
+            self._scan_dir,
+            masks=masks,
+            prefix_length=len(search_path),
+            follow_symlinks=follow_symlinks,
+            file_checks=file_checks,
+            dir_checks=dir_checks,
+            path_checks=path_checks,
+        )
+
+    @staticmethod
+    def _shared(
+        checks: Iterable[Tuple[int, Hashable, Callable[..., bool]]],
+    ) -> List[_Check]:
+        # profiles with the same patterns share a single check
+        shared = {}  # type: Dict[Hashable, _Check]
+        for bit, patterns, check in checks:
+            check, bits = shared.get(patterns, (check, 0))
+            shared[patterns] = (check, bits | 1 << bit)
+        return list(shared.values())
+
+    @staticmethod
+    def _scan_dir(
+        path: str,
+        masks: Dict[str, int],
+        prefix_length: int,
+        follow_symlinks: bool,
+        file_checks: List[_Check],
+        dir_checks: List[_Check],
+        path_checks: List[_Check],
+    ) -> Tuple[List[Tuple[os.DirEntry, int]], List[str]]:
+        mask = masks.pop(path)
+        files = []  # type: List[Tuple[os.DirEntry, int]]
+        subdirs = []  # type: List[str]
+        prefix = ""
+        if path_checks:
+            prefix = path[prefix_length:].lstrip(os.sep).replace(os.sep, "/")
+            prefix = prefix + "/" if prefix else ""
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=follow_symlinks):
+                    checks, is_dir = file_checks, False
+                elif entry.is_dir(follow_symlinks=follow_symlinks):
+                    checks, is_dir = dir_checks, True
+                else:
+                    continue
+                included = 0
+                for excludes, bits in checks:
+                    if bits & mask and not excludes(entry.name):
+                        included |= bits
+                included &= mask
+                if included and path_checks:
+                    relative_path = prefix + entry.name
+                    for excludes, bits in path_checks:
+                        if bits & included and excludes(relative_path, is_dir):
+                            included &= ~bits
+                if not included:
+                    continue
+                if is_dir:
+                    masks[entry.path] = included
+                    subdirs.append(entry.path)
+                else:
+                    files.append((entry, included))
+        return files, subdirs
@@ -0,0 +1,160 @@
+import re
+from functools import partial
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Pattern,
+    Set,
+    Tuple,
+)
+
+
+class PatternMatcher:
+    """
+    PatternMatcher compiles a set of name exclusion patterns once so that each name
+    can then be tested against the whole set with a single lookup.
+
+    Simple (wildcard) patterns are split into prefix and suffix tables: a name
+    matches a non negated pattern when it starts with the pattern's prefix and ends
+    with the pattern's suffix, exactly as
+    :class:`~pycollect.python_file_collector.PythonFileCollector` has always
+    interpreted them. Regex patterns are combined into a single alternation that is
+    matched against the beginning of the name, as :func:`re.match` would, unless
+    one of them refers to its own groups by backreference.
+
+    :param patterns:
+        The patterns to compile.
+    :param use_regex_patterns:
+        (default: ``False``) flag to indicate whether the patterns are regular
+        expressions or use the simple wildcard syntax.
+    """
+
+    _WILDCARD = "*"
+    _NEGATION = "!"
+    #: Finds numbered backreferences, named backreferences and conditional groups.
+    _BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+
+    def __init__(self, patterns: Iterable[str], use_regex_patterns: bool = False):
+        self.patterns = frozenset(patterns)  # type: FrozenSet[str]
+        self.use_regex_patterns = use_regex_patterns
+        # prefix length -> prefix -> suffix length -> suffixes
+        self._table = {}  # type: Dict[int, Dict[str, Dict[int, Set[str]]]]
+        self._negated = []  # type: List[Tuple[str, str]]
+        self._regex = None  # type: Optional[Pattern]
+        self._regexes = []  # type: List[Pattern]
+        # one test per pattern, only built when matching patterns are requested
+        self._pattern_tests = None  # type: Optional[List[Tuple[str, Callable]]]
+        if use_regex_patterns:
+            self._compile_regex_patterns()
+        else:
+            self._compile_wildcard_patterns()
+
+    @classmethod
+    def split_pattern(cls, pattern: str) -> Tuple[bool, str, str]:
+        """
+        Splits a simple pattern into its negation flag, prefix and suffix.
+
+        >>> PatternMatcher.split_pattern("!*.py")
+        (True, '', '.py')
+        """
+        negate = pattern.startswith(cls._NEGATION)
+        if negate:
+            pattern = pattern[1:]
+        splitted = pattern.split(cls._WILDCARD)
+        return negate, splitted[0], splitted[-1]
+
+    def _compile_wildcard_patterns(self) -> None:
+        for pattern in self.patterns:
+            negate, prefix, suffix = self.split_pattern(pattern)
+            if negate:
+                self._negated.append((prefix, suffix))
+                continue
+            suffixes = self._table.setdefault(len(prefix), {}).setdefault(prefix, {})
+            suffixes.setdefault(len(suffix), set()).add(suffix)
+
+    def _compile_regex_patterns(self) -> None:
+        compiled = [re.compile(pattern) for pattern in sorted(self.patterns)]
+        if not compiled:
+            return
+        if any(self._BACKREFERENCE.search(regex.pattern) for regex in compiled):
+            # group numbers are shifted in a combined alternation, which breaks the
+            # patterns referring to their own groups
+            self._regexes = compiled
+            return
+        try:
+            self._regex = re.compile(
+                "|".join("(?:{})".format(regex.pattern) for regex in compiled)
+            )
+        except re.error:
+            # e.g. global inline flags are only allowed at the start of a pattern
+            self._regexes = compiled
+
+    def matches(self, name: str) -> bool:
+        """
+        Checks whether a name matches any of the compiled patterns.
+
+        >>> PatternMatcher({"__pycache__", "venv*", "!*.py"}).matches("foo.pyc")
+        True
+
+        :param name:
+            The file or directory name to test.
+        :return:
+            ``True`` if at least one pattern matches the name.
+        """
+        if self.use_regex_patterns:
+            if self._regex is not None:
+                return self._regex.match(name) is not None
+            return any(regex.match(name) for regex in self._regexes)
+
+        for prefix, suffix in self._negated:
+            if not (name.startswith(prefix) and name.endswith(suffix)):
+                return True
+        for prefix_length, prefixes in self._table.items():
+            suffixes = prefixes.get(name[:prefix_length])
+            if suffixes is None:
+                continue
+            for suffix_length, suffix_set in suffixes.items():
+                if not suffix_length or name[-suffix_length:] in suffix_set:
+                    return True
+        return False
+
+    def matching_patterns(self, name: str) -> List[str]:
+        """
+        Lists the patterns matching a name, in sorted order. Unlike :meth:`matches`,
+        every pattern is tested on its own, so this is meant for diagnostics such as
+        :class:`~pycollect.collection_stats.CollectionStats` rather than for
+        filtering.
+
+        >>> PatternMatcher({"*.pyc", "foo*", "!*.py"}).matching_patterns("foo.pyc")
+        ['!*.py', '*.pyc', 'foo*']
+
+        :param name:
+            The file or directory name to test.
+        :return:
+            The list of patterns matching the name.
+        """
+        if self._pattern_tests is None:
+            self._pattern_tests = [
+                (pattern, self._pattern_test(pattern))
+                for pattern in sorted(self.patterns)
+            ]
+        return [pattern for pattern, test in self._pattern_tests if test(name)]
+
+    def _pattern_test(self, pattern: str) -> Callable[[str], bool]:
+        # partial objects of module level functions, unlike lambdas, keep the
+        # matcher, and the collector holding it, picklable
+        if self.use_regex_patterns:
+            return partial(_regex_matches, re.compile(pattern))
+        return partial(_wildcard_matches, *self.split_pattern(pattern))
+
+
+def _regex_matches(regex: Pattern, name: str) -> bool:
+    return regex.match(name) is not None
+
+
+def _wildcard_matches(negate: bool, prefix: str, suffix: str, name: str) -> bool:
+    return (name.startswith(prefix) and name.endswith(suffix)) != negate
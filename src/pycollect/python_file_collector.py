@@ -1,7 +1,40 @@
-import inspect
 import os
-import re
-from typing import Iterable, Optional, Set
+import sys
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Pattern,
+    Set,
+    Tuple,
+    Union,
+)
+
+from pycollect.deduplication import InodeDeduplicator
+from pycollect.pattern_matcher import PatternMatcher
+
+if TYPE_CHECKING:  # pragma: no cover
+    # imported where used only, to keep importing the package fast
+    from concurrent.futures import Executor, Future
+
+    from pycollect.archive_collection import ArchiveEntry
+    from pycollect.collection_cache import CacheSession, CollectionCache, ScanResult
+    from pycollect.collection_stats import CollectionStats
+    from pycollect.compact_collection import CompactCollection
+    from pycollect.content_filter import ContentFilter
+    from pycollect.dir_fd_scanner import DirFdScanner
+    from pycollect.file_entry import FileEntry
+    from pycollect.glob_matcher import GlobMatcher
+    from pycollect.module_finder import ModuleNameResolver
+    from pycollect.sharding import ShardFilter
+    from pycollect.watcher import CollectionWatcher
 
 
 class PythonFileCollector:
@@ -17,6 +50,10 @@ class PythonFileCollector:
     exclamation mark, ``!``, can be used at the beginning of the pattern to negate it.
     These only applies when the parameter ``use_regex_patterns`` is ``False``.
 
+    Patterns are compiled into a :class:`~pycollect.pattern_matcher.PatternMatcher`
+    the first time they are needed and compiled again only when the pattern sets
+    (or the ``enable_regex_patterns`` flag) are changed.
+
     .. note::
         Using regex patterns may be slower as it consumes more CPU.
 
@@ -34,10 +71,25 @@ class PythonFileCollector:
         In addition to the PythonFileCollector._DEFAULT_DIR_EXCLUSION_PATTERNS or
         PythonFileCollector._DEFAULT_DIR_EXCLUSION_REGEX_PATTERNS any directory that
         matches these patterns will be excluded from collection.
+    :param path_exclusion_patterns:
+        (default: ``None``) glob patterns, in the syntax of ``.gitignore`` files,
+        matched against file and directory paths relative to the search path, e.g.
+        ``"tests/fixtures/**"`` or ``"/docs/*.py"``. Unlike name exclusion patterns
+        they support several wildcards, ``?``, character classes, ``**`` and
+        negation. Excluded directories are not traversed. See
+        :class:`~pycollect.glob_matcher.GlobMatcher`.
+    :param use_ignore_files:
+        (default: ``False``) flag to indicate whether or not to exclude the files and
+        directories ignored by the ``.gitignore`` and ``.ignore`` files found in the
+        search path, and in its parent directories up to the root of the git
+        repository containing it. See
+        :class:`~pycollect.ignore_files.IgnoreFileMatcher`. Note that a
+        :class:`~pycollect.collection_cache.CollectionCache` only notices changes to
+        ignore files when the directories they apply to are modified as well.
     """
 
-    _WILDCARD = "*"
-    _NEGATION = "!"
+    #: The names of the ignore files honored when ``use_ignore_files`` is set.
+    DEFAULT_IGNORE_FILE_NAMES = (".gitignore", ".ignore")
     #: The default set of file exclusion patterns.
     #:
     #: Are excluded by default:
@@ -97,6 +149,8 @@ class PythonFileCollector:
         use_regex_patterns: bool = False,
         additional_file_exclusion_patterns: Iterable[str] = None,
         additional_dir_exclusion_patterns: Iterable[str] = None,
+        path_exclusion_patterns: Iterable[str] = None,
+        use_ignore_files: bool = False,
     ):
         self.enable_regex_patterns = use_regex_patterns
         if self.enable_regex_patterns:
@@ -116,9 +170,26 @@ class PythonFileCollector:
         if additional_dir_exclusion_patterns:
             self.dir_exclusion_patterns.update(additional_dir_exclusion_patterns)
 
+        #: Glob patterns matched against paths relative to the search path. Unlike
+        #: the name exclusion patterns, their order matters as later patterns
+        #: override earlier ones.
+        self.path_exclusion_patterns = list(
+            path_exclusion_patterns or ()
+        )  # type: List[str]
+        #: Names of the ignore files honored during collections, in increasing order
+        #: of precedence.
+        self.ignore_file_names = (
+            self.DEFAULT_IGNORE_FILE_NAMES if use_ignore_files else ()
+        )  # type: Tuple[str, ...]
+
+        self._file_matcher = None  # type: Optional[PatternMatcher]
+        self._dir_matcher = None  # type: Optional[PatternMatcher]
+        self._path_matcher = None  # type: Optional[GlobMatcher]
+
     @staticmethod
     def _get_caller_path() -> str:
-        caller_filename = inspect.stack(2)[1]
+        # stack: this method, the public collection method and then its caller
+        caller_filename = sys._getframe(2).f_code.co_filename
         caller_abs_path = os.path.abspath(caller_filename)
         return os.path.dirname(caller_abs_path)
 
@@ -127,7 +198,18 @@ class PythonFileCollector:
         search_path: Optional[str] = None,
         recursion_limit: Optional[int] = None,
         follow_symlinks: bool = True,
-    ) -> Set[os.DirEntry]:
+        workers: Optional[int] = None,
+        cache: "Optional[CollectionCache]" = None,
+        unique_dirs: Optional[bool] = None,
+        unique_files: bool = False,
+        compact: bool = False,
+        stats: "Optional[CollectionStats]" = None,
+        contains: "Union[bytes, Pattern[bytes], ContentFilter, None]" = None,
+        use_dir_fds: bool = False,
+        shard: Optional[int] = None,
+        num_shards: int = 1,
+        shard_weights: Optional[Mapping[str, float]] = None,
+    ) -> "Union[Set[os.DirEntry], CompactCollection]":
         """
         Method to perform Python files collection in the specified search path,
         respecting exclusion patterns set to the class object.
@@ -141,66 +223,924 @@ class PythonFileCollector:
         :param follow_symlinks:
             (default: True) boolean indicating whether or not to follow symbolic links
             when collecting Python files.
+        :param workers:
+            (default: None) number of threads used to scan directories concurrently.
+            As :func:`os.scandir` releases the GIL, this speeds up collection on file
+            systems where each directory access has a high latency, such as network
+            file systems. By default directories are scanned one after another.
+        :param cache:
+            (default: None) a :class:`~pycollect.collection_cache.CollectionCache`
+            used to skip scanning directories that were not modified since they were
+            last collected with the same configuration. Files retrieved from the cache
+            are returned as :class:`~pycollect.file_entry.FileEntry` instances.
+        :param unique_dirs:
+            (default: same as ``follow_symlinks``) boolean indicating whether or not to
+            scan each physical directory, identified by its device and inode numbers,
+            only once even if several symbolic links lead to it. Symbolic links
+            leading back to one of their ancestors are then reported with a
+            :class:`~pycollect.deduplication.SymlinkLoopWarning` instead of being
+            followed over and over again.
+        :param unique_files:
+            (default: False) boolean indicating whether or not to collect each
+            physical file only once even if it can be reached through several paths.
+            This requires a ``stat`` call per collected file.
+        :param compact:
+            (default: False) boolean indicating whether or not to return a
+            :class:`~pycollect.compact_collection.CompactCollection` of paths rather
+            than a set of DirEntry instances, which uses a fraction of the memory.
+        :param stats:
+            (default: None) a :class:`~pycollect.collection_stats.CollectionStats`
+            to fill in with statistics about the collection, such as the number of
+            entries excluded by each pattern and the time spent in each directory.
+        :param contains:
+            (default: None) a byte string, a compiled regular expression over bytes or
+            a :class:`~pycollect.content_filter.ContentFilter`, to only collect the
+            files whose content contains or matches it. File contents are searched
+            as each directory is scanned, so by ``workers`` threads when given.
+        :param use_dir_fds:
+            (default: False) boolean indicating whether or not to scan directories
+            through file descriptors, opening each one relative to its parent's, as
+            :func:`os.fwalk` does. This saves the kernel resolving the full path of
+            every directory on deep trees. Collected files are then returned as
+            :class:`~pycollect.file_entry.FileEntry` instances. See
+            :class:`~pycollect.dir_fd_scanner.DirFdScanner`. This is ignored on
+            platforms not supporting it, and when ``stats`` is given.
+        :param shard:
+            (default: None) the index of the shard to collect, from 0 to
+            ``num_shards - 1``, when distributing a collection across machines. Top
+            level subdirectories of the search path are assigned to shards as whole
+            subtrees and only the ones of this shard are traversed, while files are
+            assigned individually when there are fewer subdirectories than shards.
+            Shards never overlap and together collect the same files as an unsharded
+            collection, unless ``unique_dirs`` skips a directory reached from
+            several subtrees. See :class:`~pycollect.sharding.ShardFilter`.
+        :param num_shards:
+            (default: 1) the number of shards.
+        :param shard_weights:
+            (default: None) the weights of the top level subdirectories, by name,
+            e.g. their number of files, to balance the shards. By default every
+            subdirectory weighs the same.
         :return:
             A set of DirEntry instances referring to each collected file is returned.
         """
         if search_path is None:
             search_path = self._get_caller_path()
+        files = self._walk(
+            search_path,
+            recursion_limit,
+            follow_symlinks,
+            workers=workers,
+            cache=cache,
+            unique_dirs=unique_dirs,
+            unique_files=unique_files,
+            stats=stats,
+            contains=contains,
+            use_dir_fds=use_dir_fds,
+            shard=self._shard_filter(shard, num_shards, shard_weights),
+        )
+        if compact:
+            from pycollect.compact_collection import CompactCollection
 
-        collected_files = set()  # type: Set[os.DirEntry]
-        excluded_files = set()  # type: Set[os.DirEntry]
-        collected_dirs = set()  # type: Set[os.DirEntry]
-        excluded_dirs = set()  # type: Set[os.DirEntry]
+            return CompactCollection(files)
+        return set(files)
 
-        for entry in os.scandir(search_path):
-            if entry.is_file(follow_symlinks=follow_symlinks):
-                if self._should_exclude_file(entry):
-                    excluded_files.add(entry)
-                    continue
-                collected_files.add(entry)
-                continue
-            if entry.is_dir(follow_symlinks=follow_symlinks):
-                if self._should_exclude_dir(entry):
-                    excluded_dirs.add(entry)
+    def iter_collect(
+        self,
+        search_path: Optional[str] = None,
+        recursion_limit: Optional[int] = None,
+        follow_symlinks: bool = True,
+        workers: Optional[int] = None,
+        cache: "Optional[CollectionCache]" = None,
+        unique_dirs: Optional[bool] = None,
+        unique_files: bool = False,
+        stats: "Optional[CollectionStats]" = None,
+        contains: "Union[bytes, Pattern[bytes], ContentFilter, None]" = None,
+        use_dir_fds: bool = False,
+        shard: Optional[int] = None,
+        num_shards: int = 1,
+        shard_weights: Optional[Mapping[str, float]] = None,
+    ) -> Iterator[os.DirEntry]:
+        """
+        Streaming counterpart of :meth:`collect`. Collected files are yielded as soon
+        as the directory containing them is scanned, so the first files are available
+        before the whole tree is traversed and the iteration can be abandoned at any
+        time.
+
+        Directories are traversed depth-first using an explicit stack rather than
+        recursion, thus memory usage is bounded by the traversal frontier and deep
+        trees are not subject to Python's recursion limit. When ``workers`` is given,
+        files are yielded in the order worker threads finish scanning directories.
+
+        Parameters are the same as in :meth:`collect`.
+
+        :return:
+            An iterator of DirEntry instances referring to each collected file.
+        """
+        if search_path is None:
+            search_path = self._get_caller_path()
+        return self._walk(
+            search_path,
+            recursion_limit,
+            follow_symlinks,
+            workers=workers,
+            cache=cache,
+            unique_dirs=unique_dirs,
+            unique_files=unique_files,
+            stats=stats,
+            contains=contains,
+            use_dir_fds=use_dir_fds,
+            shard=self._shard_filter(shard, num_shards, shard_weights),
+        )
+
+    def collect_modules(
+        self,
+        search_path: Optional[str] = None,
+        recursion_limit: Optional[int] = None,
+        follow_symlinks: bool = True,
+        innermost: bool = False,
+        packages_only: bool = False,
+        workers: Optional[int] = None,
+        cache: "Optional[CollectionCache]" = None,
+        unique_dirs: Optional[bool] = None,
+        unique_files: bool = False,
+        stats: "Optional[CollectionStats]" = None,
+        contains: "Union[bytes, Pattern[bytes], ContentFilter, None]" = None,
+        resolver: "Optional[ModuleNameResolver]" = None,
+        use_dir_fds: bool = False,
+        shard: Optional[int] = None,
+        num_shards: int = 1,
+        shard_weights: Optional[Mapping[str, float]] = None,
+    ) -> Iterator[Tuple[os.DirEntry, Optional[str]]]:
+        """
+        Counterpart of :meth:`iter_collect` naming the collected files as they are
+        collected. Module names are the ones
+        :func:`~pycollect.module_finder.find_module_name` finds, but the module name
+        prefix of each directory is worked out once, from its parent's, as the tree
+        is traversed, instead of walking up the ancestors of every file.
+
+        .. code-block:: python
+
+            for file, module_name in collector.collect_modules("src"):
+                print(file.path, module_name)
+
+        :param innermost:
+            (default: False) whether to name files after their innermost rather than
+            outermost possible module name. See
+            :func:`~pycollect.module_finder.find_module_name`.
+        :param packages_only:
+            (default: False) boolean indicating whether or not to skip the
+            directories, below the search path, that are neither packages, i.e. have
+            no ``__init__.py`` file, nor ``sys.path`` entries. Their files are not
+            collected and their subdirectories are not traversed, which avoids
+            scanning large data directories.
+        :param resolver:
+            (default: None) the
+            :class:`~pycollect.module_finder.ModuleNameResolver` resolving the
+            module name prefixes of the search path, to share its memoized
+            prefixes across calls.
+
+        The remaining parameters are the same as in :meth:`iter_collect`, noting that
+        the search path is made absolute so the collected files are referred to by
+        absolute paths.
+
+        :return:
+            An iterator of ``(DirEntry, module name)`` tuples, the module name being
+            None for files outside of ``sys.path``.
+        """
+        if search_path is None:
+            search_path = self._get_caller_path()
+        search_path = os.path.abspath(search_path)
+        if resolver is None:
+            from pycollect.module_finder import ModuleNameResolver
+
+            resolver = ModuleNameResolver()
+        return self._walk(
+            search_path,
+            recursion_limit,
+            follow_symlinks,
+            workers=workers,
+            cache=cache,
+            unique_dirs=unique_dirs,
+            unique_files=unique_files,
+            stats=stats,
+            contains=contains,
+            use_dir_fds=use_dir_fds,
+            shard=self._shard_filter(shard, num_shards, shard_weights),
+            wrap=partial(
+                resolver.wrap,
+                search_path=search_path,
+                innermost=innermost,
+                packages_only=packages_only,
+            ),
+        )
+
+    def collect_archive(
+        self,
+        archive_path: Union[str, os.PathLike],
+        recursion_limit: Optional[int] = None,
+    ) -> "Set[ArchiveEntry]":
+        """
+        Collects the Python files of a wheel, zip or tar archive, e.g. an sdist,
+        without extracting it, applying the exclusion patterns to the archive members
+        as if the archive were the search path.
+
+        Only the archive metadata is read: the central directory of zip files, and
+        the member headers of tar files, which are decompressed as they are streamed
+        through when compressed. Nothing is written to disk.
+
+        .. code-block:: python
+
+            for file in collector.collect_archive("dist/pkg-1.0-py3-none-any.whl"):
+                print(file.member, find_module_name(file))
+
+        :param archive_path:
+            The path of the archive. Archives with a ``.zip``, ``.whl``, ``.egg``,
+            ``.pyz`` or ``.jar`` suffix are read as zip files, other ones as tar
+            files.
+        :param recursion_limit:
+            (default: None) directory recursion limit, the archive root being level
+            0 of recursion.
+        :return:
+            A set of :class:`~pycollect.archive_collection.ArchiveEntry` instances
+            referring to each collected file.
+        """
+        from pycollect.archive_collection import scan_archive
+
+        return set(
+            scan_archive(
+                os.fspath(archive_path),
+                recursion_limit,
+                self.file_matcher.matches,
+                self.dir_matcher.matches,
+                self.path_matcher,
+            )
+        )
+
+    def collect_many(
+        self,
+        search_paths: Iterable[Union[str, os.PathLike]],
+        recursion_limit: Optional[int] = None,
+        follow_symlinks: bool = True,
+        processes: Optional[int] = None,
+        unique_dirs: Optional[bool] = None,
+        unique_files: bool = False,
+    ) -> "Set[Union[os.DirEntry, FileEntry]]":
+        """
+        Collects Python files from several search paths at once.
+
+        Search paths are made absolute and normalized first. A search path nested
+        within another one is dropped when the outer search path's traversal already
+        covers it, i.e. when there is no recursion limit and no directory in between
+        is excluded (nor is a symbolic link not to be followed), so no directory is
+        walked twice. The collected files are merged without duplicates.
+
+        :param search_paths:
+            The directories to collect files from.
+        :param processes:
+            (default: None) number of worker processes. When given, the top level
+            subdirectories of every search path are distributed across a process pool
+            and collected files are returned as
+            :class:`~pycollect.file_entry.FileEntry` instances. By default, everything
+            is collected in the current process.
+
+        The remaining parameters are the same as in :meth:`collect`, noting that
+        ``unique_dirs`` applies within the traversal of each search path, whether it
+        is split across processes or not, while ``unique_files`` applies within the
+        part of the traversal each process runs.
+
+        :return:
+            A set of entries referring to each collected file, with a single entry per
+            path.
+        """
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        from pycollect.file_entry import FileEntry
+
+        roots = self._outermost_roots(search_paths, recursion_limit, follow_symlinks)
+        collected = {}  # type: Dict[str, Union[os.DirEntry, FileEntry]]
+        if processes is None or processes <= 1:
+            for root in roots:
+                for file in self._walk(
+                    root,
+                    recursion_limit,
+                    follow_symlinks,
+                    unique_dirs=unique_dirs,
+                    unique_files=unique_files,
+                ):
+                    collected.setdefault(file.path, file)
+            return set(collected.values())
+
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            traversals = []
+            for root in roots:
+                scan = self._scanner(root, follow_symlinks)
+                deduplicator = self._deduplicator(
+                    follow_symlinks, unique_dirs, unique_files, defer_symlinks=True
+                )
+                if deduplicator is not None:
+                    deduplicator.add_root(root)
+                    scan = deduplicator.wrap(scan)
+                files, subdirs = scan(root)
+                for file in files:
+                    collected.setdefault(file.path, file)
+                futures = []
+                if recursion_limit is None or recursion_limit > 0:
+                    sublimit = None if recursion_limit is None else recursion_limit - 1
+                    futures = [
+                        executor.submit(
+                            _collect_compact,
+                            self,
+                            subdir,
+                            sublimit,
+                            follow_symlinks,
+                            unique_dirs,
+                            unique_files,
+                            root,
+                        )
+                        for subdir in subdirs
+                    ]
+                traversals.append((root, scan, deduplicator, futures))
+
+            for root, scan, deduplicator, futures in traversals:
+                for future in as_completed(futures):
+                    paths, worker_deduplicator = future.result()
+                    if worker_deduplicator is not None:
+                        deduplicator.merge(worker_deduplicator)
+                    for path in paths:
+                        if path not in collected:
+                            collected[path] = FileEntry(path)
+                if deduplicator is None or not deduplicator.defer_symlinks:
                     continue
-                collected_dirs.add(entry)
+                # the directories the workers reached through symbolic links, once
+                # every real directory of the traversal is known, as in _walk
+                for file in deduplicator.walk_deferred(
+                    partial(self._walk_sequential, scan=scan), root, recursion_limit
+                ):
+                    collected.setdefault(file.path, file)
+        return set(collected.values())
+
+    def _outermost_roots(
+        self,
+        search_paths: Iterable[Union[str, os.PathLike]],
+        recursion_limit: Optional[int],
+        follow_symlinks: bool,
+    ) -> List[str]:
+        normalized = {}  # type: Dict[str, str]
+        for search_path in search_paths:
+            root = os.path.abspath(os.fspath(search_path))
+            normalized.setdefault(os.path.normcase(root), root)
+
+        roots = []  # type: List[str]
+        # an outer root always sorts before the roots nested within it
+        for key in sorted(normalized):
+            root = normalized[key]
+            if recursion_limit is None and any(
+                self._covers(outer_root, root, follow_symlinks) for outer_root in roots
+            ):
                 continue
+            roots.append(root)
+        return roots
+
+    def _covers(self, outer_root: str, root: str, follow_symlinks: bool) -> bool:
+        if self.path_exclusion_patterns or self.ignore_file_names:
+            # path patterns and ignore files apply relative to each search path
+            return False
+        if not os.path.normcase(root).startswith(
+            os.path.normcase(os.path.join(outer_root, ""))
+        ):
+            return False
+        exclude_dir = self.dir_matcher.matches
+        path = outer_root
+        for name in os.path.relpath(root, outer_root).split(os.sep):
+            path = os.path.join(path, name)
+            if exclude_dir(name) or (not follow_symlinks and os.path.islink(path)):
+                return False
+        return True
+
+    def watch(
+        self,
+        search_path: Optional[str] = None,
+        recursion_limit: Optional[int] = None,
+        follow_symlinks: bool = True,
+        on_added: Optional[Callable[[str], None]] = None,
+        on_removed: Optional[Callable[[str], None]] = None,
+        use_inotify: Optional[bool] = None,
+        poll_interval: float = 1.0,
+    ) -> "CollectionWatcher":
+        """
+        Collects Python files and keeps watching the search path so that the
+        collection is kept up to date as files and directories are created, deleted or
+        moved. See :class:`~pycollect.watcher.CollectionWatcher`.
 
-        if recursion_limit is None or recursion_limit > 0:
-            if recursion_limit is not None:
-                recursion_limit -= 1
-            for subdir in collected_dirs:
-                collected_files.update(
-                    self.collect(
-                        search_path=subdir.path,
-                        recursion_limit=recursion_limit,
-                        follow_symlinks=follow_symlinks,
-                    )
+        :param search_path:
+            (default: uses the caller's path) the directory to collect from and watch.
+        :param recursion_limit:
+            (default: None) directory recursion limit, as in :meth:`collect`.
+        :param follow_symlinks:
+            (default: True) boolean indicating whether or not to follow symbolic links.
+        :param on_added:
+            (default: None) callback called with the path of every added file.
+        :param on_removed:
+            (default: None) callback called with the path of every removed file.
+        :param use_inotify:
+            (default: None) whether to be notified of changes by inotify rather than
+            polling directories. By default inotify is used when available.
+        :param poll_interval:
+            (default: 1.0) number of seconds between checks when polling.
+        :return:
+            A :class:`~pycollect.watcher.CollectionWatcher` whose ``files`` attribute
+            holds the paths of the collected files.
+        """
+        from pycollect.watcher import CollectionWatcher
+
+        if search_path is None:
+            search_path = self._get_caller_path()
+        scan = self._scanner(search_path, follow_symlinks)
+        deduplicator = None
+        if follow_symlinks:
+            # forgets the directories the watcher stops watching, see forget()
+            deduplicator = InodeDeduplicator(True, False, follow_symlinks)
+            scan = deduplicator.wrap(scan)
+        return CollectionWatcher(
+            scan,
+            search_path,
+            recursion_limit=recursion_limit,
+            follow_symlinks=follow_symlinks,
+            on_added=on_added,
+            on_removed=on_removed,
+            use_inotify=use_inotify,
+            poll_interval=poll_interval,
+            deduplicator=deduplicator,
+        )
+
+    def _walk(
+        self,
+        search_path: str,
+        recursion_limit: Optional[int],
+        follow_symlinks: bool,
+        workers: Optional[int] = None,
+        cache: "Optional[CollectionCache]" = None,
+        unique_dirs: Optional[bool] = None,
+        unique_files: bool = False,
+        stats: "Optional[CollectionStats]" = None,
+        contains: "Union[bytes, Pattern[bytes], ContentFilter, None]" = None,
+        pattern_root: Optional[str] = None,
+        wrap: "Optional[Callable[[Callable[[str], ScanResult]], Callable]]" = None,
+        use_dir_fds: bool = False,
+        shard: "Optional[ShardFilter]" = None,
+        deduplicator: Optional[InodeDeduplicator] = None,
+    ) -> Iterator:
+        # a given deduplicator leaves the directories reached through symbolic links
+        # to the caller, see collect_many()
+        walk_deferred = deduplicator is None
+        dir_fd_scanner = None
+        if use_dir_fds and stats is None:
+            from pycollect.dir_fd_scanner import DirFdScanner
+
+            if DirFdScanner.is_available():
+                dir_fd_scanner = DirFdScanner(
+                    follow_symlinks, self.file_matcher.matches, self.dir_matcher.matches
                 )
+        scan = self._scanner(
+            pattern_root or search_path, follow_symlinks, stats, dir_fd_scanner
+        )
+        session = None
+        if cache is not None:
+            session = cache.session(search_path, self._cache_config(follow_symlinks))
+            scan = session.wrap(scan)
+        stat_dir = None if dir_fd_scanner is None else dir_fd_scanner.stat
+        if session is not None:
+            # the cache needs the status of each directory as well
+            stat_dir = session.stat
+        if deduplicator is None:
+            deduplicator = self._deduplicator(
+                follow_symlinks,
+                unique_dirs,
+                unique_files,
+                stat_dir,
+                defer_symlinks=True,
+            )
+        if deduplicator is not None:
+            scan = deduplicator.wrap(scan)
+        if shard is not None:
+            scan = shard.wrap(scan, search_path)
+        if contains is not None:
+            scan = self._content_filter(contains).wrap(scan)
+        if wrap is not None:
+            # turns collected files into whatever the scanning function returns
+            scan = wrap(scan)
 
-        return collected_files
+        def walk_from(path: str, limit: Optional[int]) -> Iterator:
+            if workers is not None and workers > 1:
+                return self._walk_parallel(path, limit, scan, workers)
+            return self._walk_sequential(path, limit, scan)
 
-    def _should_exclude_file(self, entry: os.DirEntry) -> bool:
-        filename = entry.name  # type: str
-        return any(
-            self._matches_pattern(pattern, filename)
-            for pattern in self.file_exclusion_patterns
+        if walk_deferred and deduplicator is not None and deduplicator.defer_symlinks:
+            walk = deduplicator.walk(
+                walk_from,
+                search_path,
+                recursion_limit,
+                None if shard is None else shard.owns_link,
+            )
+        else:
+            walk = walk_from(search_path, recursion_limit)
+
+        if dir_fd_scanner is not None:
+            walk = self._walk_and_close(walk, dir_fd_scanner)
+        if session is None:
+            return walk
+        # a shard only traverses part of the tree, whose other parts are not stale
+        # but left to the other shards sharing the cache
+        complete = recursion_limit is None and (shard is None or shard.num_shards == 1)
+        return self._walk_and_save(walk, session, complete)
+
+    @staticmethod
+    def _deduplicator(
+        follow_symlinks: bool,
+        unique_dirs: Optional[bool],
+        unique_files: bool,
+        stat_dir: Optional[Callable[..., os.stat_result]] = None,
+        defer_symlinks: bool = False,
+    ) -> Optional[InodeDeduplicator]:
+        if unique_dirs is None:
+            unique_dirs = follow_symlinks
+        if not (unique_dirs or unique_files):
+            return None
+        # directories reached through symbolic links are scanned after the others,
+        # so that the alias kept does not depend on the order of the scans
+        return InodeDeduplicator(
+            unique_dirs,
+            unique_files,
+            follow_symlinks,
+            stat_dir,
+            defer_symlinks and unique_dirs and follow_symlinks,
         )
 
-    def _should_exclude_dir(self, entry: os.DirEntry) -> bool:
-        dirname = entry.name  # type: str
-        return any(
-            self._matches_pattern(pattern, dirname)
-            for pattern in self.dir_exclusion_patterns
+    @staticmethod
+    def _deduplicated(
+        scan: "Callable[[str], ScanResult]",
+        follow_symlinks: bool,
+        unique_dirs: Optional[bool],
+        unique_files: bool,
+    ) -> "Callable[[str], ScanResult]":
+        deduplicator = PythonFileCollector._deduplicator(
+            follow_symlinks, unique_dirs, unique_files
         )
+        return scan if deduplicator is None else deduplicator.wrap(scan)
 
-    def _matches_pattern(self, pattern: str, name: str) -> bool:
-        if self.enable_regex_patterns:
-            return bool(re.match(pattern, name))
-        negate = False
-        if pattern.startswith(self._NEGATION):
-            negate = True
-            pattern = pattern[1:]
-        splitted = pattern.split(self._WILDCARD)
-        matches_pattern = name.startswith(splitted[0]) and name.endswith(splitted[-1])
-        return matches_pattern if not negate else not matches_pattern
+    @staticmethod
+    def _shard_filter(
+        shard: Optional[int],
+        num_shards: int,
+        shard_weights: Optional[Mapping[str, float]],
+    ) -> "Optional[ShardFilter]":
+        if shard is None:
+            return None
+        from pycollect.sharding import ShardFilter
+
+        return ShardFilter(shard, num_shards, shard_weights)
+
+    @staticmethod
+    def _content_filter(
+        contains: "Union[bytes, Pattern[bytes], ContentFilter]",
+    ) -> "ContentFilter":
+        from pycollect.content_filter import ContentFilter
+
+        if isinstance(contains, ContentFilter):
+            return contains
+        return ContentFilter(contains)
+
+    def acollect(
+        self,
+        search_path: Optional[str] = None,
+        recursion_limit: Optional[int] = None,
+        follow_symlinks: bool = True,
+        concurrency: int = 4,
+        executor: "Optional[Executor]" = None,
+        unique_dirs: Optional[bool] = None,
+        unique_files: bool = False,
+        stats: "Optional[CollectionStats]" = None,
+        contains: "Union[bytes, Pattern[bytes], ContentFilter, None]" = None,
+    ) -> AsyncIterator[os.DirEntry]:
+        """
+        Asynchronous counterpart of :meth:`iter_collect`, meant to be used from within
+        an :mod:`asyncio` event loop without blocking it:
+
+        .. code-block:: python
+
+            async for file in collector.acollect("../foo"):
+                print(file.path)
+
+        Directories are scanned in an executor and collected files are yielded as
+        scans complete. At most ``concurrency`` directory scans are in flight at any
+        time and new scans are only started when the consumer asks for more files, so
+        a slow consumer is never flooded. Cancelling the consuming task or closing the
+        iterator cancels pending scans.
+
+        :param concurrency:
+            (default: 4) maximum number of directories scanned at the same time.
+        :param executor:
+            (default: None) the :class:`concurrent.futures.Executor` running the
+            scans. By default, the event loop's default executor is used.
+
+        The remaining parameters are the same as in :meth:`collect`.
+
+        :return:
+            An asynchronous iterator of DirEntry instances referring to each collected
+            file.
+        """
+        if search_path is None:
+            search_path = self._get_caller_path()
+        scan = self._scanner(search_path, follow_symlinks, stats)
+        deduplicator = self._deduplicator(
+            follow_symlinks, unique_dirs, unique_files, defer_symlinks=True
+        )
+        if deduplicator is not None:
+            scan = deduplicator.wrap(scan)
+        if contains is not None:
+            scan = self._content_filter(contains).wrap(scan)
+
+        def walk_from(path: str, limit: Optional[int]) -> AsyncIterator[os.DirEntry]:
+            return self._walk_async(path, limit, scan, max(concurrency, 1), executor)
+
+        if deduplicator is not None and deduplicator.defer_symlinks:
+            return deduplicator.awalk(walk_from, search_path, recursion_limit)
+        return walk_from(search_path, recursion_limit)
+
+    @staticmethod
+    async def _walk_async(
+        search_path: str,
+        recursion_limit: Optional[int],
+        scan: "Callable[[str], ScanResult]",
+        concurrency: int,
+        executor: "Optional[Executor]",
+    ) -> AsyncIterator[os.DirEntry]:
+        import asyncio
+
+        loop = asyncio.get_event_loop()
+        stack = [
+            (search_path, recursion_limit)
+        ]  # type: List[Tuple[str, Optional[int]]]
+        running = {}  # type: Dict[asyncio.Future, Optional[int]]
+
+        def submit_scans() -> None:
+            while stack and len(running) < concurrency:
+                path, limit = stack.pop()
+                running[loop.run_in_executor(executor, scan, path)] = limit
+
+        try:
+            submit_scans()
+            while running:
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                scanned_files = []  # type: List[List[os.DirEntry]]
+                for future in done:
+                    limit = running.pop(future)
+                    files, subdirs = future.result()
+                    scanned_files.append(files)
+                    if limit is None or limit > 0:
+                        sublimit = None if limit is None else limit - 1
+                        stack.extend((subdir, sublimit) for subdir in subdirs)
+                submit_scans()
+                for files in scanned_files:
+                    for file in files:
+                        yield file
+        finally:
+            for future in running:
+                future.cancel()
+
+    def _cache_config(self, follow_symlinks: bool) -> str:
+        return repr(
+            (
+                sorted(self.file_exclusion_patterns),
+                sorted(self.dir_exclusion_patterns),
+                self.enable_regex_patterns,
+                self.path_exclusion_patterns,
+                self.ignore_file_names,
+                follow_symlinks,
+            )
+        )
+
+    @staticmethod
+    def _walk_and_save(
+        walk: Iterator[os.DirEntry], session: "CacheSession", whole_tree: bool
+    ) -> Iterator[os.DirEntry]:
+        complete = False
+        try:
+            yield from walk
+            complete = whole_tree
+        finally:
+            session.save(complete)
+
+    @staticmethod
+    def _walk_and_close(
+        walk: Iterator[os.DirEntry], dir_fd_scanner: "DirFdScanner"
+    ) -> Iterator[os.DirEntry]:
+        try:
+            yield from walk
+        finally:
+            dir_fd_scanner.close()
+
+    @staticmethod
+    def _walk_sequential(
+        search_path: str,
+        recursion_limit: Optional[int],
+        scan: "Callable[[str], ScanResult]",
+    ) -> Iterator[os.DirEntry]:
+        stack = [
+            (search_path, recursion_limit)
+        ]  # type: List[Tuple[str, Optional[int]]]
+        while stack:
+            path, limit = stack.pop()
+            files, subdirs = scan(path)
+            yield from files
+            if limit is None or limit > 0:
+                sublimit = None if limit is None else limit - 1
+                stack.extend((subdir, sublimit) for subdir in reversed(subdirs))
+
+    @staticmethod
+    def _walk_parallel(
+        search_path: str,
+        recursion_limit: Optional[int],
+        scan: "Callable[[str], ScanResult]",
+        workers: int,
+    ) -> Iterator[os.DirEntry]:
+        # At most two scans per worker are in flight at a time, so the frontier of
+        # directories still to be scanned is kept as a plain stack rather than as
+        # futures piling up in the executor's unbounded queue.
+        from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+        max_running = 2 * workers
+        stack = [
+            (search_path, recursion_limit)
+        ]  # type: List[Tuple[str, Optional[int]]]
+        running = {}  # type: Dict[Future, Optional[int]]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+
+            def submit_scans() -> None:
+                while stack and len(running) < max_running:
+                    path, limit = stack.pop()
+                    running[executor.submit(scan, path)] = limit
+
+            try:
+                submit_scans()
+                while running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    scanned_files = []  # type: List[List[os.DirEntry]]
+                    for future in done:
+                        limit = running.pop(future)
+                        files, subdirs = future.result()
+                        scanned_files.append(files)
+                        if limit is None or limit > 0:
+                            sublimit = None if limit is None else limit - 1
+                            stack.extend((subdir, sublimit) for subdir in subdirs)
+                    # keep workers busy while the consumer handles the results
+                    submit_scans()
+                    for files in scanned_files:
+                        yield from files
+            finally:
+                for future in running:
+                    future.cancel()
+
+    def _scanner(
+        self,
+        search_path: str,
+        follow_symlinks: bool,
+        stats: "Optional[CollectionStats]" = None,
+        dir_fd_scanner: "Optional[DirFdScanner]" = None,
+    ) -> "Callable[[str], ScanResult]":
+        """
+        Builds a function scanning a single directory with the current exclusion
+        patterns, path exclusion patterns being relative to ``search_path``, and
+        instrumented to fill in ``stats`` when given. Directories are scanned by
+        ``dir_fd_scanner`` when given.
+        """
+        if stats is not None:
+            scan = partial(
+                stats.scan,
+                follow_symlinks=follow_symlinks,
+                file_matcher=self.file_matcher,
+                dir_matcher=self.dir_matcher,
+            )
+        elif dir_fd_scanner is not None:
+            scan = dir_fd_scanner.scan
+        else:
+            scan = partial(
+                self._scan_dir,
+                follow_symlinks=follow_symlinks,
+                exclude_file=self.file_matcher.matches,
+                exclude_dir=self.dir_matcher.matches,
+            )
+        path_matcher = self.path_matcher
+        if path_matcher is not None:
+            scan = path_matcher.wrap(scan, search_path)
+        if self.ignore_file_names:
+            from pycollect.ignore_files import IgnoreFileMatcher
+
+            scan = IgnoreFileMatcher(search_path, self.ignore_file_names).wrap(scan)
+        return scan
+
+    @staticmethod
+    def _scan_dir(
+        path: str,
+        follow_symlinks: bool,
+        exclude_file: Callable[[str], bool],
+        exclude_dir: Callable[[str], bool],
+    ) -> "ScanResult":
+        """
+        Scans a single directory and splits its entries into the files to collect and
+        the paths of the subdirectories to descend into.
+        """
+        files = []  # type: List[os.DirEntry]
+        subdirs = []  # type: List[str]
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=follow_symlinks):
+                    if not exclude_file(entry.name):
+                        files.append(entry)
+                elif entry.is_dir(follow_symlinks=follow_symlinks):
+                    if not exclude_dir(entry.name):
+                        subdirs.append(entry.path)
+        return files, subdirs
+
+    @property
+    def file_matcher(self) -> PatternMatcher:
+        """
+        The compiled matcher for :attr:`file_exclusion_patterns`.
+        """
+        self._file_matcher = self._compiled(
+            self._file_matcher, self.file_exclusion_patterns
+        )
+        return self._file_matcher
+
+    @property
+    def dir_matcher(self) -> PatternMatcher:
+        """
+        The compiled matcher for :attr:`dir_exclusion_patterns`.
+        """
+        self._dir_matcher = self._compiled(
+            self._dir_matcher, self.dir_exclusion_patterns
+        )
+        return self._dir_matcher
+
+    @property
+    def path_matcher(self) -> "Optional[GlobMatcher]":
+        """
+        The compiled matcher for :attr:`path_exclusion_patterns`, if any.
+        """
+        patterns = tuple(self.path_exclusion_patterns)
+        if not patterns:
+            self._path_matcher = None
+        elif self._path_matcher is None or self._path_matcher.patterns != patterns:
+            from pycollect.glob_matcher import GlobMatcher
+
+            self._path_matcher = GlobMatcher(patterns)
+        return self._path_matcher
+
+    def _compiled(
+        self, matcher: Optional[PatternMatcher], patterns: Set[str]
+    ) -> PatternMatcher:
+        if (
+            matcher is None
+            or matcher.use_regex_patterns != self.enable_regex_patterns
+            or matcher.patterns != patterns
+        ):
+            matcher = PatternMatcher(patterns, self.enable_regex_patterns)
+        return matcher
+
+    def _should_exclude_file(self, entry: os.DirEntry) -> bool:
+        return self.file_matcher.matches(entry.name)
+
+    def _should_exclude_dir(self, entry: os.DirEntry) -> bool:
+        return self.dir_matcher.matches(entry.name)
+
+
+def _collect_compact(
+    collector: PythonFileCollector,
+    search_path: str,
+    recursion_limit: Optional[int],
+    follow_symlinks: bool,
+    unique_dirs: Optional[bool],
+    unique_files: bool,
+    pattern_root: str,
+) -> "Tuple[CompactCollection, Optional[InodeDeduplicator]]":
+    # runs in worker processes of PythonFileCollector.collect_many, leaving the
+    # directories reached through symbolic links to the parent process
+    from pycollect.compact_collection import CompactCollection
+
+    deduplicator = collector._deduplicator(
+        follow_symlinks, unique_dirs, unique_files, defer_symlinks=True
+    )
+    files = CompactCollection(
+        collector._walk(
+            search_path,
+            recursion_limit,
+            follow_symlinks,
+            unique_dirs=unique_dirs,
+            unique_files=unique_files,
+            pattern_root=pattern_root,
+            deduplicator=deduplicator,
+        )
+    )
+    return files, deduplicator
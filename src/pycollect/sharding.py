@@ -0,0 +1,156 @@
+import os
+from hashlib import sha1
+from typing import Callable, Dict, List, Mapping, Optional
+
+from pycollect.collection_cache import ScanResult
+
+
+class ShardFilter:
+    """
+    ShardFilter restricts a traversal to one of several shards of a tree, so that
+    distributed test runners each collect their own part of it without walking the
+    whole tree.
+
+    The top level subdirectories of the search path are assigned to shards as whole
+    subtrees, by decreasing weight, each one to the least loaded shard, and are only
+    traversed by the shard they are assigned to. The files of the search path itself
+    are assigned individually, by a hash of their name. When there are fewer top
+    level subdirectories than shards, every shard traverses the whole tree but files
+    are assigned individually, by a hash of their path relative to the search path.
+
+    The assignment only depends on the names found in the tree and on the weights,
+    not on where the tree is checked out, so shards never overlap and together
+    collect exactly the files an unsharded collection does.
+
+    A directory reached through a symbolic link is only traversed by the shard of
+    the top level subtree its target is in, where an unsharded collection finds it
+    through its real path instead. Targets outside of the search path belong to the
+    shard of the symbolic link.
+
+    :param shard:
+        The index of the shard to collect, from 0 to ``num_shards - 1``.
+    :param num_shards:
+        The number of shards.
+    :param weights:
+        (default: None) the weights of the top level subdirectories, by name, e.g.
+        their number of files or the time spent collecting or testing them, to
+        balance the shards. Subdirectories without a weight weigh the mean of the
+        given ones. By default, every subdirectory weighs the same.
+    """
+
+    def __init__(
+        self,
+        shard: int,
+        num_shards: int,
+        weights: Optional[Mapping[str, float]] = None,
+    ):
+        if num_shards < 1:
+            raise ValueError("num_shards must be positive, got {}".format(num_shards))
+        if not 0 <= shard < num_shards:
+            raise ValueError(
+                "shard must be within [0, {}), got {}".format(num_shards, shard)
+            )
+        self.shard = shard
+        self.num_shards = num_shards
+        self.weights = dict(weights or {})  # type: Dict[str, float]
+        # the real search path and the shard of each of its subtrees, by name, as
+        # assigned while traversing it, None when files are assigned individually
+        self._real_search_path = ""
+        self._subtree_shards = None  # type: Optional[Dict[str, int]]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        # stable across processes, unlike hash()
+        digest = sha1(key.encode("utf-8", "surrogateescape")).digest()
+        return int.from_bytes(digest[:8], "big")
+
+    def owns(self, relative_path: str) -> bool:
+        """
+        Tells whether a file, assigned individually, belongs to the shard.
+
+        :param relative_path:
+            The file path relative to the search path, using forward slashes.
+        """
+        return self._hash(relative_path) % self.num_shards == self.shard
+
+    def assign(self, names: List[str]) -> Dict[str, int]:
+        """
+        Assigns top level subdirectories to shards.
+
+        :param names:
+            The names of the top level subdirectories.
+        :return:
+            The shard of each subdirectory, by name.
+        """
+        given = [self.weights[name] for name in names if name in self.weights]
+        default = sum(given) / len(given) if given else 1.0
+        loads = [0.0] * self.num_shards
+        shards = {}  # type: Dict[str, int]
+        # heaviest first, ties being broken by a hash rather than alphabetically so
+        # that subtrees of similar names are spread across shards
+        for name in sorted(
+            names,
+            key=lambda name: (-self.weights.get(name, default), self._hash(name), name),
+        ):
+            shard = loads.index(min(loads))
+            shards[name] = shard
+            loads[shard] += self.weights.get(name, default)
+        return shards
+
+    def wrap(
+        self, scan: Callable[[str], ScanResult], search_path: str
+    ) -> Callable[[str], ScanResult]:
+        """
+        Turns a directory scanning function into one only returning the files and
+        subdirectories of the shard, while a tree is traversed from ``search_path``.
+        """
+        prefix_length = len(search_path)
+        # whether files are assigned individually, decided when scanning the search
+        # path, before any of its subdirectories is scanned
+        per_file = [False]
+        self._real_search_path = os.path.realpath(search_path)
+        self._subtree_shards = None
+
+        def relative_path(path: str) -> str:
+            return path[prefix_length:].lstrip(os.sep).replace(os.sep, "/")
+
+        def sharded_scan(path: str) -> ScanResult:
+            files, subdirs = scan(path)
+            if path != search_path:
+                if per_file[0]:
+                    files = [
+                        file for file in files if self.owns(relative_path(file.path))
+                    ]
+                return files, subdirs
+
+            files = [file for file in files if self.owns(file.name)]
+            if len(subdirs) < self.num_shards:
+                per_file[0] = True
+                return files, subdirs
+            shards = self.assign([os.path.basename(subdir) for subdir in subdirs])
+            self._subtree_shards = shards
+            return (
+                files,
+                [
+                    subdir
+                    for subdir in subdirs
+                    if shards[os.path.basename(subdir)] == self.shard
+                ],
+            )
+
+        return sharded_scan
+
+    def owns_link(self, path: str) -> bool:
+        """
+        Tells whether a directory reached through a symbolic link, during a
+        traversal of a search path wrapped with :meth:`wrap`, belongs to the shard.
+        """
+        shards = self._subtree_shards
+        if shards is None:
+            # every shard traverses the whole tree
+            return True
+        relative_path = os.path.relpath(os.path.realpath(path), self._real_search_path)
+        if relative_path == os.curdir or relative_path.split(os.sep)[0] == os.pardir:
+            return True
+        shard = shards.get(relative_path.split(os.sep)[0])
+        return shard is None or shard == self.shard
@@ -0,0 +1,285 @@
+import os
+import struct
+import sys
+import time
+import weakref
+import zlib
+from array import array
+from hashlib import sha1
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from pycollect.timestamps import RACY_WINDOW_NS
+
+
+class FileState(NamedTuple):
+    """
+    The state of a file when a :class:`Snapshot` was taken.
+    """
+
+    #: The file size, in bytes.
+    size: int
+    #: The modification time, in nanoseconds, or -1 when it was too recent to be
+    #: trusted and the file is to be hashed again by the next snapshot.
+    mtime_ns: int
+    #: The SHA-1 digest of the file content.
+    digest: bytes
+
+
+class SnapshotDiff(NamedTuple):
+    """
+    The changes between two snapshots, as sets of paths.
+    """
+
+    added: Set[str]
+    removed: Set[str]
+    modified: Set[str]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+
+class Snapshot:
+    """
+    Snapshot records the size, modification time and content digest of collected
+    files, to find out which ones were added, removed or modified since a previous
+    snapshot:
+
+    .. code-block:: python
+
+        previous = Snapshot.load(".pycollect-snapshot")
+        snapshot = Snapshot.take(PythonFileCollector().collect("src"), previous)
+        changes = snapshot.diff(previous)
+        snapshot.save(".pycollect-snapshot")
+
+    Taking a snapshot from a previous one only hashes the files whose size or
+    modification time changed, in a pool of threads as hashing releases the GIL. The
+    changes found meanwhile are kept, so diffing the snapshot with the one it was
+    taken from costs time proportional to the number of changes rather than to the
+    number of files.
+
+    :param files:
+        (default: None) the state of each file, by path.
+    """
+
+    _MAGIC = b"pycollect-snapshot\0"
+    _VERSION = 1
+    _DIGEST_SIZE = sha1().digest_size
+    _CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, files: Optional[Dict[str, FileState]] = None):
+        self._files = dict(files or {})  # type: Dict[str, FileState]
+        # the snapshot this one was taken from, not kept alive, and the changes since
+        self._base = None  # type: Optional[weakref.ref]
+        self._changes = None  # type: Optional[SnapshotDiff]
+
+    def __repr__(self) -> str:
+        return "<Snapshot of {} files>".format(len(self._files))
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._files)
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._files
+
+    def __getitem__(self, path: str) -> FileState:
+        return self._files[path]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Snapshot):
+            return self._files == other._files
+        return NotImplemented
+
+    @classmethod
+    def take(
+        cls,
+        files: Iterable[Union[os.DirEntry, str, os.PathLike]],
+        previous: Optional["Snapshot"] = None,
+        workers: Optional[int] = None,
+    ) -> "Snapshot":
+        """
+        Takes a snapshot of files.
+
+        :param files:
+            The files, e.g. as returned by
+            :meth:`~pycollect.python_file_collector.PythonFileCollector.collect`.
+            Files are recorded by path, as given.
+        :param previous:
+            (default: None) a previous snapshot of the same files, whose digests are
+            reused for the files whose size and modification time did not change.
+        :param workers:
+            (default: None) number of threads hashing files. By default files are
+            hashed in the current thread.
+        :return:
+            The snapshot. Files that could not be read are left out.
+        """
+        previous_files = {} if previous is None else previous._files
+        racy_ns = int(time.time() * 1e9) - RACY_WINDOW_NS
+        states = {}  # type: Dict[str, FileState]
+        to_hash = []  # type: List[Tuple[str, int, int]]
+        for file in files:
+            path = os.fspath(file)
+            try:
+                stat = file.stat() if hasattr(file, "stat") else os.stat(path)
+            except OSError:
+                continue
+            mtime_ns = stat.st_mtime_ns if stat.st_mtime_ns <= racy_ns else -1
+            state = previous_files.get(path)
+            if (
+                state is not None
+                and state.size == stat.st_size
+                and state.mtime_ns == mtime_ns != -1
+            ):
+                states[path] = state
+            else:
+                to_hash.append((path, stat.st_size, mtime_ns))
+
+        modified = set()  # type: Set[str]
+        for (path, size, mtime_ns), digest in zip(to_hash, cls._hash(to_hash, workers)):
+            if digest is None:
+                continue
+            state = previous_files.get(path)
+            if state is not None and state.digest != digest:
+                modified.add(path)
+            states[path] = FileState(size, mtime_ns, digest)
+
+        snapshot = cls(states)
+        if previous is not None:
+            snapshot._base = weakref.ref(previous)
+            snapshot._changes = SnapshotDiff(
+                {
+                    path
+                    for path, _, _ in to_hash
+                    if path in states and path not in previous_files
+                },
+                previous_files.keys() - states.keys(),
+                modified,
+            )
+        return snapshot
+
+    @classmethod
+    def _hash(
+        cls, files: List[Tuple[str, int, int]], workers: Optional[int]
+    ) -> Iterator[Optional[bytes]]:
+        paths = [path for path, _, _ in files]
+        if workers is None or workers <= 1 or len(paths) <= 1:
+            return map(cls._digest, paths)
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return iter(list(executor.map(cls._digest, paths)))
+
+    @classmethod
+    def _digest(cls, path: str) -> Optional[bytes]:
+        digest = sha1()
+        try:
+            with open(path, "rb") as file:
+                for chunk in iter(lambda: file.read(cls._CHUNK_SIZE), b""):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        return digest.digest()
+
+    def diff(self, old: "Snapshot") -> SnapshotDiff:
+        """
+        Finds the files added, removed or modified since an older snapshot. Files
+        whose modification time changed but whose content did not are not modified.
+
+        When this snapshot was taken from ``old``, the changes found while taking it
+        are returned, otherwise every file is compared.
+        """
+        if self._base is not None and self._base() is old:
+            return SnapshotDiff(
+                set(self._changes.added),
+                set(self._changes.removed),
+                set(self._changes.modified),
+            )
+        files, old_files = self._files, old._files
+        return SnapshotDiff(
+            files.keys() - old_files.keys(),
+            old_files.keys() - files.keys(),
+            {
+                path
+                for path, state in files.items()
+                if path in old_files and old_files[path].digest != state.digest
+            },
+        )
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """
+        Saves the snapshot to a file, in a compact binary format: the paths, sorted,
+        are concatenated and the sizes, modification times and digests are stored in
+        arrays, everything being compressed.
+        """
+        paths = sorted(self._files)
+        states = [self._files[file_path] for file_path in paths]
+        sizes = array("q", (state.size for state in states))
+        mtimes = array("q", (state.mtime_ns for state in states))
+        if sys.byteorder != "little":  # pragma: no cover
+            sizes.byteswap()
+            mtimes.byteswap()
+        names = "\0".join(paths).encode("utf-8", "surrogateescape")
+        payload = b"".join(
+            [
+                struct.pack("<QQ", len(paths), len(names)),
+                names,
+                sizes.tobytes(),
+                mtimes.tobytes(),
+                b"".join(state.digest for state in states),
+            ]
+        )
+        with open(path, "wb") as file:
+            file.write(self._MAGIC + struct.pack("<B", self._VERSION))
+            file.write(zlib.compress(payload))
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike]) -> "Snapshot":
+        """
+        Loads a snapshot saved with :meth:`save`.
+
+        :raises ValueError: if the file is not a snapshot.
+        """
+        with open(path, "rb") as file:
+            data = file.read()
+        header = cls._MAGIC + struct.pack("<B", cls._VERSION)
+        if not data.startswith(header):
+            raise ValueError("{!r} is not a pycollect snapshot".format(path))
+        start = len(header)
+        try:
+            payload = zlib.decompress(data[start:])
+            count, names_size = struct.unpack_from("<QQ", payload)
+        except (zlib.error, struct.error) as error:
+            raise ValueError("{!r} is not a valid snapshot: {}".format(path, error))
+        offset = struct.calcsize("<QQ")
+        end = offset + names_size
+        names = payload[offset:end]
+        offset = end
+        sizes, mtimes = array("q"), array("q")
+        for values in (sizes, mtimes):
+            end = offset + 8 * count
+            values.frombytes(payload[offset:end])
+            if sys.byteorder != "little":  # pragma: no cover
+                values.byteswap()
+            offset = end
+        digest_size = cls._DIGEST_SIZE
+        paths = names.decode("utf-8", "surrogateescape").split("\0") if count else []
+        states = {}  # type: Dict[str, FileState]
+        for index, file_path in enumerate(paths):
+            end = offset + digest_size
+            states[file_path] = FileState(
+                sizes[index], mtimes[index], payload[offset:end]
+            )
+            offset = end
+        return cls(states)
@@ -0,0 +1,4 @@
+#: Modification times less than this many nanoseconds old are not trusted to detect
+#: later changes, as a later modification could happen within the same modification
+#: time granularity of the file system, e.g. 2 seconds on FAT file systems.
+RACY_WINDOW_NS = 2_000_000_000
@@ -0,0 +1,357 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from pycollect.collection_cache import ScanResult
+from pycollect.deduplication import InodeDeduplicator
+from pycollect.timestamps import RACY_WINDOW_NS
+
+
+class ChangeEvent(NamedTuple):
+    """
+    A change to a watched collection.
+    """
+
+    #: Either ``"added"`` or ``"removed"``.
+    kind: str
+    #: The path of the added or removed file.
+    path: str
+
+
+class _WatchedDir:
+    __slots__ = ("limit", "mtime_ns", "files", "subdirs")
+
+    def __init__(self, limit: Optional[int]):
+        self.limit = limit
+        self.mtime_ns = None  # type: Optional[int]
+        self.files = set()  # type: Set[str]
+        self.subdirs = set()  # type: Set[str]
+
+
+class _Inotify:
+    """
+    Minimal ctypes binding to the Linux inotify API.
+    """
+
+    _IN_MOVED_FROM = 0x00000040
+    _IN_MOVED_TO = 0x00000080
+    _IN_CREATE = 0x00000100
+    _IN_DELETE = 0x00000200
+    _IN_DELETE_SELF = 0x00000400
+    _IN_MOVE_SELF = 0x00000800
+    _IN_Q_OVERFLOW = 0x00004000
+    _IN_IGNORED = 0x00008000
+    _IN_ONLYDIR = 0x01000000
+    _IN_DONT_FOLLOW = 0x02000000
+    _EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, follow_symlinks: bool):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            self._raise_errno()
+        self._mask = (
+            self._IN_CREATE
+            | self._IN_DELETE
+            | self._IN_MOVED_FROM
+            | self._IN_MOVED_TO
+            | self._IN_DELETE_SELF
+            | self._IN_MOVE_SELF
+            | self._IN_ONLYDIR
+        )
+        if not follow_symlinks:
+            self._mask |= self._IN_DONT_FOLLOW
+        # the same directory reached through symbolic links shares a single watch
+        self._paths = {}  # type: Dict[int, Set[str]]
+        self._descriptors = {}  # type: Dict[str, int]
+
+    @staticmethod
+    def is_available() -> bool:
+        if not sys.platform.startswith("linux"):
+            return False
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"))
+        except OSError:
+            return False
+        return hasattr(libc, "inotify_init1")
+
+    def _raise_errno(self, path: Optional[str] = None) -> None:
+        number = ctypes.get_errno()
+        raise OSError(number, os.strerror(number), path)
+
+    def add(self, path: str) -> None:
+        descriptor = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(path), self._mask
+        )
+        if descriptor < 0:
+            self._raise_errno(path)
+        self._paths.setdefault(descriptor, set()).add(path)
+        self._descriptors[path] = descriptor
+
+    def remove(self, path: str) -> None:
+        descriptor = self._descriptors.pop(path, None)
+        if descriptor is None:
+            return
+        paths = self._paths[descriptor]
+        paths.discard(path)
+        if not paths:
+            del self._paths[descriptor]
+            self._libc.inotify_rm_watch(self._fd, descriptor)
+
+    def read(self, timeout: Optional[float]) -> Optional[Set[str]]:
+        """
+        Waits for events and returns the paths of the directories whose content
+        changed, or ``None`` if events were lost and every directory must be checked.
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        changed = set()  # type: Set[str]
+        while True:
+            try:
+                buffer = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(buffer):
+                descriptor, mask, _, length = self._EVENT_HEADER.unpack_from(
+                    buffer, offset
+                )
+                offset += self._EVENT_HEADER.size + length
+                if mask & self._IN_Q_OVERFLOW:
+                    return None
+                if mask & self._IN_IGNORED:
+                    for path in self._paths.pop(descriptor, ()):
+                        self._descriptors.pop(path, None)
+                    continue
+                changed.update(self._paths.get(descriptor, ()))
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class CollectionWatcher:
+    """
+    CollectionWatcher keeps the set of files collected by a
+    :class:`~pycollect.python_file_collector.PythonFileCollector` up to date as files
+    and directories are created, deleted and moved.
+
+    On Linux, changes are notified by inotify. Elsewhere, or when
+    ``use_inotify=False``, watched directories are polled for modification time
+    changes. The watcher also falls back to polling when a directory cannot be watched
+    by inotify, e.g. once the ``fs.inotify.max_user_watches`` limit is reached. Either
+    way, only the directories a change was detected in are scanned again, applying the
+    collector's exclusion patterns; excluded directories are never watched.
+
+    Changes are processed by calling :meth:`check` or by iterating over
+    :meth:`events`, which also updates :attr:`files` and calls the ``on_added`` and
+    ``on_removed`` callbacks.
+
+    :param scan:
+        The function scanning a single directory, as built by the collector.
+    :param search_path:
+        The directory to watch.
+    :param recursion_limit:
+        (default: None) directory recursion limit, as in
+        :meth:`~pycollect.python_file_collector.PythonFileCollector.collect`.
+    :param follow_symlinks:
+        (default: True) boolean indicating whether or not to follow symbolic links.
+    :param on_added:
+        (default: None) callback called with the path of every added file.
+    :param on_removed:
+        (default: None) callback called with the path of every removed file.
+    :param use_inotify:
+        (default: None) whether to use inotify. By default it is used when available.
+    :param poll_interval:
+        (default: 1.0) number of seconds between modification time checks when
+        polling.
+    :param deduplicator:
+        (default: None) the :class:`~pycollect.deduplication.InodeDeduplicator`
+        wrapping ``scan``, if any. It forgets the directories that stop being
+        watched, so that a directory renamed or replaced by one reusing its inode is
+        scanned under its new path.
+    """
+
+    #: Errors of inotify_add_watch after which directories are polled instead.
+    _POLLING_ERRNOS = frozenset((errno.ENOSPC, errno.ENOMEM, errno.EACCES))
+
+    def __init__(
+        self,
+        scan: Callable[[str], ScanResult],
+        search_path: str,
+        recursion_limit: Optional[int] = None,
+        follow_symlinks: bool = True,
+        on_added: Optional[Callable[[str], None]] = None,
+        on_removed: Optional[Callable[[str], None]] = None,
+        use_inotify: Optional[bool] = None,
+        poll_interval: float = 1.0,
+        deduplicator: Optional[InodeDeduplicator] = None,
+    ):
+        self.search_path = search_path
+        self.poll_interval = poll_interval
+        self.on_added = on_added
+        self.on_removed = on_removed
+        #: The paths of the currently collected files.
+        self.files = set()  # type: Set[str]
+        self._scan = scan
+        self._dirs = {}  # type: Dict[str, _WatchedDir]
+        self._deduplicator = deduplicator
+        # watched directories left empty as aliases of a directory that is gone
+        self._revisited = []  # type: List[str]
+        if use_inotify is None:
+            use_inotify = _Inotify.is_available()
+        self._inotify = _Inotify(follow_symlinks) if use_inotify else None
+        self._last_poll = time.monotonic()
+        self._add_tree(search_path, recursion_limit, [])
+
+    def __enter__(self) -> "CollectionWatcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def check(self, timeout: Optional[float] = 0) -> List[ChangeEvent]:
+        """
+        Processes the changes that happened since the last check.
+
+        :param timeout:
+            (default: 0) maximum number of seconds to wait for a change. ``None``
+            waits indefinitely.
+        :return:
+            The list of changes to the collected files.
+        """
+        changed = self._wait_for_changes(timeout)
+        if changed is None:
+            changed = set(self._dirs)
+        events = []  # type: List[ChangeEvent]
+        for path in sorted(changed):
+            if path in self._dirs:
+                self._rescan(path, events)
+        while self._revisited:
+            path = self._revisited.pop()
+            if path in self._dirs:
+                self._rescan(path, events)
+        for event in events:
+            callback = self.on_added if event.kind == "added" else self.on_removed
+            if callback is not None:
+                callback(event.path)
+        return events
+
+    def events(self) -> Iterator[ChangeEvent]:
+        """
+        Waits for changes indefinitely, yielding them as they are processed.
+        """
+        while True:
+            yield from self.check(timeout=None)
+
+    def _wait_for_changes(self, timeout: Optional[float]) -> Optional[Set[str]]:
+        if self._inotify is not None:
+            return self._inotify.read(timeout)
+        while True:
+            delay = self._last_poll + self.poll_interval - time.monotonic()
+            if timeout is not None and delay > timeout:
+                return set()
+            if delay > 0:
+                time.sleep(delay)
+            self._last_poll = time.monotonic()
+            changed = {path for path in self._dirs if self._modified(path)}
+            if changed or timeout is not None:
+                return changed
+
+    def _modified(self, path: str) -> bool:
+        try:
+            return os.stat(path).st_mtime_ns != self._dirs[path].mtime_ns
+        except OSError:
+            return True
+
+    def _add_tree(
+        self, search_path: str, limit: Optional[int], events: List[ChangeEvent]
+    ) -> None:
+        stack = [(search_path, limit)]  # type: List[Tuple[str, Optional[int]]]
+        while stack:
+            path, limit = stack.pop()
+            if path in self._dirs:
+                continue
+            self._dirs[path] = _WatchedDir(limit)
+            if self._inotify is not None:
+                try:
+                    self._inotify.add(path)
+                except (FileNotFoundError, NotADirectoryError):
+                    pass
+                except OSError as error:
+                    if error.errno not in self._POLLING_ERRNOS:
+                        raise
+                    # the modification times of every watched directory are kept,
+                    # so polling picks up from there
+                    self.close()
+            self._rescan(path, events, stack)
+
+    def _remove_tree(self, search_path: str, events: List[ChangeEvent]) -> None:
+        stack = [search_path]
+        while stack:
+            path = stack.pop()
+            watched_dir = self._dirs.pop(path, None)
+            if watched_dir is None:
+                continue
+            if self._inotify is not None:
+                self._inotify.remove(path)
+            if self._deduplicator is not None:
+                self._revisited.extend(self._deduplicator.forget(path))
+            for file in sorted(watched_dir.files):
+                self.files.discard(file)
+                events.append(ChangeEvent("removed", file))
+            stack.extend(watched_dir.subdirs)
+
+    def _rescan(
+        self,
+        path: str,
+        events: List[ChangeEvent],
+        pending: Optional[List[Tuple[str, Optional[int]]]] = None,
+    ) -> None:
+        watched_dir = self._dirs[path]
+        scanned_ns = int(time.time() * 1e9)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            entries, subdirs = self._scan(path)
+        except (FileNotFoundError, NotADirectoryError):
+            mtime_ns, entries, subdirs = None, [], []
+        # a modification within the file system timestamp granularity could go
+        # unnoticed, so recently modified directories are checked again next time
+        if mtime_ns is not None and mtime_ns > scanned_ns - RACY_WINDOW_NS:
+            mtime_ns = None
+        watched_dir.mtime_ns = mtime_ns
+
+        files = {entry.path for entry in entries}
+        for file in sorted(files - watched_dir.files):
+            self.files.add(file)
+            events.append(ChangeEvent("added", file))
+        for file in sorted(watched_dir.files - files):
+            self.files.discard(file)
+            events.append(ChangeEvent("removed", file))
+        watched_dir.files = files
+
+        limit = watched_dir.limit
+        if limit is not None and limit <= 0:
+            return
+        sublimit = None if limit is None else limit - 1
+        subdirs_set = set(subdirs)
+        for subdir in sorted(watched_dir.subdirs - subdirs_set):
+            self._remove_tree(subdir, events)
+        new_subdirs = subdirs_set - watched_dir.subdirs
+        watched_dir.subdirs = subdirs_set
+        if pending is not None:
+            pending.extend((subdir, sublimit) for subdir in sorted(new_subdirs))
+        else:
+            for subdir in sorted(new_subdirs):
+                self._add_tree(subdir, sublimit, events)
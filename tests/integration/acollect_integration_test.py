@@ -0,0 +1,87 @@
+import asyncio
+import os
+import re
+from pathlib import Path
+
+import pytest
+
+from pycollect.python_file_collector import PythonFileCollector
+
+
+@pytest.fixture
+def search_path() -> str:
+    return os.path.join(
+        re.sub(
+            "{0}\\{1}(?:.(?!{0}\\{1}))+$".format("integration", os.sep), "", __file__
+        ),
+        "resources",
+        "example_module",
+    )
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+@pytest.mark.parametrize("recursion_limit", [None, 0, 1])
+def test_acollect_yields_the_same_files_as_collect(
+    concurrency: int, recursion_limit: int, search_path: str
+):
+    """
+    This test intents to ensure that `acollect` yields exactly the files `collect`
+    returns
+    """
+    # given
+    python_file_collector = PythonFileCollector()
+    expected_filepaths = {
+        file.path
+        for file in python_file_collector.collect(
+            search_path=search_path, recursion_limit=recursion_limit
+        )
+    }
+
+    async def acollect():
+        return [
+            file.path
+            async for file in python_file_collector.acollect(
+                search_path=search_path,
+                recursion_limit=recursion_limit,
+                concurrency=concurrency,
+            )
+        ]
+
+    # when
+    collected_filepaths = run(acollect())
+
+    # then
+    assert len(collected_filepaths) == len(expected_filepaths)
+    assert set(collected_filepaths) == expected_filepaths
+
+
+def test_acollect_can_be_closed_early(tmp_path: Path):
+    """
+    This test intents to ensure that an asynchronous collection can be stopped after
+    the first file, cancelling pending directory scans
+    """
+    # given
+    for i in range(20):
+        (tmp_path / "pkg{}".format(i)).mkdir()
+        (tmp_path / "pkg{}".format(i) / "module.py").touch()
+
+    async def first_file():
+        iterator = PythonFileCollector().acollect(str(tmp_path), concurrency=2)
+        try:
+            return await iterator.__anext__()
+        finally:
+            await iterator.aclose()
+
+    # when
+    file = run(first_file())
+
+    # then
+    assert file.name == "module.py"
@@ -0,0 +1,151 @@
+import os
+import sys
+import tarfile
+import zipfile
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockFixture
+
+from pycollect import (
+    ArchiveEntry,
+    ModuleNameResolver,
+    PythonFileCollector,
+    find_module_name,
+)
+
+MEMBERS = {
+    "pkg/__init__.py": b"",
+    "pkg/core.py": b"print('core')\n",
+    "pkg/__pycache__/core.cpython-38.pyc": b"\0",
+    "pkg/__pycache__/stale.py": b"",
+    "pkg/sub/deep.py": b"",
+    "pkg/README.md": b"",
+    "tests/test_core.py": b"",
+    "setup.py": b"",
+}
+
+
+@pytest.fixture
+def wheel(tmp_path: Path) -> Path:
+    path = tmp_path / "pkg-1.0-py3-none-any.whl"
+    with zipfile.ZipFile(str(path), "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("pkg/", b"")
+        for member, content in MEMBERS.items():
+            archive.writestr(member, content)
+    return path
+
+
+@pytest.fixture
+def sdist(tmp_path: Path) -> Path:
+    path = tmp_path / "pkg-1.0.tar.gz"
+    with tarfile.open(str(path), "w:gz") as archive:
+        for member, content in MEMBERS.items():
+            info = tarfile.TarInfo(member)
+            info.size = len(content)
+            archive.addfile(info, BytesIO(content))
+    return path
+
+
+def members(files):
+    return {file.member for file in files}
+
+
+@pytest.mark.parametrize("archive", ["wheel", "sdist"])
+def test_archive_members_are_collected_with_exclusion_patterns(archive: str, request):
+    """
+    This test intents to ensure that the files of an archive are collected as the
+    files of a directory would, file and directory exclusion patterns applying to the
+    archive members
+    """
+    # given
+    path = request.getfixturevalue(archive)
+    collector = PythonFileCollector(additional_dir_exclusion_patterns=["tests"])
+
+    # when
+    files = collector.collect_archive(str(path))
+
+    # then
+    assert members(files) == {
+        "pkg/__init__.py",
+        "pkg/core.py",
+        "pkg/sub/deep.py",
+        "setup.py",
+    }
+    core = next(file for file in files if file.member == "pkg/core.py")
+    assert core.name == "core.py"
+    assert core.path == os.path.join(str(path), "pkg", "core.py")
+    assert core.size == len(MEMBERS["pkg/core.py"])
+    assert core.read() == MEMBERS["pkg/core.py"]
+
+
+def test_path_exclusion_patterns_and_recursion_limit_apply_to_member_paths(
+    wheel: Path,
+):
+    """
+    This test intents to ensure that path exclusion patterns are matched against
+    member paths and that the recursion limit counts the directories of members, the
+    archive root being level 0
+    """
+    # given
+    collector = PythonFileCollector(path_exclusion_patterns=["/pkg/sub/"])
+
+    # when
+    excluded = collector.collect_archive(wheel)
+    limited = PythonFileCollector().collect_archive(wheel, recursion_limit=1)
+
+    # then
+    assert members(excluded) == {
+        "pkg/__init__.py",
+        "pkg/core.py",
+        "tests/test_core.py",
+        "setup.py",
+    }
+    assert members(limited) == {
+        "pkg/__init__.py",
+        "pkg/core.py",
+        "tests/test_core.py",
+        "setup.py",
+    }
+
+
+def test_member_contents_are_not_read(wheel: Path, mocker: MockFixture):
+    """
+    This test intents to ensure that collecting a zip archive only reads its central
+    directory, no member being opened, and that no file is written
+    """
+    # given
+    open_member = mocker.spy(zipfile.ZipFile, "open")
+    before = set(os.listdir(str(wheel.parent)))
+
+    # when
+    files = PythonFileCollector().collect_archive(wheel)
+
+    # then
+    assert files
+    open_member.assert_not_called()
+    assert set(os.listdir(str(wheel.parent))) == before
+
+
+def test_archive_entries_are_named_as_zipimport_would(wheel: Path, mocker: MockFixture):
+    """
+    This test intents to ensure that archive entries are named relative to the
+    archive root, or to the innermost sys.path entry within the archive, and that
+    zipimport-style paths are named relative to the archive when it is in sys.path
+    """
+    # given
+    mocker.patch.object(sys, "path", [str(wheel), str(wheel / "pkg")])
+    deep = ArchiveEntry(str(wheel), "pkg/sub/deep.py")
+
+    # when
+    outermost = find_module_name(deep)
+    innermost = find_module_name(deep, innermost=True)
+    resolved = ModuleNameResolver().find_module_names([deep], innermost=True)
+    zipimport_path = find_module_name(str(wheel / "pkg" / "core.py"))
+
+    # then
+    assert outermost == "pkg.sub.deep"
+    assert innermost == "sub.deep"
+    assert resolved == ["sub.deep"]
+    assert zipimport_path == "pkg.core"
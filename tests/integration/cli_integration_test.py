@@ -0,0 +1,109 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from pycollect import cli
+
+
+@pytest.fixture
+def tree(tmp_path: Path, monkeypatch) -> Path:
+    for path in ["main.py", "pkg/__init__.py", "pkg/core.py", "data/dump.py"]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).touch()
+    monkeypatch.syspath_prepend(str(tmp_path))
+    return tmp_path
+
+
+def test_paths_are_written_nul_separated(tree: Path, capsysbinary):
+    """
+    This test intents to ensure that the command line interface writes the collected
+    paths separated by NUL characters with `-0`, applying exclusion options
+    """
+    # when
+    exit_code = cli.main(["-0", "--exclude-dir", "data", str(tree)])
+
+    # then
+    output = capsysbinary.readouterr().out
+    assert exit_code == 0
+    assert output.endswith(b"\0")
+    assert sorted(output[:-1].split(b"\0")) == sorted(
+        os.fsencode(str(tree / path))
+        for path in ["main.py", "pkg/__init__.py", "pkg/core.py"]
+    )
+
+
+def test_module_names_are_written_as_json_lines(tree: Path, capsysbinary):
+    """
+    This test intents to ensure that the command line interface writes a JSON object
+    per collected file, along with its module name when requested
+    """
+    # when
+    exit_code = cli.main(["--json", "--module-names", "--packages-only", str(tree)])
+
+    # then
+    records = [json.loads(line) for line in capsysbinary.readouterr().out.splitlines()]
+    assert exit_code == 0
+    assert sorted(record["module"] for record in records) == [
+        "main",
+        "pkg.__init__",
+        "pkg.core",
+    ]
+
+
+def test_errors_are_reported(tmp_path: Path, capsys):
+    """
+    This test intents to ensure that the command line interface reports search paths
+    that can not be collected and exits with a non zero code
+    """
+    # when
+    exit_code = cli.main([str(tmp_path / "missing")])
+
+    # then
+    assert exit_code == 1
+    assert "No such file or directory" in capsys.readouterr().err
+
+
+def test_only_the_modules_needed_are_imported(tree: Path):
+    """
+    This test intents to ensure that running the command line interface does not
+    import the modules only some features need
+    """
+    # given
+    script = (
+        "import sys\n"
+        "from pycollect import cli\n"
+        "cli.main([sys.argv[1]])\n"
+        "print(sorted(set(sys.modules).intersection(sys.argv[2:])), file=sys.stderr)\n"
+    )
+    heavy_modules = [
+        "asyncio",
+        "inspect",
+        "concurrent.futures",
+        "sqlite3",
+        "json",
+        "hashlib",
+        "mmap",
+        "pathlib",
+        "pycollect.archive_collection",
+        "pycollect.collection_cache",
+        "pycollect.compact_collection",
+        "pycollect.content_filter",
+        "pycollect.module_finder",
+        "pycollect.sharding",
+    ]
+
+    # when
+    process = subprocess.run(
+        [sys.executable, "-c", script, str(tree)] + heavy_modules,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+
+    # then
+    assert len(process.stdout.splitlines()) == 4
+    assert process.stderr.decode().strip() == "[]"
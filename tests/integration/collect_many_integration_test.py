@@ -0,0 +1,107 @@
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from pycollect import PythonFileCollector
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    for package in ("src/pkg/sub", "src/other", "build/lib/pkg", "tools"):
+        (tmp_path / package).mkdir(parents=True)
+        (tmp_path / package / "__init__.py").touch()
+        (tmp_path / package / "module.py").touch()
+    (tmp_path / "src" / "setup.py").touch()
+    return tmp_path
+
+
+@pytest.mark.parametrize("processes", [None, 2])
+@pytest.mark.parametrize("recursion_limit", [None, 1])
+@pytest.mark.parametrize(
+    "roots",
+    [
+        ["src", "src/pkg", "src/pkg/sub", "tools"],
+        ["src/pkg", "src", "src/../src"],
+        ["build/lib", "build/lib/pkg", "."],
+    ],
+)
+def test_collect_many_merges_the_collections_of_every_root(
+    tree: Path, roots: List[str], recursion_limit: int, processes: int
+):
+    """
+    This test intents to ensure that collecting from several search paths returns
+    each file collected from any of them exactly once
+    """
+    # given
+    python_file_collector = PythonFileCollector()
+    search_paths = [str(tree / root) for root in roots]
+    expected_filepaths = set()
+    for search_path in search_paths:
+        expected_filepaths.update(
+            Path(file.path).resolve()
+            for file in python_file_collector.collect(
+                search_path, recursion_limit=recursion_limit
+            )
+        )
+
+    # when
+    collected_files = python_file_collector.collect_many(
+        search_paths, recursion_limit=recursion_limit, processes=processes
+    )
+
+    # then
+    collected_filepaths = [Path(file.path) for file in collected_files]
+    assert len(collected_filepaths) == len(set(collected_filepaths))
+    assert {path.resolve() for path in collected_filepaths} == expected_filepaths
+
+
+def test_nested_roots_covered_by_an_outer_root_are_dropped(tree: Path):
+    """
+    This test intents to ensure that nested search paths are only dropped when the
+    traversal of an outer search path reaches them
+    """
+    # given
+    python_file_collector = PythonFileCollector()
+    search_paths = [tree / "src" / "pkg", tree, tree / "build" / "lib", tree / "src"]
+
+    # when
+    roots = python_file_collector._outermost_roots(search_paths, None, True)
+
+    # then
+    assert roots == [str(tree), str(tree / "build" / "lib")]
+
+
+@pytest.mark.parametrize("recursion_limit", [None, 2])
+def test_processes_do_not_change_the_directories_deduplicated(
+    tree: Path, recursion_limit: int
+):
+    """
+    This test intents to ensure that directories reached through symbolic links from
+    the subtrees of several worker processes are deduplicated as when collecting in
+    the current process
+    """
+    # given
+    try:
+        (tree / "src" / "link_to_tools").symlink_to(tree / "tools")
+        (tree / "tools" / "link_to_pkg").symlink_to(tree / "src" / "pkg")
+        (tree / "link_to_build").symlink_to(tree / "build")
+    except (OSError, NotImplementedError):
+        pytest.skip("symbolic links are not supported")
+    python_file_collector = PythonFileCollector()
+
+    # when
+    collected = {
+        processes: {
+            file.path
+            for file in python_file_collector.collect_many(
+                [str(tree)], recursion_limit=recursion_limit, processes=processes
+            )
+        }
+        for processes in (None, 2)
+    }
+
+    # then
+    assert collected[2] == collected[None]
+    assert str(tree / "tools" / "module.py") in collected[None]
+    assert str(tree / "src" / "link_to_tools" / "module.py") not in collected[None]
@@ -0,0 +1,130 @@
+import os
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockFixture
+
+from pycollect import ModuleNameResolver, PythonFileCollector
+
+FILES = [
+    "top.py",
+    "pkg/__init__.py",
+    "pkg/core.py",
+    "pkg/sub/__init__.py",
+    "pkg/sub/leaf.py",
+    "data/loader.py",
+    "data/raw/dump.py",
+    "src/lib.py",
+    "src/inner/__init__.py",
+    "src/inner/mod.py",
+]
+
+
+@pytest.fixture
+def tree(tmp_path: Path, monkeypatch) -> Path:
+    for path in FILES:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).touch()
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.syspath_prepend(str(tmp_path / "src"))
+    return tmp_path
+
+
+@pytest.mark.parametrize("innermost", [False, True])
+@pytest.mark.parametrize("workers", [None, 4])
+def test_module_names_are_the_ones_find_module_name_finds(
+    tree: Path, innermost: bool, workers: int
+):
+    """
+    This test intents to ensure that `collect_modules` names every collected file as
+    `find_module_name` does
+    """
+    # given
+    collector = PythonFileCollector()
+    resolver = ModuleNameResolver()
+
+    # when
+    named = dict(
+        collector.collect_modules(
+            search_path=str(tree), innermost=innermost, workers=workers
+        )
+    )
+
+    # then
+    assert {entry.path for entry in named} == {str(tree / path) for path in FILES}
+    for entry, module_name in named.items():
+        assert module_name == resolver.find_module_name(entry.path, innermost)
+    assert {module_name for module_name in named.values()} >= {
+        "top",
+        "pkg.sub.leaf",
+        "data.raw.dump",
+        "inner.mod" if innermost else "src.inner.mod",
+    }
+
+
+def test_files_outside_of_sys_path_have_no_module_name(tmp_path: Path):
+    """
+    This test intents to ensure that files which can not be attributed a module name
+    are collected along with None
+    """
+    # given
+    (tmp_path / "script.py").touch()
+
+    # when
+    named = list(PythonFileCollector().collect_modules(search_path=str(tmp_path)))
+
+    # then
+    assert [(entry.name, module_name) for entry, module_name in named] == [
+        ("script.py", None)
+    ]
+
+
+def test_non_package_directories_are_skipped_with_packages_only(tree: Path):
+    """
+    This test intents to ensure that with `packages_only=True` the directories which
+    are neither packages nor sys.path entries are skipped along with their subtree
+    """
+    # given
+    collector = PythonFileCollector()
+
+    # when
+    module_names = {
+        module_name
+        for _, module_name in collector.collect_modules(
+            search_path=str(tree), packages_only=True
+        )
+    }
+
+    # then
+    assert module_names == {
+        "top",
+        "pkg.__init__",
+        "pkg.core",
+        "pkg.sub.__init__",
+        "pkg.sub.leaf",
+        "src.lib",
+        "src.inner.__init__",
+        "src.inner.mod",
+    }
+
+
+def test_non_package_directories_are_not_scanned_with_packages_only(
+    tree: Path, mocker: MockFixture
+):
+    """
+    This test intents to ensure that with `packages_only=True` the directories which
+    are neither packages nor sys.path entries are not listed at all
+    """
+    # given
+    collector = PythonFileCollector()
+    scandir = mocker.spy(os, "scandir")
+
+    # when
+    list(collector.collect_modules(search_path=str(tree), packages_only=True))
+
+    # then
+    scanned = sorted(
+        Path(os.path.relpath(call.args[0], str(tree))).as_posix()
+        for call in scandir.mock_calls
+    )
+    assert scanned == [".", "pkg", "pkg/sub", "src", "src/inner"]
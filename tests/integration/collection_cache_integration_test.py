@@ -0,0 +1,162 @@
+import os
+from pathlib import Path
+from typing import Set
+
+import pytest
+from pytest_mock import MockFixture
+
+from pycollect import CollectionCache
+from pycollect import PythonFileCollector
+
+PAST = 1_500_000_000
+
+
+def set_past_mtimes(root: Path):
+    for path in [root, *root.rglob("*")]:
+        os.utime(str(path), (PAST, PAST))
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    root = tmp_path / "tree"
+    for package in ("foo", "bar", os.path.join("bar", "baz"), "__pycache__"):
+        (root / package).mkdir(parents=True)
+        (root / package / "__init__.py").touch()
+        (root / package / "notes.txt").touch()
+    (root / "main.py").touch()
+    set_past_mtimes(root)
+    return root
+
+
+def paths(files) -> Set[str]:
+    return {file.path for file in files}
+
+
+def test_warm_collection_does_not_scan_unmodified_directories(
+    tree: Path, tmp_path: Path, mocker: MockFixture
+):
+    """
+    This test intents to ensure that a cached collection returns the same files as a
+    regular collection and that unmodified directories are not scanned again
+    """
+    # given
+    collector = PythonFileCollector()
+    expected_filepaths = paths(collector.collect(str(tree)))
+    with CollectionCache(tmp_path / "cache.db") as cache:
+        cold_filepaths = paths(collector.collect(str(tree), cache=cache))
+        scandir = mocker.spy(os, "scandir")
+
+        # when
+        warm_filepaths = paths(collector.collect(str(tree), cache=cache))
+
+    # then
+    assert cold_filepaths == expected_filepaths
+    assert warm_filepaths == expected_filepaths
+    assert scandir.call_count == 0
+
+
+def test_modified_directories_are_scanned_again(tree: Path, tmp_path: Path):
+    """
+    This test intents to ensure that changes to the tree are reflected by cached
+    collections
+    """
+    # given
+    collector = PythonFileCollector()
+    with CollectionCache(tmp_path / "cache.db") as cache:
+        collector.collect(str(tree), cache=cache)
+        (tree / "bar" / "baz" / "new.py").touch()
+        (tree / "foo" / "__init__.py").unlink()
+        os.utime(str(tree / "bar" / "baz"), (PAST + 1, PAST + 1))
+        os.utime(str(tree / "foo"), (PAST + 1, PAST + 1))
+
+        # when
+        cached_filepaths = paths(collector.collect(str(tree), cache=cache))
+
+    # then
+    assert cached_filepaths == paths(collector.collect(str(tree)))
+    assert str(tree / "bar" / "baz" / "new.py") in cached_filepaths
+
+
+def test_cache_is_kept_apart_per_configuration(tree: Path, tmp_path: Path):
+    """
+    This test intents to ensure that results cached for a collector configuration are
+    never reused by a collector with a different configuration
+    """
+    # given
+    with CollectionCache(tmp_path / "cache.db") as cache:
+        PythonFileCollector().collect(str(tree), cache=cache)
+        collector = PythonFileCollector(additional_dir_exclusion_patterns=["bar"])
+
+        # when
+        cached_filepaths = paths(collector.collect(str(tree), cache=cache))
+
+    # then
+    assert cached_filepaths == paths(collector.collect(str(tree)))
+
+
+def test_invalid_cache_file_is_recreated(tree: Path, tmp_path: Path):
+    """
+    This test intents to ensure that a file that is not a valid cache database is
+    replaced instead of causing collections to fail
+    """
+    # given
+    cache_path = tmp_path / "cache.db"
+    cache_path.write_bytes(b"definitely not a database" * 100)
+
+    # when
+    with CollectionCache(cache_path) as cache:
+        cached_filepaths = paths(PythonFileCollector().collect(str(tree), cache=cache))
+
+    # then
+    assert cached_filepaths == paths(PythonFileCollector().collect(str(tree)))
+
+
+def test_shards_sharing_a_cache_keep_each_other_records(
+    tree: Path, tmp_path: Path, mocker: MockFixture
+):
+    """
+    This test intents to ensure that collecting a shard with a cache shared by
+    several shards does not remove the records of the subtrees of the other shards
+    """
+    # given
+    collector = PythonFileCollector()
+    expected_filepaths = paths(collector.collect(str(tree)))
+    with CollectionCache(tmp_path / "cache.db") as cache:
+        for shard in range(2):
+            collector.collect(str(tree), cache=cache, shard=shard, num_shards=2)
+        scandir = mocker.spy(os, "scandir")
+
+        # when
+        warm_filepaths = [
+            paths(collector.collect(str(tree), cache=cache, shard=shard, num_shards=2))
+            for shard in range(2)
+        ]
+
+    # then
+    assert set().union(*warm_filepaths) == expected_filepaths
+    assert all(warm_filepaths)
+    assert scandir.call_count == 0
+
+
+def test_warm_collection_stats_each_directory_once(
+    tree: Path, tmp_path: Path, mocker: MockFixture
+):
+    """
+    This test intents to ensure that a cached collection deduplicating directories
+    gets the status of each directory once, the cache and the deduplication sharing
+    it
+    """
+    # given
+    collector = PythonFileCollector()
+    with CollectionCache(tmp_path / "cache.db") as cache:
+        collector.collect(str(tree), cache=cache)
+        stat = mocker.spy(os, "stat")
+
+        # when
+        collector.collect(str(tree), cache=cache, unique_dirs=True)
+
+    # then
+    stated = sorted(
+        os.path.relpath(call.args[0], str(tree)) for call in stat.mock_calls
+    )
+    assert stated == sorted([".", "foo", "bar", os.path.join("bar", "baz")])
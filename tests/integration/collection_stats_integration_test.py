@@ -0,0 +1,151 @@
+import os
+import pickle
+from pathlib import Path
+
+import pytest
+
+from pycollect import CollectionStats, PythonFileCollector
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    (tmp_path / "pkg" / "__pycache__").mkdir(parents=True)
+    (tmp_path / "pkg" / "__pycache__" / "module.cpython-38.pyc").touch()
+    (tmp_path / "pkg" / "module.py").touch()
+    (tmp_path / "pkg" / "module.pyc").touch()
+    (tmp_path / "pkg" / ".module.py").touch()
+    (tmp_path / "venv").mkdir()
+    (tmp_path / "venv" / "site.py").touch()
+    (tmp_path / "setup.py").touch()
+    return tmp_path
+
+
+@pytest.mark.parametrize("workers", [None, 4])
+@pytest.mark.parametrize("use_regex_patterns", [False, True])
+def test_stats_account_for_every_scanned_entry(
+    tree: Path, workers: int, use_regex_patterns: bool
+):
+    """
+    This test intents to ensure that the collection statistics account for every
+    scanned entry, excluded ones included, without changing the collected files
+    """
+    # given
+    python_file_collector = PythonFileCollector(use_regex_patterns=use_regex_patterns)
+    stats = CollectionStats()
+
+    # when
+    collected_files = python_file_collector.collect(
+        search_path=str(tree), workers=workers, stats=stats
+    )
+
+    # then
+    assert {file.path for file in collected_files} == {
+        file.path for file in python_file_collector.collect(search_path=str(tree))
+    }
+    assert stats.dirs_visited == 2
+    assert stats.entries_scanned == 7
+    assert stats.files_collected == len(collected_files) == 2
+    assert sorted(stats.excluded_files) == [
+        str(tree / "pkg" / ".module.py"),
+        str(tree / "pkg" / "module.pyc"),
+    ]
+    assert sorted(stats.excluded_dirs) == [
+        str(tree / "pkg" / "__pycache__"),
+        str(tree / "venv"),
+    ]
+    assert sum(stats.file_pattern_hits.values()) == 2
+    assert sum(stats.dir_pattern_hits.values()) == 2
+    assert set(stats.dir_times) == {str(tree), str(tree / "pkg")}
+
+
+def test_pattern_hits_count_every_matching_pattern(tree: Path):
+    """
+    This test intents to ensure that an excluded entry is accounted for by each
+    pattern matching it
+    """
+    # given
+    python_file_collector = PythonFileCollector()
+    stats = CollectionStats()
+
+    # when
+    python_file_collector.collect(search_path=str(tree), stats=stats)
+
+    # then
+    assert stats.file_pattern_hits == {"!*.py": 1, ".*": 1}
+    assert stats.dir_pattern_hits == {"__pycache__": 1, "venv*": 1}
+
+
+def test_hooks_are_called_for_each_directory_and_entry(tree: Path):
+    """
+    This test intents to ensure that the directory and entry hooks are called for
+    every scanned directory and entry
+    """
+    # given
+    python_file_collector = PythonFileCollector()
+    directories = []
+    entries = {}
+    stats = CollectionStats(
+        on_directory=lambda path, seconds: directories.append(path),
+        on_entry=lambda entry, included: entries.setdefault(entry.name, included),
+    )
+
+    # when
+    list(python_file_collector.iter_collect(search_path=str(tree), stats=stats))
+
+    # then
+    assert sorted(directories) == [str(tree), str(tree / "pkg")]
+    assert entries == {
+        "pkg": True,
+        "venv": False,
+        "setup.py": True,
+        "__pycache__": False,
+        "module.py": True,
+        "module.pyc": False,
+        ".module.py": False,
+    }
+
+
+def test_slowest_subtrees_include_the_time_of_their_subdirectories(tree: Path):
+    """
+    This test intents to ensure that a subtree's time is the sum of the times spent
+    in each of its scanned directories
+    """
+    # given
+    stats = CollectionStats()
+    PythonFileCollector().collect(search_path=str(tree), stats=stats)
+
+    # when
+    slowest_subtrees = stats.slowest_subtrees()
+
+    # then
+    assert slowest_subtrees[0] == (str(tree), pytest.approx(stats.total_time))
+    assert (
+        dict(slowest_subtrees)[str(tree / "pkg")]
+        == stats.dir_times[os.path.join(str(tree), "pkg")]
+    )
+
+
+@pytest.mark.parametrize("use_regex_patterns", [False, True])
+def test_collector_stays_picklable_after_a_stats_collection(
+    tree: Path, use_regex_patterns: bool
+):
+    """
+    This test intents to ensure that the per pattern tests built for the statistics
+    do not prevent the collector from being sent to worker processes
+    """
+    # given
+    python_file_collector = PythonFileCollector(use_regex_patterns=use_regex_patterns)
+    python_file_collector.collect(search_path=str(tree), stats=CollectionStats())
+
+    # when
+    copy = pickle.loads(pickle.dumps(python_file_collector))
+    collected_files = python_file_collector.collect_many([str(tree)], processes=2)
+
+    # then
+    assert copy.file_matcher.matching_patterns("module.pyc") == (
+        python_file_collector.file_matcher.matching_patterns("module.pyc")
+    )
+    assert {file.path for file in collected_files} == {
+        str(tree / "pkg" / "module.py"),
+        str(tree / "setup.py"),
+    }
@@ -0,0 +1,94 @@
+import re
+from pathlib import Path
+
+import pytest
+
+from pycollect import ContentFilter, PythonFileCollector
+
+MAIN_GUARD = b'if __name__ == "__main__":\n    main()\n'
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "empty.py").write_bytes(b"")
+    (tmp_path / "script.py").write_bytes(b"import sys\n\n" + MAIN_GUARD)
+    (tmp_path / "pkg" / "module.py").write_bytes(b"def main():\n    pass\n")
+    (tmp_path / "pkg" / "plugin.py").write_bytes(
+        b"@register\nclass Plugin:\n    pass\n"
+    )
+    padding = b"#" * (ContentFilter.MMAP_THRESHOLD * 2) + b"\n"
+    (tmp_path / "pkg" / "large_script.py").write_bytes(padding + MAIN_GUARD)
+    (tmp_path / "pkg" / "large_module.py").write_bytes(padding)
+    return tmp_path
+
+
+def collected_names(tree: Path, **kwargs):
+    return sorted(
+        file.name
+        for file in PythonFileCollector().collect(search_path=str(tree), **kwargs)
+    )
+
+
+@pytest.mark.parametrize("workers", [None, 4])
+@pytest.mark.parametrize(
+    "contains", [b"__main__", re.compile(rb"^if __name__ == .__main__.:", re.M)]
+)
+def test_only_files_with_matching_content_are_collected(
+    tree: Path, contains, workers: int
+):
+    """
+    This test intents to ensure that only files whose content contains the given
+    bytes or matches the given regular expression are collected, however large
+    """
+    # when
+    names = collected_names(tree, contains=contains, workers=workers)
+
+    # then
+    assert names == ["large_script.py", "script.py"]
+
+
+def test_files_larger_than_the_size_cap_are_left_out(tree: Path):
+    """
+    This test intents to ensure that files larger than `max_size` are not collected
+    """
+    # when
+    names = collected_names(tree, contains=ContentFilter(b"__main__", max_size=1024))
+
+    # then
+    assert names == ["script.py"]
+
+
+def test_head_only_filters_search_the_beginning_of_files(tree: Path):
+    """
+    This test intents to ensure that only the first `head` bytes of files are
+    searched in head-only mode
+    """
+    # when
+    names = collected_names(tree, contains=ContentFilter(b"__main__", head=1024))
+
+    # then
+    assert names == ["script.py"]
+
+
+def test_empty_patterns_match_every_file(tree: Path):
+    """
+    This test intents to ensure that an empty byte string matches every file, empty
+    ones included
+    """
+    # when
+    names = collected_names(tree, contains=b"")
+
+    # then
+    assert names == collected_names(tree)
+
+
+def test_text_patterns_are_rejected():
+    """
+    This test intents to ensure that text patterns, which would require decoding
+    file contents, are rejected
+    """
+    with pytest.raises(TypeError):
+        ContentFilter("__main__")
+    with pytest.raises(TypeError):
+        ContentFilter(re.compile("__main__"))
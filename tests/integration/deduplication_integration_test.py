@@ -0,0 +1,110 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from pycollect import PythonFileCollector
+from pycollect.deduplication import SymlinkLoopWarning
+
+
+def symlink(target: Path, link: Path):
+    try:
+        os.symlink(str(target), str(link), target_is_directory=target.is_dir())
+    except (OSError, NotImplementedError):
+        pytest.skip("symbolic links are not supported")
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    (tmp_path / "pkg" / "sub").mkdir(parents=True)
+    (tmp_path / "pkg" / "module.py").touch()
+    (tmp_path / "pkg" / "sub" / "deep.py").touch()
+    symlink(tmp_path / "pkg", tmp_path / "pkg" / "sub" / "loop")
+    symlink(tmp_path / "pkg", tmp_path / "alias")
+    symlink(tmp_path / "pkg" / "module.py", tmp_path / "module_link.py")
+    return tmp_path
+
+
+@pytest.mark.parametrize("workers", [None, 4])
+def test_each_physical_directory_is_scanned_once(tree: Path, workers: int):
+    """
+    This test intents to ensure that, when following symbolic links, directories
+    reachable through several paths are scanned only once and that symbolic link
+    loops are reported rather than followed
+    """
+    # given
+    python_file_collector = PythonFileCollector()
+
+    # when
+    with pytest.warns(SymlinkLoopWarning):
+        collected_files = python_file_collector.collect(
+            search_path=str(tree), workers=workers
+        )
+
+    # then
+    collected_names = sorted(file.name for file in collected_files)
+    assert collected_names == ["deep.py", "module.py", "module_link.py"]
+
+
+def test_directories_can_be_scanned_again_on_demand(tree: Path):
+    """
+    This test intents to ensure that the previous behavior of scanning directories
+    once per path leading to them is still available
+    """
+    # when
+    collected_files = PythonFileCollector().collect(
+        search_path=str(tree), recursion_limit=4, unique_dirs=False
+    )
+
+    # then
+    collected_paths = {file.path for file in collected_files}
+    assert str(tree / "alias" / "module.py") in collected_paths
+    assert str(tree / "pkg" / "sub" / "loop" / "sub" / "deep.py") in collected_paths
+
+
+def test_each_physical_file_is_collected_once_on_demand(tree: Path):
+    """
+    This test intents to ensure that files reachable through several paths are
+    collected only once when `unique_files=True`
+    """
+    # when
+    with pytest.warns(SymlinkLoopWarning):
+        collected_files = PythonFileCollector().collect(
+            search_path=str(tree), unique_files=True
+        )
+
+    # then
+    assert sorted(file.name for file in collected_files) in (
+        ["deep.py", "module.py"],
+        ["deep.py", "module_link.py"],
+    )
+
+
+@pytest.mark.parametrize("workers", [None, 4])
+def test_real_paths_are_kept_over_symbolic_links(tmp_path: Path, workers: int):
+    """
+    This test intents to ensure that, among the paths leading to a directory, its
+    real path rather than a symbolic link is the one collected, whatever the order
+    directories are scanned in
+    """
+    # given
+    for name in ["a", "c/b", "z/y"]:
+        (tmp_path / name).mkdir(parents=True)
+        (tmp_path / name / "module.py").touch()
+    symlink(tmp_path / "z", tmp_path / "a" / "link_z")
+    symlink(tmp_path / "c" / "b", tmp_path / "a" / "link_b")
+    symlink(tmp_path / "a", tmp_path / "z" / "y" / "link_a")
+    symlink(tmp_path / "c", tmp_path / "link_c")
+    expected = {str(tmp_path / name / "module.py") for name in ["a", "c/b", "z/y"]}
+
+    # when
+    collected_files = PythonFileCollector().collect(
+        search_path=str(tmp_path), workers=workers
+    )
+    collected_modules = PythonFileCollector().collect_modules(
+        search_path=str(tmp_path), workers=workers
+    )
+
+    # then
+    assert {file.path for file in collected_files} == expected
+    assert {file.path for file, _ in collected_modules} == expected
@@ -0,0 +1,109 @@
+import os
+import warnings
+from pathlib import Path
+
+import pytest
+
+from pycollect import PythonFileCollector
+from pycollect.dir_fd_scanner import DirFdScanner
+from pycollect.file_entry import FileEntry
+
+pytestmark = pytest.mark.skipif(
+    not DirFdScanner.is_available(),
+    reason="directories can not be scanned through file descriptors",
+)
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    for path in [
+        "top.py",
+        "pkg/__init__.py",
+        "pkg/module.py",
+        "pkg/data.txt",
+        "pkg/__pycache__/module.cpython.py",
+        "pkg/sub/deep/deeper/leaf.py",
+        "docs/conf.py",
+    ]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).touch()
+    try:
+        os.symlink(str(tmp_path / "pkg"), str(tmp_path / "alias"))
+        os.symlink(str(tmp_path / "top.py"), str(tmp_path / "docs" / "link.py"))
+    except (OSError, NotImplementedError):
+        pass
+    return tmp_path
+
+
+def open_fds() -> int:
+    return len(os.listdir("/proc/self/fd")) if os.path.isdir("/proc/self/fd") else 0
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {},
+        {"follow_symlinks": False},
+        {"recursion_limit": 1},
+        {"unique_dirs": False},
+        {"workers": 4},
+    ],
+)
+def test_results_match_the_default_backend(tree: Path, params: dict):
+    """
+    This test intents to ensure that scanning directories through file descriptors
+    collects exactly the files the default backend collects
+    """
+    # given
+    collector = PythonFileCollector(path_exclusion_patterns=["/docs/conf.py"])
+    fds_before = open_fds()
+
+    # when
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        expected = collector.collect(search_path=str(tree), **params)
+        collected = collector.collect(search_path=str(tree), use_dir_fds=True, **params)
+
+    # then
+    assert {file.path for file in collected} == {file.path for file in expected}
+    assert all(isinstance(file, FileEntry) for file in collected)
+    assert open_fds() == fds_before
+
+
+def test_directory_file_descriptors_are_closed_when_the_iteration_stops(tree: Path):
+    """
+    This test intents to ensure that the file descriptors kept open to scan
+    subdirectories are closed when an iteration is abandoned
+    """
+    # given
+    collector = PythonFileCollector()
+    fds_before = open_fds()
+
+    # when
+    files = collector.iter_collect(search_path=str(tree), use_dir_fds=True)
+    next(files)
+    files.close()
+
+    # then
+    assert open_fds() == fds_before
+
+
+def test_open_directories_are_bounded(tree: Path, monkeypatch):
+    """
+    This test intents to ensure that at most `MAX_OPEN_DIRS` directory file
+    descriptors are kept open, others being opened by path again
+    """
+    # given
+    monkeypatch.setattr(DirFdScanner, "MAX_OPEN_DIRS", 1)
+    scanner = DirFdScanner(True, lambda name: False, lambda name: False)
+
+    # when
+    _, subdirs = scanner.scan(str(tree))
+    for subdir in subdirs:
+        scanner.scan(subdir)
+    open_dirs = len(scanner._open_dirs)
+    scanner.close()
+
+    # then
+    assert open_dirs == 1
+    assert len(scanner._open_dirs) == 0
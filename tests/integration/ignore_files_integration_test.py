@@ -0,0 +1,124 @@
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from pycollect import CollectionStats, PythonFileCollector
+
+
+def make_tree(root: Path, files: Dict[str, str]):
+    for path, content in files.items():
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(content)
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    make_tree(
+        tmp_path,
+        {
+            ".gitignore": "# generated code\n*.gen.py\n!keep.gen.py\noutput/\n",
+            ".ignore": "scratch_*.py\n",
+            "setup.py": "",
+            "scratch_1.py": "",
+            "models.gen.py": "",
+            "keep.gen.py": "",
+            "output/module.py": "",
+            "pkg/.gitignore": "!*.gen.py\n/local.py\n",
+            "pkg/api.gen.py": "",
+            "pkg/local.py": "",
+            "pkg/sub/local.py": "",
+            "pkg/sub/output.py": "",
+        },
+    )
+    return tmp_path
+
+
+def collected_paths(python_file_collector: PythonFileCollector, root: Path, **kwargs):
+    return sorted(
+        Path(file.path).relative_to(root).as_posix()
+        for file in python_file_collector.collect(search_path=str(root), **kwargs)
+    )
+
+
+@pytest.mark.parametrize("workers", [None, 4])
+def test_ignore_file_rules_stack_per_directory(tree: Path, workers: int):
+    """
+    This test intents to ensure that the rules of ignore files apply relative to
+    their directory, deeper ignore files overriding the ones of their ancestors
+    """
+    # given
+    python_file_collector = PythonFileCollector(use_ignore_files=True)
+
+    # when
+    paths = collected_paths(python_file_collector, tree, workers=workers)
+
+    # then
+    assert paths == [
+        "keep.gen.py",
+        "pkg/api.gen.py",
+        "pkg/sub/local.py",
+        "pkg/sub/output.py",
+        "setup.py",
+    ]
+
+
+def test_ignore_files_are_not_read_by_default(tree: Path):
+    """
+    This test intents to ensure that ignore files are only honored when asked to
+    """
+    # given
+    python_file_collector = PythonFileCollector()
+
+    # when
+    paths = collected_paths(python_file_collector, tree)
+
+    # then
+    assert "output/module.py" in paths
+    assert "scratch_1.py" in paths
+
+
+def test_ignored_directories_are_not_scanned(tree: Path):
+    """
+    This test intents to ensure that ignored directories are pruned from the
+    traversal
+    """
+    # given
+    python_file_collector = PythonFileCollector(use_ignore_files=True)
+    stats = CollectionStats()
+
+    # when
+    python_file_collector.collect(search_path=str(tree), stats=stats)
+
+    # then
+    assert str(tree / "output") not in stats.dir_times
+
+
+def test_ignore_files_of_the_repository_apply_to_nested_search_paths(tmp_path: Path):
+    """
+    This test intents to ensure that, when collecting a directory within a git
+    repository, the ignore files of its parent directories up to the repository
+    root apply as well
+    """
+    # given
+    make_tree(
+        tmp_path,
+        {
+            ".git/info/exclude": "secret.py\n",
+            ".gitignore": "data/\n/src/app/generated/\n",
+            "src/.gitignore": "*_old.py\n",
+            "src/app/main.py": "",
+            "src/app/main_old.py": "",
+            "src/app/secret.py": "",
+            "src/app/data/dump.py": "",
+            "src/app/generated/models.py": "",
+            "src/app/views/generated/models.py": "",
+        },
+    )
+    python_file_collector = PythonFileCollector(use_ignore_files=True)
+
+    # when
+    paths = collected_paths(python_file_collector, tmp_path / "src" / "app")
+
+    # then
+    assert paths == ["main.py", "views/generated/models.py"]
@@ -0,0 +1,199 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockFixture
+
+from pycollect import ImportIndex, PythonFileCollector, import_index
+
+SOURCES = {
+    "app.py": "import pkg.sub.leaf\n",
+    "broken.py": "def broken(:\n",
+    "pkg/__init__.py": "from . import core\n",
+    "pkg/core.py": "import os\nfrom .util import helper\n\nclass Core:\n    pass\n\n"
+    "VALUE = 1\n",
+    "pkg/util.py": "def helper():\n    import json\n",
+    "pkg/sub/__init__.py": "",
+    "pkg/sub/leaf.py": "from .. import core\nfrom ..util import helper\n",
+}
+
+
+@pytest.fixture
+def tree(tmp_path: Path, monkeypatch) -> Path:
+    past = time.time() - 60
+    for path, source in SOURCES.items():
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(source)
+        os.utime(str(tmp_path / path), (past, past))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    return tmp_path
+
+
+def collect(tree: Path):
+    return PythonFileCollector().collect(search_path=str(tree))
+
+
+@pytest.mark.parametrize("processes", [None, 2])
+def test_imports_are_indexed_with_relative_imports_resolved(tree: Path, processes: int):
+    """
+    This test intents to ensure that the imports of every collected module are
+    indexed, relative imports being resolved against the module names
+    """
+    # given
+    index = ImportIndex(processes=processes)
+
+    # when
+    changed = index.update(collect(tree))
+
+    # then
+    assert changed == set(index.modules())
+    assert index.modules() == [
+        "app",
+        "broken",
+        "pkg",
+        "pkg.core",
+        "pkg.sub",
+        "pkg.sub.leaf",
+        "pkg.util",
+    ]
+    assert index.imports_of("pkg") == {"pkg.core"}
+    assert index.imports_of("pkg.core") == {"os", "pkg.util"}
+    assert index.imports_of("pkg.util") == {"json"}
+    assert index.imports_of("pkg.sub.leaf") == {"pkg", "pkg.core", "pkg.util"}
+    assert index.module("pkg.core").definitions == ("Core", "VALUE")
+    assert index.module("pkg").is_package
+    assert index.module("broken").error is not None
+
+
+def test_relative_imports_beyond_the_top_level_package_are_ignored(tree: Path):
+    """
+    This test intents to ensure that relative imports going up more levels than
+    there are packages, which fail when imported, are not resolved to top level
+    modules
+    """
+    # given
+    (tree / "pkg" / "beyond.py").write_text(
+        "from .. import app\nfrom ..app import name\nfrom ... import core\n"
+    )
+    (tree / "pkg" / "sub" / "top.py").write_text("from ... import app\n")
+    index = ImportIndex()
+
+    # when
+    index.update(collect(tree))
+
+    # then
+    assert index.imports_of("pkg.beyond") == set()
+    assert index.imports_of("pkg.sub.top") == set()
+
+
+def test_reverse_dependencies_are_queried(tree: Path):
+    """
+    This test intents to ensure that both direct and transitive reverse dependencies
+    are found
+    """
+    # given
+    index = ImportIndex()
+    index.update(collect(tree))
+
+    # when
+    importers = index.importers_of("pkg.util")
+    affected = index.affected_by(["pkg.util"])
+
+    # then
+    assert importers == {"pkg.core", "pkg.sub.leaf"}
+    assert affected == {"app", "pkg", "pkg.core", "pkg.sub.leaf", "pkg.util"}
+
+
+def test_only_changed_files_are_parsed_again(tree: Path, mocker: MockFixture):
+    """
+    This test intents to ensure that updating the index only parses again the files
+    whose content changed
+    """
+    # given
+    index = ImportIndex()
+    index.update(collect(tree))
+    parse_file = mocker.spy(import_index, "parse_file")
+    future = time.time() + 60
+
+    # when
+    unchanged = index.update(collect(tree))
+    os.utime(str(tree / "pkg" / "core.py"), (future, future))
+    touched = index.update(collect(tree))
+    (tree / "pkg" / "util.py").write_text("import re\n")
+    modified = index.update(collect(tree))
+    (tree / "app.py").unlink()
+    removed = index.update(collect(tree))
+
+    # then
+    assert unchanged == touched == set()
+    assert modified == {"pkg.util"}
+    assert removed == {"app"}
+    assert parse_file.call_count == 1
+    assert index.imports_of("pkg.util") == {"re"}
+    assert "app" not in index
+
+
+def test_parsing_results_are_persisted(
+    tree: Path, tmp_path_factory, mocker: MockFixture
+):
+    """
+    This test intents to ensure that parsing results saved in a database are reused
+    by later indexes
+    """
+    # given
+    database = tmp_path_factory.mktemp("index") / "index.sqlite"
+    with ImportIndex(database) as index:
+        index.update(collect(tree))
+    parse_file = mocker.spy(import_index, "parse_file")
+
+    # when
+    with ImportIndex(database) as index:
+        changed = index.update(collect(tree))
+
+        # then
+        assert changed == set()
+        assert parse_file.call_count == 0
+        assert index.importers_of("pkg.core") == {"pkg", "pkg.sub.leaf"}
+
+
+@pytest.mark.parametrize("processes", [None, 2])
+def test_symbols_are_discovered_without_importing(tree: Path, processes: int):
+    """
+    This test intents to ensure that the modules defining a name, deriving from a
+    base class or using a decorator are found by name, without being imported
+    """
+    # given
+    (tree / "pkg" / "plugins.py").write_text(
+        "from pkg.core import Core\nimport pkg\n\n"
+        "class First(Core):\n    pass\n\n"
+        "class Second(pkg.core.Core, Generic[T]):\n    pass\n\n"
+        "class Other(other.Core):\n    pass\n\n"
+        "@registry.register('name')\ndef hook():\n    pass\n\n"
+        "@register\nclass Registered:\n    pass\n"
+    )
+    index = ImportIndex(processes=processes)
+
+    # when
+    index.update(collect(tree))
+
+    # then
+    assert "pkg.plugins" not in sys.modules
+    assert index.definers_of("Core") == {"pkg.core"}
+    assert index.definers_of("missing") == set()
+    assert index.subclasses_of("Core") == [
+        ("pkg.plugins", "First"),
+        ("pkg.plugins", "Other"),
+        ("pkg.plugins", "Second"),
+    ]
+    assert index.subclasses_of("pkg.core.Core") == [
+        ("pkg.plugins", "First"),
+        ("pkg.plugins", "Second"),
+    ]
+    assert index.subclasses_of("Generic") == [("pkg.plugins", "Second")]
+    assert index.decorated_by("register") == [
+        ("pkg.plugins", "Registered"),
+        ("pkg.plugins", "hook"),
+    ]
+    assert index.decorated_by("other.register") == [("pkg.plugins", "Registered")]
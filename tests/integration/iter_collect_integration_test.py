@@ -0,0 +1,92 @@
+import os
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+from pycollect.python_file_collector import PythonFileCollector
+
+
+@pytest.fixture
+def search_path() -> str:
+    return os.path.join(
+        re.sub(
+            "{0}\\{1}(?:.(?!{0}\\{1}))+$".format("integration", os.sep), "", __file__
+        ),
+        "resources",
+        "example_module",
+    )
+
+
+@pytest.mark.parametrize("enable_regex_patterns", [False, True])
+@pytest.mark.parametrize("recursion_limit", [None, 0, 1, 2])
+def test_iter_collect_yields_the_same_files_as_collect(
+    enable_regex_patterns: bool, recursion_limit: int, search_path: str
+):
+    """
+    This test intents to ensure that `iter_collect` yields exactly the files that
+    `collect` returns, each of them only once
+    """
+    # given
+    python_file_collector = PythonFileCollector(
+        use_regex_patterns=enable_regex_patterns
+    )
+    expected_filepaths = {
+        file.path
+        for file in python_file_collector.collect(
+            search_path=search_path, recursion_limit=recursion_limit
+        )
+    }
+
+    # when
+    iterated_filepaths = [
+        file.path
+        for file in python_file_collector.iter_collect(
+            search_path=search_path, recursion_limit=recursion_limit
+        )
+    ]
+
+    # then
+    assert len(iterated_filepaths) == len(expected_filepaths)
+    assert set(iterated_filepaths) == expected_filepaths
+
+
+def test_iter_collect_can_be_abandoned_early(search_path: str):
+    """
+    This test intents to ensure that `iter_collect` streams files lazily, allowing
+    the caller to stop the traversal after the first file
+    """
+    # given
+    iterator = PythonFileCollector().iter_collect(search_path=search_path)
+
+    # when
+    first_file = next(iterator)
+    iterator.close()
+
+    # then
+    assert first_file.name.endswith(".py")
+
+
+def test_iter_collect_handles_trees_deeper_than_the_recursion_limit(tmp_path: Path):
+    """
+    This test intents to ensure that the traversal does not rely on recursion and
+    therefore can handle trees deeper than Python's recursion limit
+    """
+    # given
+    depth = 300
+    deepest_dir = tmp_path.joinpath(*["d"] * depth)
+    deepest_dir.mkdir(parents=True)
+    expected_file = deepest_dir / "deep.py"
+    expected_file.touch()
+    recursion_limit = sys.getrecursionlimit()
+
+    # when
+    sys.setrecursionlimit(depth - 50)
+    try:
+        collected_files = list(PythonFileCollector().iter_collect(str(tmp_path)))
+    finally:
+        sys.setrecursionlimit(recursion_limit)
+
+    # then
+    assert [file.path for file in collected_files] == [str(expected_file)]
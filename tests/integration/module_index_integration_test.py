@@ -0,0 +1,159 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockFixture
+
+from pycollect import ModuleIndex, PythonFileCollector
+
+
+@pytest.fixture
+def tree(tmp_path: Path, mocker: MockFixture) -> Path:
+    for path in [
+        "src/app.py",
+        "src/pkg/__init__.py",
+        "src/pkg/core.py",
+        "src/pkg/sub/__init__.py",
+        "src/pkg/sub/deep.py",
+        "src/ns/plugins/one.py",
+        "plugins/ns/plugins/two.py",
+    ]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("")
+    mocker.patch.object(sys, "path", [str(tmp_path / "src"), str(tmp_path / "plugins")])
+    return tmp_path
+
+
+def collect(tree: Path):
+    return PythonFileCollector().collect(search_path=str(tree))
+
+
+def test_module_files_are_found_by_name(tree: Path):
+    """
+    This test intents to ensure that modules and regular packages are found by name,
+    packages being found from their __init__.py files, and that prefix queries list
+    the modules below a package
+    """
+    # given
+    index = ModuleIndex()
+
+    # when
+    index.update(collect(tree))
+
+    # then
+    assert index.find_module_file("pkg.sub.deep") == str(
+        tree / "src" / "pkg" / "sub" / "deep.py"
+    )
+    assert index.find_module_file("pkg") == str(tree / "src" / "pkg" / "__init__.py")
+    assert index.find_module_file("pkg.missing") is None
+    assert index.module_name(tree / "src" / "pkg" / "sub" / "__init__.py") == "pkg.sub"
+    assert index.submodules("pkg") == ["pkg.core", "pkg.sub", "pkg.sub.deep"]
+    assert index.submodules("pkg", recursive=False) == ["pkg.core", "pkg.sub"]
+    assert index.submodules("pkg.core") == []
+
+
+def test_namespace_packages_span_their_portions(tree: Path):
+    """
+    This test intents to ensure that directories holding modules without an
+    __init__.py file are reported as namespace packages, whose portions are found in
+    every sys.path entry
+    """
+    # given
+    index = ModuleIndex()
+
+    # when
+    index.update(collect(tree))
+
+    # then
+    assert index.find_module_file("ns.plugins") is None
+    assert index.is_namespace_package("ns.plugins")
+    assert index.is_package("ns") and not index.is_package("pkg.core")
+    assert not index.is_namespace_package("pkg")
+    assert index.submodules("ns", recursive=False) == ["ns.plugins"]
+    assert index.submodules("ns.plugins") == ["ns.plugins.one", "ns.plugins.two"]
+    assert index.package_paths("ns.plugins") == [
+        str(tree / "src" / "ns" / "plugins"),
+        str(tree / "plugins" / "ns" / "plugins"),
+    ]
+    assert index.package_paths("pkg.sub") == [str(tree / "src" / "pkg" / "sub")]
+    assert index.package_paths("app") == []
+
+
+def test_shadowed_modules_are_found_in_sys_path_order(
+    tmp_path: Path, mocker: MockFixture
+):
+    """
+    This test intents to ensure that among files of the same module name, the one of
+    the first sys.path entry is found, as on import, packages taking precedence over
+    modules, and that changing sys.path changes the file found
+    """
+    # given
+    for path in ["z/shadowed.py", "a/shadowed.py", "a/both.py", "a/both/__init__.py"]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("")
+    mocker.patch.object(sys, "path", [str(tmp_path / "z"), str(tmp_path / "a")])
+    index = ModuleIndex()
+
+    # when
+    index.update(collect(tmp_path))
+    shadowed = index.find_module_file("shadowed")
+    both = index.find_module_file("both")
+    origin = importlib.util.find_spec("shadowed").origin
+    sys.path.reverse()
+    index.update(collect(tmp_path))
+
+    # then
+    assert shadowed == str(tmp_path / "z" / "shadowed.py")
+    assert shadowed == origin
+    assert both == str(tmp_path / "a" / "both" / "__init__.py")
+    assert index.find_module_file("shadowed") == str(tmp_path / "a" / "shadowed.py")
+
+
+def test_updates_only_name_new_files(tree: Path, mocker: MockFixture):
+    """
+    This test intents to ensure that updating the index only names the new files and
+    reports the modules added or removed, and that files can be added and removed one
+    by one
+    """
+    # given
+    index = ModuleIndex()
+    index.update(collect(tree))
+    (tree / "src" / "pkg" / "core.py").unlink()
+    (tree / "src" / "pkg" / "new.py").write_text("")
+    find_module_names = mocker.spy(index._resolver, "find_module_names")
+
+    # when
+    changed = index.update(collect(tree))
+    index.add(tree / "src" / "pkg" / "sub" / "extra.py")
+    index.remove(tree / "src" / "app.py")
+
+    # then
+    assert changed == {"pkg.core", "pkg.new"}
+    find_module_names.assert_called_once_with(
+        [str(tree / "src" / "pkg" / "new.py")], False
+    )
+    assert index.submodules("pkg.sub") == ["pkg.sub.deep", "pkg.sub.extra"]
+    assert "app" not in index
+
+
+def test_index_is_saved_and_loaded(tree: Path):
+    """
+    This test intents to ensure that a saved index is loaded with the same modules,
+    and that loading a file which is not an index raises a ValueError
+    """
+    # given
+    index = ModuleIndex()
+    index.update(collect(tree))
+    (tree / "not-an-index").write_bytes(b"garbage")
+
+    # when
+    index.save(tree / "modules.index")
+    loaded = ModuleIndex.load(tree / "modules.index")
+
+    # then
+    assert loaded.modules() == index.modules()
+    assert loaded.find_module_file("pkg") == index.find_module_file("pkg")
+    assert loaded.update(collect(tree)) == set()
+    with pytest.raises(ValueError):
+        ModuleIndex.load(tree / "not-an-index")
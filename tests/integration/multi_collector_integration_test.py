@@ -0,0 +1,141 @@
+import os
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockFixture
+
+from pycollect import MultiCollector, PythonFileCollector
+
+FILES = [
+    "setup.py",
+    "src/pkg/__init__.py",
+    "src/pkg/core.py",
+    "src/pkg/generated/schema.py",
+    "tests/test_core.py",
+    "tests/conftest.py",
+    "tests/fixtures/data.py",
+    "docs/conf.py",
+]
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    for path in FILES:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).touch()
+    (tmp_path / ".gitignore").write_text("generated/\n")
+    return tmp_path
+
+
+@pytest.fixture
+def profiles():
+    return {
+        "all": PythonFileCollector(),
+        "sources": PythonFileCollector(
+            additional_dir_exclusion_patterns=["tests", "docs"]
+        ),
+        "tests": PythonFileCollector(
+            path_exclusion_patterns=["*.py", "!/tests/test_*.py", "/src/", "/docs/"]
+        ),
+        "ignoring": PythonFileCollector(use_ignore_files=True),
+        "no_docs": PythonFileCollector(additional_dir_exclusion_patterns=["docs"]),
+    }
+
+
+@pytest.mark.parametrize("workers", [None, 4])
+def test_each_profile_collects_what_its_collector_collects(
+    tree: Path, profiles: dict, workers: int
+):
+    """
+    This test intents to ensure that the files collected for each profile are the
+    ones its own collector collects
+    """
+    # given
+    multi_collector = MultiCollector(profiles)
+
+    # when
+    collected = multi_collector.collect(search_path=str(tree), workers=workers)
+
+    # then
+    assert set(collected) == set(profiles)
+    for name, collector in profiles.items():
+        expected = collector.collect(search_path=str(tree))
+        assert {file.path for file in collected[name]} == {
+            file.path for file in expected
+        }, name
+    assert {os.path.relpath(file.path, str(tree)) for file in collected["tests"]} == {
+        os.path.join("tests", "test_core.py")
+    }
+
+
+def test_directories_are_only_pruned_when_every_profile_excludes_them(
+    tree: Path, mocker: MockFixture
+):
+    """
+    This test intents to ensure that the tree is traversed once, a directory being
+    scanned only if at least one profile does not exclude it
+    """
+    # given
+    multi_collector = MultiCollector()
+    multi_collector.add(
+        "sources", PythonFileCollector(additional_dir_exclusion_patterns=["tests"])
+    )
+    multi_collector.add(
+        "no_fixtures",
+        PythonFileCollector(additional_dir_exclusion_patterns=["fixtures", "docs"]),
+    )
+    scandir = mocker.spy(os, "scandir")
+
+    # when
+    files = list(multi_collector.iter_collect(search_path=str(tree)))
+
+    # then
+    scanned = sorted(
+        Path(os.path.relpath(call.args[0], str(tree))).as_posix()
+        for call in scandir.mock_calls
+    )
+    assert scanned == sorted(
+        [".", "docs", "src", "src/pkg", "src/pkg/generated", "tests"]
+    )
+    names = {
+        Path(os.path.relpath(file.path, str(tree))).as_posix(): names
+        for file, names in files
+    }
+    assert names["setup.py"] == ("sources", "no_fixtures")
+    assert names["docs/conf.py"] == ("sources",)
+    assert names["tests/conftest.py"] == ("no_fixtures",)
+    assert "tests/fixtures/data.py" not in names
+
+
+@pytest.mark.parametrize("workers", [None, 4])
+def test_each_profile_deduplicates_directories_on_its_own(tmp_path: Path, workers: int):
+    """
+    This test intents to ensure that a directory reached through several paths is
+    collected for each profile through the path its own collector collects it
+    through, even when another profile excludes that path
+    """
+    # given
+    (tmp_path / "real").mkdir()
+    (tmp_path / "real" / "module.py").touch()
+    try:
+        os.symlink(str(tmp_path / "real"), str(tmp_path / "link"))
+    except (OSError, NotImplementedError):
+        pytest.skip("symbolic links are not supported")
+    profiles = {
+        "all": PythonFileCollector(),
+        "no_real": PythonFileCollector(additional_dir_exclusion_patterns=["real"]),
+        "no_link": PythonFileCollector(additional_dir_exclusion_patterns=["link"]),
+    }
+
+    # when
+    collected = MultiCollector(profiles).collect(str(tmp_path), workers=workers)
+
+    # then
+    for name, collector in profiles.items():
+        expected = collector.collect(search_path=str(tmp_path))
+        assert {file.path for file in collected[name]} == {
+            file.path for file in expected
+        }, name
+    assert {file.path for file in collected["no_real"]} == {
+        str(tmp_path / "link" / "module.py")
+    }
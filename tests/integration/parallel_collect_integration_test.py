@@ -0,0 +1,99 @@
+import os
+import re
+from pathlib import Path
+
+import pytest
+
+from pycollect.python_file_collector import PythonFileCollector
+
+
+@pytest.fixture
+def search_path() -> str:
+    return os.path.join(
+        re.sub(
+            "{0}\\{1}(?:.(?!{0}\\{1}))+$".format("integration", os.sep), "", __file__
+        ),
+        "resources",
+        "example_module",
+    )
+
+
+@pytest.fixture
+def wide_tree(tmp_path: Path) -> str:
+    for i in range(20):
+        package = tmp_path / "pkg{}".format(i) / "sub"
+        package.mkdir(parents=True)
+        (package.parent / "__init__.py").touch()
+        (package / "module{}.py".format(i)).touch()
+        (package / "data{}.txt".format(i)).touch()
+    (tmp_path / "pkg0" / "__pycache__").mkdir()
+    (tmp_path / "pkg0" / "__pycache__" / "cached.py").touch()
+    return str(tmp_path)
+
+
+@pytest.mark.parametrize("workers", [2, 8])
+@pytest.mark.parametrize("recursion_limit", [None, 0, 1])
+@pytest.mark.parametrize("follow_symlinks", [True, False])
+def test_parallel_collect_returns_the_same_files_as_sequential_collect(
+    workers: int,
+    recursion_limit: int,
+    follow_symlinks: bool,
+    search_path: str,
+    wide_tree: str,
+):
+    """
+    This test intents to ensure that collecting with a thread pool yields exactly the
+    same files as the sequential traversal
+    """
+    # given
+    python_file_collector = PythonFileCollector()
+
+    for path in (search_path, wide_tree):
+        expected_filepaths = {
+            file.path
+            for file in python_file_collector.collect(
+                search_path=path,
+                recursion_limit=recursion_limit,
+                follow_symlinks=follow_symlinks,
+            )
+        }
+
+        # when
+        collected_files = list(
+            python_file_collector.iter_collect(
+                search_path=path,
+                recursion_limit=recursion_limit,
+                follow_symlinks=follow_symlinks,
+                workers=workers,
+            )
+        )
+
+        # then
+        collected_filepaths = [file.path for file in collected_files]
+        assert len(collected_filepaths) == len(expected_filepaths)
+        assert set(collected_filepaths) == expected_filepaths
+        assert expected_filepaths == {
+            file.path
+            for file in python_file_collector.collect(
+                search_path=path,
+                recursion_limit=recursion_limit,
+                follow_symlinks=follow_symlinks,
+                workers=workers,
+            )
+        }
+
+
+def test_parallel_iter_collect_can_be_abandoned_early(wide_tree: str):
+    """
+    This test intents to ensure that a parallel collection can be stopped after the
+    first file without waiting for the whole tree to be scanned
+    """
+    # given
+    iterator = PythonFileCollector().iter_collect(search_path=wide_tree, workers=4)
+
+    # when
+    first_file = next(iterator)
+    iterator.close()
+
+    # then
+    assert first_file.name.endswith(".py")
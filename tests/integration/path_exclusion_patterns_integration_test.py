@@ -0,0 +1,101 @@
+from pathlib import Path
+
+import pytest
+
+from pycollect import CollectionStats, PythonFileCollector
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    for directory in ("pkg/sub", "tests/fixtures/data", "tests/unit", "docs"):
+        (tmp_path / directory).mkdir(parents=True)
+    for file in (
+        "setup.py",
+        "pkg/__init__.py",
+        "pkg/setup.py",
+        "pkg/sub/module_1.py",
+        "pkg/sub/module_2.py",
+        "tests/conftest.py",
+        "tests/fixtures/fixture.py",
+        "tests/fixtures/data/generated.py",
+        "tests/unit/module_test.py",
+        "docs/conf.py",
+    ):
+        (tmp_path / file).touch()
+    return tmp_path
+
+
+@pytest.mark.parametrize("workers", [None, 4])
+def test_path_exclusion_patterns_are_relative_to_the_search_path(
+    tree: Path, workers: int
+):
+    """
+    This test intents to ensure that path exclusion patterns are matched against
+    paths relative to the search path
+    """
+    # given
+    python_file_collector = PythonFileCollector(
+        path_exclusion_patterns=["/setup.py", "tests/fixtures/**", "module_[2-9].py"]
+    )
+
+    # when
+    collected_files = python_file_collector.collect(
+        search_path=str(tree), workers=workers
+    )
+
+    # then
+    collected_paths = sorted(
+        Path(file.path).relative_to(tree).as_posix() for file in collected_files
+    )
+    assert collected_paths == [
+        "docs/conf.py",
+        "pkg/__init__.py",
+        "pkg/setup.py",
+        "pkg/sub/module_1.py",
+        "tests/conftest.py",
+        "tests/unit/module_test.py",
+    ]
+
+
+def test_excluded_subtrees_are_not_scanned(tree: Path):
+    """
+    This test intents to ensure that directories excluded by path exclusion patterns
+    are pruned from the traversal rather than filtered out afterwards
+    """
+    # given
+    python_file_collector = PythonFileCollector(
+        path_exclusion_patterns=["tests/fixtures/**", "docs/"]
+    )
+    stats = CollectionStats()
+
+    # when
+    python_file_collector.collect(search_path=str(tree), stats=stats)
+
+    # then
+    assert sorted(
+        Path(path).relative_to(tree).as_posix() for path in stats.dir_times
+    ) == [".", "pkg", "pkg/sub", "tests", "tests/unit"]
+
+
+def test_negated_path_patterns_include_files_again(tree: Path):
+    """
+    This test intents to ensure that a negated path pattern includes again files
+    excluded by previous patterns, as long as their directory is not excluded
+    """
+    # given
+    python_file_collector = PythonFileCollector(
+        path_exclusion_patterns=[
+            "tests/**",
+            "!tests/fixtures/",
+            "!tests/fixtures/*.py",
+        ]
+    )
+
+    # when
+    collected_files = python_file_collector.collect(search_path=str(tree / "."))
+
+    # then
+    collected_names = {file.name for file in collected_files}
+    assert "fixture.py" in collected_names
+    assert "conftest.py" not in collected_names
+    assert "generated.py" not in collected_names
@@ -142,3 +142,26 @@ def test_example_module_with_additional_dir_exclusion_patterns(
     assert collected_files
     collected_filepaths = {file.path for file in collected_files}
     assert collected_filepaths == expected_findings
+
+
+@pytest.mark.parametrize("enable_regex_patterns", [False, True])
+def test_example_module_compact_collection(
+    enable_regex_patterns: bool, search_path: str
+):
+    # given
+    python_file_collector = PythonFileCollector(
+        use_regex_patterns=enable_regex_patterns
+    )
+    expected_findings = {
+        file.path for file in python_file_collector.collect(search_path=search_path)
+    }
+
+    # when
+    collected_files = python_file_collector.collect(
+        search_path=search_path, compact=True
+    )
+
+    # then
+    assert set(collected_files) == expected_findings
+    assert len(collected_files) == len(expected_findings)
+    assert all(filepath in collected_files for filepath in expected_findings)
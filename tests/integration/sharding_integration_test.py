@@ -0,0 +1,133 @@
+import os
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockFixture
+
+from pycollect import PythonFileCollector
+from pycollect.sharding import ShardFilter
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    for top in ["api", "core", "db", "ui", "utils", "web"]:
+        for index in range(3):
+            path = tmp_path / top / "sub" / "module_{}.py".format(index)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.touch()
+    for name in ["conftest.py", "setup.py", "main.py"]:
+        (tmp_path / name).touch()
+    return tmp_path
+
+
+def paths(files):
+    return {file.path for file in files}
+
+
+@pytest.mark.parametrize("num_shards", [1, 3, 4, 10])
+def test_shards_partition_the_unsharded_collection(tree: Path, num_shards: int):
+    """
+    This test intents to ensure that shards do not overlap and that together they
+    collect exactly the files of an unsharded collection, whether top level subtrees
+    or individual files are assigned to shards
+    """
+    # given
+    collector = PythonFileCollector()
+    expected = paths(collector.collect(str(tree), workers=4))
+
+    # when
+    shards = [
+        paths(collector.collect(str(tree), shard=shard, num_shards=num_shards))
+        for shard in range(num_shards)
+    ]
+
+    # then
+    assert sum(len(files) for files in shards) == len(expected)
+    assert set().union(*shards) == expected
+
+
+@pytest.mark.parametrize("num_shards", [2, 3])
+def test_directories_reached_through_symbolic_links_are_collected_once(
+    tree: Path, tmp_path_factory, num_shards: int
+):
+    """
+    This test intents to ensure that a directory reached through a symbolic link
+    from the subtree of another shard is collected by a single shard, through the
+    same path as an unsharded collection
+    """
+    # given
+    outside = tmp_path_factory.mktemp("outside")
+    (outside / "module.py").touch()
+    try:
+        os.symlink(str(tree / "api"), str(tree / "core" / "link_to_api"))
+        os.symlink(str(tree / "db" / "sub"), str(tree / "link_to_db"))
+        os.symlink(str(outside), str(tree / "web" / "link_outside"))
+    except (OSError, NotImplementedError):
+        pytest.skip("symbolic links are not supported")
+    collector = PythonFileCollector()
+    expected = paths(collector.collect(str(tree)))
+
+    # when
+    shards = [
+        paths(collector.collect(str(tree), shard=shard, num_shards=num_shards))
+        for shard in range(num_shards)
+    ]
+
+    # then
+    assert sum(len(files) for files in shards) == len(expected)
+    assert set().union(*shards) == expected
+
+
+def test_only_the_subtrees_of_the_shard_are_traversed(tree: Path, mocker: MockFixture):
+    """
+    This test intents to ensure that each shard only scans the top level subtrees
+    assigned to it, and that the assignment does not depend on where the tree is
+    """
+    # given
+    collector = PythonFileCollector()
+    scan_dir = mocker.spy(PythonFileCollector, "_scan_dir")
+
+    # when
+    files = collector.collect(str(tree), shard=1, num_shards=3)
+    moved = collector.collect(
+        str(tree.rename(tree.with_name("moved"))), shard=1, num_shards=3
+    )
+
+    # then
+    scanned = {call.args[0] for call in scan_dir.mock_calls}
+    tops = {
+        Path(path).relative_to(tree).parts[0]
+        for path in scanned
+        if path.startswith(os.path.join(str(tree), ""))
+    }
+    assert len(tops) == 2
+    assert {Path(path).relative_to(tree) for path in paths(files)} == {
+        Path(path).relative_to(tree.with_name("moved")) for path in paths(moved)
+    }
+
+
+def test_weights_balance_the_shards():
+    """
+    This test intents to ensure that weighted subtrees are assigned heaviest first to
+    the least loaded shard, subtrees without a weight weighing the mean of the given
+    ones
+    """
+    # given
+    shard_filter = ShardFilter(0, 2, {"big": 10, "medium": 6, "small": 4})
+
+    # when
+    shards = shard_filter.assign(["small", "medium", "big", "unknown"])
+
+    # then
+    assert shards["big"] == shards["small"]
+    assert shards["medium"] == shards["unknown"] != shards["big"]
+
+
+@pytest.mark.parametrize("shard, num_shards", [(2, 2), (-1, 2), (0, 0)])
+def test_invalid_shards_are_rejected(tree: Path, shard: int, num_shards: int):
+    """
+    This test intents to ensure that a shard index outside of the number of shards is
+    rejected
+    """
+    with pytest.raises(ValueError):
+        PythonFileCollector().collect(str(tree), shard=shard, num_shards=num_shards)
@@ -0,0 +1,102 @@
+import os
+import time
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockFixture
+
+from pycollect import PythonFileCollector, Snapshot
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    past = time.time() - 60
+    for path in ["main.py", "pkg/__init__.py", "pkg/core.py", "pkg/util.py"]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("# {}\n".format(path))
+        os.utime(str(tmp_path / path), (past, past))
+    return tmp_path
+
+
+def collect(tree: Path):
+    return PythonFileCollector().collect(search_path=str(tree))
+
+
+def change(tree: Path):
+    past = time.time() - 30
+    (tree / "main.py").write_text("print('changed')\n")
+    os.utime(str(tree / "pkg" / "core.py"), (past, past))
+    (tree / "pkg" / "util.py").unlink()
+    (tree / "pkg" / "new.py").write_text("")
+
+
+@pytest.mark.parametrize("workers", [None, 4])
+def test_changes_are_found_from_the_previous_snapshot(
+    tree: Path, workers: int, mocker: MockFixture
+):
+    """
+    This test intents to ensure that taking a snapshot from a previous one only hashes
+    the files whose size or modification time changed, and that diffing both reports
+    the added, removed and modified files
+    """
+    # given
+    previous = Snapshot.take(collect(tree), workers=workers)
+    change(tree)
+    digest = mocker.spy(Snapshot, "_digest")
+
+    # when
+    snapshot = Snapshot.take(collect(tree), previous, workers=workers)
+    changes = snapshot.diff(previous)
+
+    # then
+    assert sorted(call.args[0] for call in digest.mock_calls) == sorted(
+        [
+            str(tree / "main.py"),
+            str(tree / "pkg" / "core.py"),
+            str(tree / "pkg" / "new.py"),
+        ]
+    )
+    assert changes.added == {str(tree / "pkg" / "new.py")}
+    assert changes.removed == {str(tree / "pkg" / "util.py")}
+    assert changes.modified == {str(tree / "main.py")}
+    assert snapshot.diff(snapshot) == (set(), set(), set())
+
+
+def test_unrelated_snapshots_are_compared_file_by_file(tree: Path):
+    """
+    This test intents to ensure that snapshots which were not taken from one another
+    are diffed by comparing every file
+    """
+    # given
+    previous = Snapshot.take(collect(tree))
+    change(tree)
+    snapshot = Snapshot.take(collect(tree))
+
+    # when
+    changes = snapshot.diff(previous)
+
+    # then
+    assert changes == Snapshot.take(collect(tree), previous).diff(previous)
+    assert not previous.diff(previous)
+
+
+def test_snapshots_are_saved_and_loaded(tree: Path, tmp_path_factory):
+    """
+    This test intents to ensure that a saved snapshot is loaded back identical
+    """
+    # given
+    snapshot = Snapshot.take(collect(tree))
+    path = tmp_path_factory.mktemp("snapshots") / "snapshot"
+
+    # when
+    snapshot.save(path)
+    loaded = Snapshot.load(path)
+
+    # then
+    assert loaded == snapshot
+    assert loaded[str(tree / "main.py")] == snapshot[str(tree / "main.py")]
+    Snapshot().save(path)
+    assert Snapshot.load(path) == Snapshot()
+    path.write_bytes(b"not a snapshot")
+    with pytest.raises(ValueError):
+        Snapshot.load(path)
@@ -0,0 +1,182 @@
+import errno
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import List
+
+import pytest
+from pytest_mock import MockFixture
+
+from pycollect import PythonFileCollector
+from pycollect.watcher import ChangeEvent, CollectionWatcher, _Inotify
+
+
+@pytest.fixture(
+    params=[
+        pytest.param(
+            True,
+            marks=pytest.mark.skipif(
+                not _Inotify.is_available(), reason="inotify is not available"
+            ),
+        ),
+        False,
+    ],
+    ids=["inotify", "polling"],
+)
+def use_inotify(request) -> bool:
+    return request.param
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").touch()
+    (tmp_path / "pkg" / "old.py").touch()
+    (tmp_path / "__pycache__").mkdir()
+    return tmp_path
+
+
+def wait_for_events(
+    watcher: CollectionWatcher, expected_count: int, timeout: float = 5
+) -> List[ChangeEvent]:
+    events = []  # type: List[ChangeEvent]
+    deadline = time.monotonic() + timeout
+    while len(events) < expected_count and time.monotonic() < deadline:
+        events.extend(watcher.check(timeout=0.05))
+    return events
+
+
+def test_watcher_reports_added_and_removed_files(use_inotify: bool, tree: Path):
+    """
+    This test intents to ensure that a watcher keeps its collection up to date,
+    applying the collector's exclusion patterns to new files and directories
+    """
+    # given
+    added, removed = [], []
+    watcher = PythonFileCollector().watch(
+        str(tree),
+        on_added=added.append,
+        on_removed=removed.append,
+        use_inotify=use_inotify,
+        poll_interval=0,
+    )
+    with watcher:
+        assert watcher.files == {
+            str(tree / "pkg" / "__init__.py"),
+            str(tree / "pkg" / "old.py"),
+        }
+
+        # when
+        (tree / "pkg" / "new.py").touch()
+        (tree / "pkg" / "notes.txt").touch()
+        (tree / "__pycache__" / "cached.py").touch()
+        (tree / "pkg" / "old.py").unlink()
+        events = wait_for_events(watcher, 2)
+
+        # then
+        assert sorted(events) == [
+            ChangeEvent("added", str(tree / "pkg" / "new.py")),
+            ChangeEvent("removed", str(tree / "pkg" / "old.py")),
+        ]
+        assert added == [str(tree / "pkg" / "new.py")]
+        assert removed == [str(tree / "pkg" / "old.py")]
+        assert watcher.files == {
+            str(tree / "pkg" / "__init__.py"),
+            str(tree / "pkg" / "new.py"),
+        }
+
+
+def test_watcher_follows_new_and_deleted_directories(use_inotify: bool, tree: Path):
+    """
+    This test intents to ensure that files within directories created or deleted
+    while watching are respectively added to and removed from the collection
+    """
+    # given
+    with PythonFileCollector().watch(
+        str(tree), use_inotify=use_inotify, poll_interval=0
+    ) as watcher:
+        # when
+        (tree / "sub" / "inner").mkdir(parents=True)
+        (tree / "sub" / "inner" / "module.py").touch()
+        wait_for_events(watcher, 1)
+        (tree / "sub" / "inner" / "other.py").touch()
+        added_events = wait_for_events(watcher, 1)
+        shutil.rmtree(str(tree / "pkg"))
+        removed_events = wait_for_events(watcher, 2)
+
+        # then
+        assert added_events == [
+            ChangeEvent("added", str(tree / "sub" / "inner" / "other.py"))
+        ]
+        assert sorted(removed_events) == [
+            ChangeEvent("removed", str(tree / "pkg" / "__init__.py")),
+            ChangeEvent("removed", str(tree / "pkg" / "old.py")),
+        ]
+        assert watcher.files == {
+            str(tree / "sub" / "inner" / "module.py"),
+            str(tree / "sub" / "inner" / "other.py"),
+        }
+
+
+@pytest.mark.parametrize("destination", ["renamed", "sub/renamed"])
+def test_watcher_follows_renamed_directories(
+    use_inotify: bool, tree: Path, destination: str
+):
+    """
+    This test intents to ensure that the files of a renamed directory, which keeps
+    its inode, are reported as removed from its old path and added under its new
+    path, whether it stays in the same parent directory or not
+    """
+    # given
+    (tree / "sub").mkdir()
+    with PythonFileCollector().watch(
+        str(tree), use_inotify=use_inotify, poll_interval=0
+    ) as watcher:
+        # when
+        (tree / "pkg").rename(tree / destination)
+        events = wait_for_events(watcher, 4)
+
+        # then
+        assert sorted(events) == [
+            ChangeEvent("added", str(tree / destination / "__init__.py")),
+            ChangeEvent("added", str(tree / destination / "old.py")),
+            ChangeEvent("removed", str(tree / "pkg" / "__init__.py")),
+            ChangeEvent("removed", str(tree / "pkg" / "old.py")),
+        ]
+        assert watcher.files == {
+            str(tree / destination / "__init__.py"),
+            str(tree / destination / "old.py"),
+        }
+
+
+@pytest.mark.skipif(not _Inotify.is_available(), reason="inotify is not available")
+def test_watcher_falls_back_to_polling_when_out_of_inotify_watches(
+    mocker: MockFixture, tree: Path
+):
+    """
+    This test intents to ensure that a watcher polls directories once inotify runs
+    out of watches instead of failing or missing changes
+    """
+    # given
+    add = _Inotify.add
+
+    def limited_add(inotify: _Inotify, path: str) -> None:
+        if os.path.basename(path) == "pkg":
+            raise OSError(errno.ENOSPC, os.strerror(errno.ENOSPC), path)
+        add(inotify, path)
+
+    mocker.patch.object(_Inotify, "add", limited_add)
+    with PythonFileCollector().watch(
+        str(tree), use_inotify=True, poll_interval=0
+    ) as watcher:
+        # when
+        (tree / "pkg" / "new.py").touch()
+        (tree / "top.py").touch()
+        events = wait_for_events(watcher, 2)
+
+        # then
+        assert sorted(events) == [
+            ChangeEvent("added", str(tree / "pkg" / "new.py")),
+            ChangeEvent("added", str(tree / "top.py")),
+        ]
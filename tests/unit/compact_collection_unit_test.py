@@ -0,0 +1,70 @@
+import os
+import pickle
+
+import pytest
+
+from pycollect import CompactCollection
+
+FILEPATHS = [
+    os.path.join("root", "pkg", "module.py"),
+    os.path.join("root", "pkg", "__init__.py"),
+    os.path.join("root", "main.py"),
+    os.path.join("root", "pkg", "sub", "deep.py"),
+    "setup.py",
+    os.path.join("root", "main.py"),
+]
+
+
+@pytest.fixture
+def collection() -> CompactCollection:
+    return CompactCollection(FILEPATHS)
+
+
+def test_compact_collection_behaves_as_a_sorted_set_of_paths(
+    collection: CompactCollection,
+):
+    """
+    This test intents to ensure that a `CompactCollection` holds each path once and
+    iterates over them sorted by directory and name
+    """
+    # given
+    expected_filepaths = sorted(
+        set(FILEPATHS), key=lambda filepath: os.path.split(filepath)
+    )
+
+    # when
+    filepaths = list(collection)
+
+    # then
+    assert filepaths == expected_filepaths
+    assert len(collection) == len(expected_filepaths)
+    assert [collection[i] for i in range(len(collection))] == expected_filepaths
+    assert collection[-1] == expected_filepaths[-1]
+    assert collection[1:3] == expected_filepaths[1:3]
+    assert [entry.path for entry in collection.entries()] == expected_filepaths
+
+
+def test_compact_collection_membership(collection: CompactCollection):
+    """
+    This test intents to ensure that membership tests work for every stored path and
+    only for them
+    """
+    for filepath in FILEPATHS:
+        assert filepath in collection
+    assert os.path.join("root", "pkg", "other.py") not in collection
+    assert os.path.join("root", "missing", "main.py") not in collection
+    assert os.path.join("root", "pkg") not in collection
+    assert 42 not in collection
+
+
+def test_compact_collection_is_picklable(collection: CompactCollection):
+    """
+    This test intents to ensure that a `CompactCollection` survives pickling
+    """
+    # when
+    unpickled_collection = pickle.loads(pickle.dumps(collection))
+
+    # then
+    assert unpickled_collection == collection
+    assert list(unpickled_collection) == list(collection)
+    assert FILEPATHS[0] in unpickled_collection
@@ -0,0 +1,43 @@
+import os
+import pickle
+from pathlib import Path
+
+from pycollect import FileEntry
+
+
+def test_file_entry_mimics_dir_entry(tmp_path: Path):
+    """
+    This test intents to ensure that a `FileEntry` exposes the same information as
+    the `os.DirEntry` referring to the same file
+    """
+    # given
+    (tmp_path / "module.py").write_text("x = 1\n")
+    (dir_entry,) = os.scandir(str(tmp_path))
+
+    # when
+    file_entry = FileEntry(dir_entry.path)
+
+    # then
+    assert file_entry.name == dir_entry.name
+    assert file_entry.path == dir_entry.path
+    assert os.fspath(file_entry) == os.fspath(dir_entry)
+    assert file_entry.is_file() and not file_entry.is_dir()
+    assert file_entry.inode() == dir_entry.inode()
+    assert file_entry.stat().st_size == dir_entry.stat().st_size
+
+
+def test_file_entry_is_picklable_and_compared_by_path():
+    """
+    This test intents to ensure that `FileEntry` instances can be pickled and that
+    instances referring to the same path are equal
+    """
+    # given
+    file_entry = FileEntry(os.path.join("some", "package", "module.py"))
+
+    # when
+    unpickled_file_entry = pickle.loads(pickle.dumps(file_entry))
+
+    # then
+    assert unpickled_file_entry == file_entry
+    assert hash(unpickled_file_entry) == hash(file_entry)
+    assert unpickled_file_entry.name == "module.py"
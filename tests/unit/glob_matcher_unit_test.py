@@ -0,0 +1,75 @@
+from typing import List, Optional
+
+import pytest
+
+from pycollect.glob_matcher import GlobMatcher
+
+
+@pytest.mark.parametrize(
+    "patterns, relative_path, is_dir, expected",
+    [
+        (["*.pyc"], "module.pyc", False, True),
+        (["*.pyc"], "pkg/sub/module.pyc", False, True),
+        (["*.pyc"], "module.py", False, None),
+        (["a*b*c"], "axxbyyc", False, True),
+        (["a*b*c"], "ac", False, None),
+        (["module_?.py"], "module_1.py", False, True),
+        (["module_?.py"], "module_10.py", False, None),
+        (["module_[0-4].py"], "module_3.py", False, True),
+        (["module_[!0-4].py"], "module_3.py", False, None),
+        (["module_[!0-4].py"], "module_7.py", False, True),
+        (["/setup.py"], "setup.py", False, True),
+        (["/setup.py"], "pkg/setup.py", False, None),
+        (["pkg/*.py"], "pkg/module.py", False, True),
+        (["pkg/*.py"], "pkg/sub/module.py", False, None),
+        (["pkg/*.py"], "src/pkg/module.py", False, None),
+        (["**/fixtures"], "tests/unit/fixtures", True, True),
+        (["a/**/b"], "a/b", True, True),
+        (["a/**/b"], "a/x/y/b", True, True),
+        (["a/**/b"], "x/a/b", True, None),
+        (["tests/fixtures/**"], "tests/fixtures/data/module.py", False, True),
+        (["tests/fixtures/**"], "tests/fixtures", True, True),
+        (["tests/fixtures/**"], "tests", True, None),
+        (["tests/fixtures/**", "!*.py"], "tests/fixtures", True, None),
+        (["tests/fixtures/**", "!*.py"], "tests/fixtures/module.py", False, False),
+        (["!*.py", "tests/fixtures/**"], "tests/fixtures", True, True),
+        (["build/"], "build", True, True),
+        (["build/"], "build", False, None),
+        (["*.py", "!keep.py"], "keep.py", False, False),
+        (["!keep.py", "*.py"], "keep.py", False, True),
+        (["# comment", "", "  "], "# comment", False, None),
+        ([r"\#notes.py", r"\!important.py"], "#notes.py", False, True),
+        ([r"\#notes.py", r"\!important.py"], "!important.py", False, True),
+        (["*.py "], "module.py", False, True),
+        (["pkg/[ab]*"], "pkg/b", True, True),
+        (["pkg/[ab]*"], "pkg/c", True, None),
+    ],
+)
+def test_glob_patterns_match_as_in_gitignore_files(
+    patterns: List[str], relative_path: str, is_dir: bool, expected: Optional[bool]
+):
+    """
+    This test intents to ensure that glob patterns follow the `.gitignore` syntax
+    """
+    # given
+    matcher = GlobMatcher(patterns)
+
+    # when
+    matched = matcher.match(relative_path, is_dir)
+
+    # then
+    assert matched is expected
+
+
+def test_wildcards_do_not_match_path_separators():
+    """
+    This test intents to ensure that `*`, `?` and character classes only match
+    within a single path segment
+    """
+    # given
+    matcher = GlobMatcher(["a*b", "c?d", "e[!x]f"])
+
+    # then
+    assert not matcher.excludes("a/b", is_dir=False)
+    assert not matcher.excludes("c/d", is_dir=False)
+    assert not matcher.excludes("e/f", is_dir=False)
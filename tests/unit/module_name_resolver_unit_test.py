@@ -0,0 +1,74 @@
+import itertools
+import os
+import sys
+
+import pytest
+
+from pycollect import ModuleNameResolver, find_module_name
+
+
+def build_path(*paths: str) -> str:
+    root_dir = "usr" if os.name != "nt" else "C:"
+    return os.path.join(os.sep, root_dir + os.sep, *paths)
+
+
+@pytest.fixture
+def pythonpath(monkeypatch):
+    monkeypatch.setattr(
+        sys,
+        "path",
+        [
+            build_path("resolver"),
+            build_path("resolver", "a", "b"),
+            build_path("resolver", "b", "a", "b"),
+            os.path.join("a", "b"),
+            os.curdir,
+        ],
+    )
+
+
+FILEPATHS = [
+    os.path.join(root, *parts, "module.py")
+    for length in range(4)
+    for parts in itertools.product(["a", "b"], repeat=length)
+    for root in (build_path("resolver"), "", os.curdir)
+] + [build_path("module.py")]
+
+
+@pytest.mark.parametrize("innermost", [False, True])
+def test_resolver_matches_find_module_name(pythonpath, innermost: bool):
+    """
+    This test intents to ensure that `ModuleNameResolver` finds exactly the same
+    module names as the utility function `find_module_name`
+    """
+    # given
+    resolver = ModuleNameResolver()
+    expected_module_names = [
+        find_module_name(filepath, innermost=innermost) for filepath in FILEPATHS
+    ]
+
+    # when
+    module_names = resolver.find_module_names(FILEPATHS, innermost=innermost)
+
+    # then
+    assert module_names == expected_module_names
+    assert any(module_names)
+
+
+def test_resolver_notices_sys_path_changes(pythonpath):
+    """
+    This test intents to ensure that `ModuleNameResolver` does not use outdated
+    results once `sys.path` changes
+    """
+    # given
+    resolver = ModuleNameResolver()
+    filepath = build_path("elsewhere", "package", "module.py")
+    module_name_before = resolver.find_module_name(filepath)
+
+    # when
+    sys.path.append(build_path("elsewhere"))
+    module_name_after = resolver.find_module_name(filepath)
+
+    # then
+    assert module_name_before is None
+    assert module_name_after == "package.module"
@@ -0,0 +1,153 @@
+import re
+from typing import List
+
+import pytest
+
+from pycollect.pattern_matcher import PatternMatcher
+from pycollect.python_file_collector import PythonFileCollector
+
+NAMES = [
+    "",
+    "a",
+    "ab",
+    "abab",
+    "foo.py",
+    "foo.pyc",
+    ".hidden.py",
+    "~lock.py",
+    "venv",
+    "venv38",
+    "__pycache__",
+    "build",
+    "rebuild",
+    "backup~",
+    "tests",
+    "fun.py",
+]
+
+
+def legacy_matches(pattern: str, name: str, use_regex_patterns: bool) -> bool:
+    if use_regex_patterns:
+        return bool(re.match(pattern, name))
+    negate = pattern.startswith("!")
+    if negate:
+        pattern = pattern[1:]
+    splitted = pattern.split("*")
+    matches_pattern = name.startswith(splitted[0]) and name.endswith(splitted[-1])
+    return matches_pattern if not negate else not matches_pattern
+
+
+@pytest.mark.parametrize(
+    "use_regex_patterns, patterns",
+    [
+        (False, PythonFileCollector.DEFAULT_FILE_EXCLUSION_PATTERNS),
+        (False, PythonFileCollector.DEFAULT_DIR_EXCLUSION_PATTERNS),
+        (False, ["ab", "a*b*c", "*", "!f*.py", "!*.py"]),
+        (False, []),
+        (True, PythonFileCollector._DEFAULT_FILE_EXCLUSION_REGEX_PATTERNS),
+        (True, PythonFileCollector._DEFAULT_DIR_EXCLUSION_REGEX_PATTERNS),
+        (True, [r"(a)b\1", r"(?i)FUN", r"^te"]),
+        (True, []),
+    ],
+)
+def test_matcher_is_equivalent_to_pattern_by_pattern_matching(
+    use_regex_patterns: bool, patterns: List[str]
+):
+    """
+    This test intents to ensure that a compiled `PatternMatcher` matches exactly the
+    same names as testing each pattern individually does
+    """
+    # given
+    matcher = PatternMatcher(patterns, use_regex_patterns)
+
+    for name in NAMES:
+        # when
+        matches = matcher.matches(name)
+
+        # then
+        assert matches == any(
+            legacy_matches(pattern, name, use_regex_patterns) for pattern in patterns
+        ), name
+
+
+def test_collector_recompiles_matcher_when_patterns_change():
+    """
+    This test intents to ensure that `PythonFileCollector` compiles its patterns only
+    once and compiles them again after the pattern sets are changed
+    """
+    # given
+    collector = PythonFileCollector()
+    matcher = collector.file_matcher
+
+    # when
+    unchanged_matcher = collector.file_matcher
+    collector.file_exclusion_patterns.add("fun*")
+    changed_matcher = collector.file_matcher
+
+    # then
+    assert unchanged_matcher is matcher
+    assert changed_matcher is not matcher
+    assert changed_matcher.matches("fun.py")
+
+
+@pytest.mark.parametrize(
+    "use_regex_patterns, patterns",
+    [
+        (False, PythonFileCollector.DEFAULT_FILE_EXCLUSION_PATTERNS),
+        (False, ["ab", "a*b*c", "*", "!f*.py", "!*.py"]),
+        (True, PythonFileCollector._DEFAULT_DIR_EXCLUSION_REGEX_PATTERNS),
+        (True, [r"(a)b\1", r"(?i)FUN", r"^te"]),
+    ],
+)
+def test_matching_patterns_lists_each_pattern_matching_a_name(
+    use_regex_patterns: bool, patterns: List[str]
+):
+    """
+    This test intents to ensure that `matching_patterns` lists exactly the patterns
+    matching a name and that it agrees with `matches`
+    """
+    # given
+    matcher = PatternMatcher(patterns, use_regex_patterns)
+
+    for name in NAMES:
+        # when
+        matching_patterns = matcher.matching_patterns(name)
+
+        # then
+        assert matching_patterns == sorted(
+            pattern
+            for pattern in patterns
+            if legacy_matches(pattern, name, use_regex_patterns)
+        )
+        assert bool(matching_patterns) == matcher.matches(name)
+
+
+@pytest.mark.parametrize(
+    "patterns, combined",
+    [
+        (PythonFileCollector._DEFAULT_FILE_EXCLUSION_REGEX_PATTERNS, True),
+        (
+            PythonFileCollector._DEFAULT_DIR_EXCLUSION_REGEX_PATTERNS
+            | {r"^(tests|docs)$"},
+            True,
+        ),
+        ([r"(?P<name>a)b", r"(?P<name>c)d"], False),
+        ([r"(a)b\1", r"^te"], False),
+        ([r"(?P<name>a)(?P=name)", r"^te"], False),
+    ],
+)
+def test_regex_patterns_with_groups_are_combined(patterns: List[str], combined: bool):
+    """
+    This test intents to ensure that regex patterns with capturing groups are still
+    combined into a single regex, only patterns referring to their own groups falling
+    back to pattern by pattern matching, with the same results either way
+    """
+    # when
+    matcher = PatternMatcher(patterns, use_regex_patterns=True)
+
+    # then
+    assert (matcher._regex is not None) == combined
+    for name in NAMES + ["tests", "docs", "aa", "abab", "cd"]:
+        assert matcher.matches(name) == any(
+            legacy_matches(pattern, name, True) for pattern in patterns
+        )